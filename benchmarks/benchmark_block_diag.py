@@ -0,0 +1,36 @@
+"""
+Compares block_diag with scipy.sparse.block_diag for 10^4 dense blocks of 7x7 and for 10^2 diagonal blocks of
+10^4x10^4. Run with
+python benchmarks/benchmark_block_diag.py
+"""
+import numpy as np
+import scipy.sparse
+import timeit
+
+from multiply_core.util import block_diag
+
+__author__ = "MULTIPLY Team"
+
+REPETITIONS = 3
+
+
+def _measure(function) -> float:
+    return min(timeit.repeat(function, number=1, repeat=REPETITIONS))
+
+
+def main():
+    dense_blocks = np.random.random((10000, 7, 7))
+    for format in ['coo', 'csr']:
+        scipy_time = _measure(lambda: scipy.sparse.block_diag(dense_blocks, format=format))
+        block_diag_time = _measure(lambda: block_diag(dense_blocks, format=format))
+        print('10^4 blocks of 7x7 as {}: scipy {:.3f} s, block_diag {:.3f} s'.format(format, scipy_time,
+                                                                                      block_diag_time))
+    diagonal_blocks = [scipy.sparse.diags(np.random.random(10000)) for _ in range(100)]
+    scipy_time = _measure(lambda: scipy.sparse.block_diag(diagonal_blocks))
+    block_diag_time = _measure(lambda: block_diag(diagonal_blocks))
+    print('10^2 diagonal blocks of 10^4x10^4: scipy {:.3f} s, block_diag {:.3f} s'.format(scipy_time,
+                                                                                           block_diag_time))
+
+
+if __name__ == '__main__':
+    main()
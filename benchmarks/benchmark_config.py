@@ -0,0 +1,50 @@
+"""
+Compares AttributeDict and Config for creating a large nested configuration, as loaded from a YAML file, and for
+looking up entries by dotted paths. Run with
+python benchmarks/benchmark_config.py
+"""
+import timeit
+
+from multiply_core.util import AttributeDict, Config
+
+__author__ = "MULTIPLY Team"
+
+NUM_SECTIONS = 200
+NUM_SUBSECTIONS = 50
+NUM_ENTRIES = 10
+NUM_LOOKUPS = 100000
+REPETITIONS = 3
+
+
+def _create_entries() -> dict:
+    return {'section_{}'.format(i): {'subsection_{}'.format(j): {'entry_{}'.format(k): k for k in range(NUM_ENTRIES)}
+                                     for j in range(NUM_SUBSECTIONS)} for i in range(NUM_SECTIONS)}
+
+
+def _get_entry(attribute_dict: AttributeDict, path: str):
+    value = attribute_dict
+    for key in path.split('.'):
+        value = value[key]
+    return value
+
+
+def main():
+    entries = _create_entries()
+    attribute_dict_time = min(timeit.repeat(lambda: AttributeDict(**entries), number=1, repeat=REPETITIONS))
+    config_time = min(timeit.repeat(lambda: Config(entries), number=1, repeat=REPETITIONS))
+    print('Creation from {} entries: AttributeDict {:.4f} s, Config {:.6f} s'.format(
+        NUM_SECTIONS * NUM_SUBSECTIONS * NUM_ENTRIES, attribute_dict_time, config_time))
+
+    attribute_dict = AttributeDict(**entries)
+    config = Config(entries).freeze()
+    path = 'section_7.subsection_3.entry_5'
+    attribute_dict_time = min(timeit.repeat(lambda: _get_entry(attribute_dict, path), number=NUM_LOOKUPS,
+                                            repeat=REPETITIONS))
+    config_time = min(timeit.repeat(lambda: config.get_entry(path), number=NUM_LOOKUPS, repeat=REPETITIONS))
+    has_entry_time = min(timeit.repeat(lambda: config.has_entry(path), number=NUM_LOOKUPS, repeat=REPETITIONS))
+    print('{} dotted path lookups: AttributeDict {:.3f} s, Config.get_entry {:.3f} s, Config.has_entry {:.3f} s'.format(
+        NUM_LOOKUPS, attribute_dict_time, config_time, has_entry_time))
+
+
+if __name__ == '__main__':
+    main()
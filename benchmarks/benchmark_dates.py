@@ -0,0 +1,76 @@
+"""
+Converts 10^6 'AYYYYDDD' tokens to times and determines the lengths of 10^6 months, with the former scalar functions
+in a loop and with the vectorized functions.
+Run with
+python benchmarks/benchmark_dates.py
+"""
+from datetime import datetime
+import numpy as np
+import time
+
+from multiply_core.util import get_days_of_months, get_times_from_day_of_year_tokens
+
+__author__ = "MULTIPLY Team"
+
+NUM_ENTRIES = 1000000
+DAYS_PER_MONTHS = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+
+
+def _is_leap_year(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _get_time_from_year_and_day_of_year(year: int, day_of_year: int) -> datetime:
+    days_per_months = list(DAYS_PER_MONTHS)
+    if _is_leap_year(year):
+        days_per_months[1] = 29
+    accumulated_days = 0
+    month = 0
+    for days_per_month in days_per_months:
+        month += 1
+        if accumulated_days + days_per_month >= day_of_year:
+            break
+        accumulated_days += days_per_month
+    return datetime(year, month, day_of_year - accumulated_days)
+
+
+def _get_days_of_month(year: int, month: int) -> int:
+    if month == 2 and _is_leap_year(year):
+        return 29
+    return DAYS_PER_MONTHS[month - 1]
+
+
+def main():
+    random_state = np.random.RandomState(0)
+    years = random_state.randint(2000, 2020, NUM_ENTRIES)
+    days_of_year = random_state.randint(1, 366, NUM_ENTRIES)
+    months = random_state.randint(1, 13, NUM_ENTRIES)
+    tokens = ['A{:04d}{:03d}'.format(year, day_of_year) for year, day_of_year in zip(years, days_of_year)]
+
+    start = time.perf_counter()
+    loop_times = [_get_time_from_year_and_day_of_year(int(token[1:5]), int(token[5:])) for token in tokens]
+    loop_tokens_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    times = get_times_from_day_of_year_tokens(tokens)
+    vectorized_tokens_time = time.perf_counter() - start
+
+    year_list = years.tolist()
+    month_list = months.tolist()
+    start = time.perf_counter()
+    loop_days = [_get_days_of_month(year, month) for year, month in zip(year_list, month_list)]
+    loop_months_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    days = get_days_of_months(years, months)
+    vectorized_months_time = time.perf_counter() - start
+
+    print('{} tokens to times: loop {:.2f} s, get_times_from_day_of_year_tokens {:.3f} s, equal: {}'.format(
+        NUM_ENTRIES, loop_tokens_time, vectorized_tokens_time,
+        np.array_equal(np.array(loop_times, dtype='datetime64[s]'), times)))
+    print('{} month lengths: loop {:.2f} s, get_days_of_months {:.3f} s, equal: {}'.format(
+        NUM_ENTRIES, loop_months_time, vectorized_months_time, np.array_equal(loop_days, days)))
+
+
+if __name__ == '__main__':
+    main()
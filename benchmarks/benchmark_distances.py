@@ -0,0 +1,56 @@
+"""
+Matches 10^6 pixels to 10^3 stations, that is, compares 10^9 pairs of points: with the scalar compute_distance in a
+loop (extrapolated from a sample), with compute_distance_matrix on chunks of pixels and with NearestPointFinder.
+Run with
+python benchmarks/benchmark_distances.py
+"""
+import numpy as np
+import time
+
+from multiply_core.util import NearestPointFinder, compute_distance, compute_distance_matrix
+
+__author__ = "MULTIPLY Team"
+
+MEAN_EARTH_RADIUS = 6372000
+NUM_PIXELS = 1000000
+NUM_STATIONS = 1000
+CHUNK_SIZE = 10000
+LOOP_SAMPLE_SIZE = 20
+
+
+def main():
+    random_state = np.random.RandomState(0)
+    pixel_lons, pixel_lats = np.meshgrid(np.linspace(0., 10., 1000), np.linspace(45., 55., NUM_PIXELS // 1000))
+    pixel_lons = pixel_lons.ravel()
+    pixel_lats = pixel_lats.ravel()
+    station_lons = random_state.uniform(-1., 11., NUM_STATIONS)
+    station_lats = random_state.uniform(44., 56., NUM_STATIONS)
+
+    start = time.perf_counter()
+    for i in range(LOOP_SAMPLE_SIZE):
+        distances = [compute_distance(pixel_lons[i], pixel_lats[i], station_lons[j], station_lats[j],
+                                      MEAN_EARTH_RADIUS) for j in range(NUM_STATIONS)]
+        int(np.argmin(distances))
+    loop_time = (time.perf_counter() - start) * NUM_PIXELS / LOOP_SAMPLE_SIZE
+
+    start = time.perf_counter()
+    matrix_indexes = np.empty(NUM_PIXELS, dtype=np.int64)
+    for chunk_start in range(0, NUM_PIXELS, CHUNK_SIZE):
+        chunk = slice(chunk_start, chunk_start + CHUNK_SIZE)
+        distances = compute_distance_matrix(pixel_lons[chunk], pixel_lats[chunk], station_lons, station_lats,
+                                            MEAN_EARTH_RADIUS)
+        matrix_indexes[chunk] = np.argmin(distances, axis=1)
+    matrix_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, tree_indexes = NearestPointFinder(station_lons, station_lats, MEAN_EARTH_RADIUS).query(pixel_lons, pixel_lats)
+    tree_time = time.perf_counter() - start
+
+    print('Nearest of {} stations for {} pixels: loop over compute_distance {:.0f} s (extrapolated), '
+          'compute_distance_matrix {:.2f} s, NearestPointFinder {:.2f} s, {} differing matches'.format(
+              NUM_STATIONS, NUM_PIXELS, loop_time, matrix_time, tree_time,
+              np.count_nonzero(matrix_indexes != tree_indexes)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Writes 1000 small multi-band chunks with GeoTiffWriter and compares this with writing the same chunks band by band.
+Run with
+python benchmarks/benchmark_geotiff_writer.py
+"""
+import gdal
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+
+from multiply_core.observations import GeoTiffWriter
+
+__author__ = "MULTIPLY Team"
+
+NUM_BANDS = 7
+CHUNK_SIZE = 32
+CHUNKS_PER_ROW = 40
+NUM_CHUNKS = 1000
+GEO_TRANSFORM = (300000.0, 10.0, 0.0, 5900040.0, 0.0, -10.0)
+PROJECTION = 'PROJCS["WGS 84 / UTM zone 32N",GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,' \
+             '298.257223563]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433]],' \
+             'PROJECTION["Transverse_Mercator"],PARAMETER["latitude_of_origin",0],PARAMETER["central_meridian",9],' \
+             'PARAMETER["scale_factor",0.9996],PARAMETER["false_easting",500000],PARAMETER["false_northing",0],' \
+             'UNIT["metre",1]]'
+
+
+def _get_offsets():
+    return [((i % CHUNKS_PER_ROW) * CHUNK_SIZE, (i // CHUNKS_PER_ROW) * CHUNK_SIZE) for i in range(NUM_CHUNKS)]
+
+
+def _write_with_writer(file_name: str, chunk: np.array, width: int, height: int) -> float:
+    start = time.perf_counter()
+    writer = GeoTiffWriter([file_name], GEO_TRANSFORM, PROJECTION, width, height, [NUM_BANDS])
+    for offset_x, offset_y in _get_offsets():
+        writer.write([chunk], width=CHUNK_SIZE, height=CHUNK_SIZE, offset_x=offset_x, offset_y=offset_y)
+    writer.close()
+    return time.perf_counter() - start
+
+
+def _write_band_by_band(file_name: str, chunk: np.array, width: int, height: int) -> float:
+    start = time.perf_counter()
+    data_set = gdal.GetDriverByName('GTiff').Create(file_name, width, height, NUM_BANDS, gdal.GDT_Float32,
+                                                    ['COMPRESS=DEFLATE', 'BIGTIFF=YES', 'PREDICTOR=1', 'TILED=YES'])
+    data_set.SetProjection(PROJECTION)
+    data_set.SetGeoTransform(GEO_TRANSFORM)
+    for offset_x, offset_y in _get_offsets():
+        for band in range(NUM_BANDS):
+            data_set.GetRasterBand(band + 1).WriteArray(chunk[band], offset_x, offset_y)
+    data_set = None
+    return time.perf_counter() - start
+
+
+def main():
+    width = CHUNKS_PER_ROW * CHUNK_SIZE
+    height = (NUM_CHUNKS // CHUNKS_PER_ROW) * CHUNK_SIZE
+    chunk = np.random.random((NUM_BANDS, CHUNK_SIZE, CHUNK_SIZE)).astype(np.float32)
+    output_dir = tempfile.mkdtemp()
+    try:
+        band_by_band_time = _write_band_by_band(os.path.join(output_dir, 'band_by_band.tif'), chunk, width, height)
+        writer_time = _write_with_writer(os.path.join(output_dir, 'writer.tif'), chunk, width, height)
+        print('{} chunks of {}x{}x{}: band by band {:.3f} s, GeoTiffWriter {:.3f} s'.format(
+            NUM_CHUNKS, NUM_BANDS, CHUNK_SIZE, CHUNK_SIZE, band_by_band_time, writer_time))
+    finally:
+        shutil.rmtree(output_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares the block reduction path for aligned grids with gdal.Warp. Run with
+python benchmarks/benchmark_reproject.py
+"""
+import gdal
+import numpy as np
+import timeit
+
+from multiply_core.util.reproject import TargetGrid, reproject_to_grid
+
+__author__ = "MULTIPLY Team"
+
+UTM_32N = 'PROJCS["WGS 84 / UTM zone 32N",GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,' \
+          '298.257223563,AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],PRIMEM["Greenwich",0,' \
+          'AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,AUTHORITY["EPSG","9122"]],' \
+          'AUTHORITY["EPSG","4326"]],PROJECTION["Transverse_Mercator"],PARAMETER["latitude_of_origin",0],' \
+          'PARAMETER["central_meridian",9],PARAMETER["scale_factor",0.9996],PARAMETER["false_easting",500000],' \
+          'PARAMETER["false_northing",0],UNIT["metre",1,AUTHORITY["EPSG","9001"]],AUTHORITY["EPSG","32632"]]'
+REPETITIONS = 3
+
+
+def _create_source(size: int, resolution: float) -> gdal.Dataset:
+    data_set = gdal.GetDriverByName('MEM').Create('', size, size, 1, gdal.GDT_UInt16)
+    data_set.SetGeoTransform((300000.0, resolution, 0.0, 5900040.0, 0.0, -resolution))
+    data_set.SetProjection(UTM_32N)
+    data_set.GetRasterBand(1).WriteArray(np.random.randint(1, 10000, (size, size)).astype(np.uint16))
+    data_set.GetRasterBand(1).SetNoDataValue(0)
+    return data_set
+
+
+def _warp(source: gdal.Dataset, target_grid: TargetGrid, resampling_mode: str) -> gdal.Dataset:
+    return gdal.Warp('', source, format='MEM', outputBounds=target_grid.bounds, width=target_grid.width,
+                     height=target_grid.height, dstSRS=target_grid.wkt, resampleAlg=resampling_mode)
+
+
+def main():
+    for size, resolution, factor in [(5490, 20.0, 3), (10980, 10.0, 2)]:
+        source = _create_source(size, resolution)
+        geo_t = source.GetGeoTransform()
+        target_grid = TargetGrid((geo_t[0], resolution * factor, 0.0, geo_t[3], 0.0, -resolution * factor),
+                                 size // factor, size // factor, UTM_32N)
+        for resampling_mode in ['average', 'min', 'max', 'mode']:
+            warp_time = min(timeit.repeat(lambda: _warp(source, target_grid, resampling_mode),
+                                          number=1, repeat=REPETITIONS))
+            fast_time = min(timeit.repeat(lambda: reproject_to_grid(source, target_grid, resampling_mode),
+                                          number=1, repeat=REPETITIONS))
+            difference = np.abs(_warp(source, target_grid, resampling_mode).ReadAsArray().astype(np.int64) -
+                                reproject_to_grid(source, target_grid, resampling_mode).ReadAsArray()).max()
+            print('{}m -> {}m {:>8}: gdal.Warp {:.3f} s, block reduction {:.3f} s, max difference {}'.format(
+                int(resolution), int(resolution * factor), resampling_mode, warp_time, fast_time, difference))
+
+
+if __name__ == '__main__':
+    main()
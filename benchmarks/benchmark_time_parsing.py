@@ -0,0 +1,53 @@
+"""
+Compares get_time_from_string with parsing by trying all formats with strptime, on 1M timestamps of mixed formats.
+Run with
+python benchmarks/benchmark_time_parsing.py
+"""
+from datetime import datetime, timedelta
+import random
+import time
+
+from multiply_core.util import get_time_from_string
+
+__author__ = "MULTIPLY Team"
+
+NUM_TIMESTAMPS = 1000000
+NUM_DISTINCT_TIMESTAMPS = 5000
+FORMATS = ['%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d', '%Y-%m', '%Y']
+
+
+def _get_time_with_strptime(time_string: str) -> datetime:
+    for time_format in FORMATS:
+        try:
+            return datetime.strptime(time_string, time_format)
+        except ValueError:
+            pass
+    raise ValueError('Invalid date/time value: "%s"' % time_string)
+
+
+def _create_timestamps(num_distinct: int) -> list:
+    random.seed(0)
+    start = datetime(2000, 1, 1)
+    distinct_timestamps = [(start + timedelta(seconds=random.randrange(20 * 365 * 86400))).strftime(
+        random.choice(FORMATS)) for _ in range(num_distinct)]
+    return [random.choice(distinct_timestamps) for _ in range(NUM_TIMESTAMPS)]
+
+
+def _measure(parse, timestamps: list) -> float:
+    start = time.perf_counter()
+    for timestamp in timestamps:
+        parse(timestamp)
+    return time.perf_counter() - start
+
+
+def main():
+    for num_distinct in [NUM_DISTINCT_TIMESTAMPS, NUM_TIMESTAMPS]:
+        timestamps = _create_timestamps(num_distinct)
+        strptime_time = _measure(_get_time_with_strptime, timestamps)
+        fast_time = _measure(get_time_from_string, timestamps)
+        print('{} timestamps, up to {} distinct: strptime {:.2f} s, get_time_from_string {:.2f} s'.format(
+            NUM_TIMESTAMPS, num_distinct, strptime_time, fast_time))
+
+
+if __name__ == '__main__':
+    main()
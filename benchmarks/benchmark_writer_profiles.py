@@ -0,0 +1,61 @@
+"""
+Measures write throughput and file size of the GeoTIFF profiles on float32 grids resembling LAI and soil moisture
+results, for plain and for cloud optimized GeoTIFFs. Run with
+python benchmarks/benchmark_writer_profiles.py
+"""
+import numpy as np
+import os
+import shutil
+import tempfile
+import time
+
+from multiply_core.observations import GeoTiffWriter
+from multiply_core.util.write import GEOTIFF_PROFILES
+
+__author__ = "MULTIPLY Team"
+
+SIZE = 4096
+CHUNK_HEIGHT = 256
+GEO_TRANSFORM = (300000.0, 10.0, 0.0, 5900040.0, 0.0, -10.0)
+PROJECTION = 'PROJCS["WGS 84 / UTM zone 32N",GEOGCS["WGS 84",DATUM["WGS_1984",SPHEROID["WGS 84",6378137,' \
+             '298.257223563]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433]],' \
+             'PROJECTION["Transverse_Mercator"],PARAMETER["latitude_of_origin",0],PARAMETER["central_meridian",9],' \
+             'PARAMETER["scale_factor",0.9996],PARAMETER["false_easting",500000],PARAMETER["false_northing",0],' \
+             'UNIT["metre",1]]'
+
+
+def _create_field(low: float, high: float) -> np.array:
+    # smooth structures with pixel noise, roughly like retrieved biophysical variables
+    coarse = np.random.random((SIZE // 64 + 1, SIZE // 64 + 1))
+    field = np.kron(coarse, np.ones((64, 64)))[:SIZE, :SIZE]
+    field += np.random.normal(0., 0.05, (SIZE, SIZE))
+    return (low + np.clip(field, 0., 1.) * (high - low)).astype(np.float32)
+
+
+def main():
+    fields = {'lai': _create_field(0., 7.), 'sm': _create_field(0.05, 0.5)}
+    output_dir = tempfile.mkdtemp()
+    try:
+        for name, field in fields.items():
+            raw_size = field.nbytes
+            for cloud_optimized in [False, True]:
+                for profile_name in GEOTIFF_PROFILES:
+                    file_name = os.path.join(output_dir, '{}_{}_{}.tif'.format(name, profile_name, cloud_optimized))
+                    start = time.perf_counter()
+                    writer = GeoTiffWriter([file_name], GEO_TRANSFORM, PROJECTION, SIZE, SIZE, profile=profile_name,
+                                           cloud_optimized=cloud_optimized)
+                    for y in range(0, SIZE, CHUNK_HEIGHT):
+                        writer.write([field[y:y + CHUNK_HEIGHT]], width=SIZE, height=CHUNK_HEIGHT, offset_y=y)
+                    writer.close()
+                    writer = None
+                    duration = time.perf_counter() - start
+                    file_size = os.path.getsize(file_name)
+                    print('{:>4} {:>12} {:>5}: {:7.1f} MB/s, {:7.1f} MB ({:.0%} of raw)'.format(
+                        name, profile_name, 'COG' if cloud_optimized else '', raw_size / duration / 1e6,
+                        file_size / 1e6, file_size / raw_size))
+    finally:
+        shutil.rmtree(output_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,4 +3,7 @@ from .observations import ProductObservations, ObservationData, ProductObservati
 from .s2_observations import S2Observations, S2ObservationsCreator, extract_angles_from_metadata_file, extract_tile_id
 from .data_validation import DataTypeConstants, DataValidator, add_validator, get_valid_type, get_valid_types, \
     get_data_type_path, is_valid_for, get_file_pattern, get_relative_path
-from .output import GeoTiffWriter
+from .output import GeoTiffWriter, Writer
+from .netcdf_output import NetCDFWriter
+from .memmap_output import MemmapWriter, read_memmap
+from .parallel_output import TiledGeoTiffWriter
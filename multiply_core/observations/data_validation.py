@@ -18,6 +18,8 @@ from datetime import datetime
 import re
 import os
 
+from multiply_core.util import get_region_of_interest
+
 VALIDATORS = []
 
 
@@ -373,7 +375,6 @@ class AsterValidator(DataValidator):
     def is_valid_for(self, path: str, roi: Polygon, start_time: Optional[datetime], end_time: Optional[datetime]):
         if not self.is_valid(path):
             return False
-        min_lon, min_lat, max_lon, max_lat = roi.bounds
         end_of_path = path.split('/')[-1]
         path_lat_id = end_of_path[8:9]
         path_lat = float(end_of_path[9:11])
@@ -383,9 +384,8 @@ class AsterValidator(DataValidator):
         path_lon = float(end_of_path[12:15])
         if path_lon_id == 'W':
             path_lon *= -1
-        if min_lon > path_lon + 1 or max_lon < path_lon or min_lat > path_lat + 1 or max_lat < path_lat:
-            return False
-        return True
+        # regions given as WKT are parsed only once for all paths
+        return bool(get_region_of_interest(roi).intersect_bounds((path_lon, path_lat, path_lon + 1, path_lat + 1)))
 
 
 # TODO replace this with framework
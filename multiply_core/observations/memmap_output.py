@@ -0,0 +1,128 @@
+"""
+Description
+===========
+
+This module contains a writer for intermediate products that are handed from one processing stage to the next.
+Data is written uncompressed into memory-mapped .npy files, so that it can be read back without decoding.
+"""
+import json
+import numpy as np
+import os
+from typing import List, Optional, Tuple
+
+from multiply_core.observations.output import Writer
+
+__author__ = "MULTIPLY Team"
+
+_NUMPY_DATA_TYPES = {'Float': np.float32, 'Double': np.float64, 'Int': np.int32}
+_NPY_EXTENSION = '.npy'
+_SIDECAR_EXTENSION = '.json'
+
+
+def _get_sidecar_file_name(file_name: str) -> str:
+    return file_name + _SIDECAR_EXTENSION
+
+
+class MemmapWriter(Writer):
+    """
+    Writes data into memory-mapped .npy files of shape (bands, height, width). Geographic transform and projection
+    are stored in a JSON sidecar file next to each .npy file. Several processes may write into disjoint windows of the
+    same files at the same time: the writer is created once with create=True, and every other process either creates
+    its own writer with create=False or receives a pickled writer, which re-opens the files on unpickling.
+    """
+
+    def __init__(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
+                 num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None,
+                 create: bool = True):
+        """
+        :param create: If true, the files are created. Otherwise, existing files are opened for writing.
+        """
+        self._create = create
+        super().__init__(file_names, geo_transform, projection, width, height, num_bands, data_types)
+
+    def init(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
+             num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None):
+        if num_bands is None or len(num_bands) == 0:
+            num_bands = [1] * len(file_names)
+        elif len(num_bands) != len(file_names):
+            raise ValueError('List with number of bands must be of same size as list of file names')
+        self.num_bands = num_bands
+        if data_types is None or len(data_types) == 0:
+            data_types = ['Float'] * len(file_names)
+        elif len(data_types) != len(file_names):
+            raise ValueError('List with data types must be of same size as list of file names')
+        for data_type in data_types:
+            if data_type not in _NUMPY_DATA_TYPES:
+                raise ValueError('Data Type {} not supported.'.format(data_type))
+        self._width = width
+        self._height = height
+        self._file_names = []
+        for file_name in file_names:
+            if not file_name.endswith(_NPY_EXTENSION):
+                file_name = file_name + _NPY_EXTENSION
+            self._file_names.append(file_name)
+        if self._create:
+            for i, file_name in enumerate(self._file_names):
+                parent_dir = os.path.dirname(file_name)
+                if parent_dir != '' and not os.path.exists(parent_dir):
+                    os.makedirs(parent_dir)
+                array = np.lib.format.open_memmap(file_name, mode='w+', dtype=_NUMPY_DATA_TYPES[data_types[i]],
+                                                  shape=(num_bands[i], height, width))
+                array.flush()
+                with open(_get_sidecar_file_name(file_name), 'w') as sidecar_file:
+                    json.dump({'geo_transform': list(geo_transform), 'projection': projection}, sidecar_file)
+        self._open_arrays()
+
+    def _open_arrays(self):
+        self._arrays = []
+        for i, file_name in enumerate(self._file_names):
+            array = np.lib.format.open_memmap(file_name, mode='r+')
+            if array.shape != (self.num_bands[i], self._height, self._width):
+                raise ValueError('File {} has shape {}, expected {}'.format(
+                    file_name, array.shape, (self.num_bands[i], self._height, self._width)))
+            self._arrays.append(array)
+
+    def write(self, data: List[np.array], width: Optional[int] = None, height: Optional[int] = None,
+              offset_x: Optional[int] = 0, offset_y: Optional[int] = 0):
+        assert len(data) == len(self._arrays)
+        if width is None:
+            width = self._width
+        if height is None:
+            height = self._height
+        for i, d in enumerate(data):
+            self._check_shape(i, d, width, height)
+            self._arrays[i][:, offset_y:offset_y + height, offset_x:offset_x + width] = \
+                d.reshape(self.num_bands[i], height, width)
+
+    def close(self):
+        if self._arrays is None:
+            # already closed
+            return
+        for array in self._arrays:
+            array.flush()
+        self._arrays = None
+
+    def __getstate__(self):
+        # the memory maps must not be pickled, as they would be copied into the receiving process
+        state = self.__dict__.copy()
+        del state['_arrays']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open_arrays()
+
+
+def read_memmap(file_name: str, mode: str = 'r') -> Tuple[np.memmap, tuple, str]:
+    """
+    Opens a file written by a MemmapWriter without copying its data.
+    :param file_name: The name of the .npy file
+    :param mode: 'r' for read-only access, 'r+' to allow modifications, 'c' for copy-on-write
+    :return: A memory-mapped array of shape (bands, height, width), the geographic transform and the projection
+    """
+    if not file_name.endswith(_NPY_EXTENSION):
+        file_name = file_name + _NPY_EXTENSION
+    with open(_get_sidecar_file_name(file_name)) as sidecar_file:
+        sidecar = json.load(sidecar_file)
+    array = np.lib.format.open_memmap(file_name, mode=mode)
+    return array, tuple(sidecar['geo_transform']), sidecar['projection']
@@ -0,0 +1,131 @@
+"""
+Description
+===========
+
+This module contains a writer that stores all variables of a run in a single NetCDF4 file, with a time dimension.
+"""
+from datetime import datetime
+import numpy as np
+import os
+from typing import List, Optional
+
+from multiply_core.observations.output import Writer
+
+__author__ = "MULTIPLY Team"
+
+DEFAULT_OUTPUT_FILE_NAME = 'multiply_output.nc'
+_NETCDF_DATA_TYPES = {'Float': 'f4', 'Double': 'f8', 'Int': 'i4'}
+_TIME_UNITS = 'hours since 1970-01-01 00:00:00'
+
+
+class NetCDFWriter(Writer):
+    """
+    Writes variables into a single chunked, compressed NetCDF4 file. Every file name passed to the writer denotes a
+    variable, which is named like the file without directory and extension. The number of bands of a variable is
+    interpreted as its number of time steps, so variables are laid out as time x y x x. Variables with a single band
+    have no time dimension. Chunks span the full time dimension, so that time series of single pixels can be read
+    with few chunk accesses.
+    """
+
+    def __init__(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
+                 num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None,
+                 output_file_name: Optional[str] = None, times: Optional[List[datetime]] = None,
+                 spatial_chunk_size: int = 32, compression_level: int = 4):
+        """
+        :param output_file_name: The name of the NetCDF file. If not given, the variables are written to a file
+        named 'multiply_output.nc' in the directory of the first file name.
+        :param times: The times of the time steps. If not given, the time steps are numbered.
+        :param spatial_chunk_size: The width and height of chunks.
+        :param compression_level: The zlib compression level, between 1 and 9.
+        """
+        self._output_file_name = output_file_name
+        self._times = times
+        self._spatial_chunk_size = spatial_chunk_size
+        self._compression_level = compression_level
+        super().__init__(file_names, geo_transform, projection, width, height, num_bands, data_types)
+
+    def init(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
+             num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None):
+        from netCDF4 import Dataset, date2num
+        if num_bands is None or len(num_bands) == 0:
+            num_bands = [1] * len(file_names)
+        elif len(num_bands) != len(file_names):
+            raise ValueError('List with number of bands must be of same size as list of file names')
+        self.num_bands = num_bands
+        if data_types is None or len(data_types) == 0:
+            data_types = ['Float'] * len(file_names)
+        elif len(data_types) != len(file_names):
+            raise ValueError('List with data types must be of same size as list of file names')
+        for data_type in data_types:
+            if data_type not in _NETCDF_DATA_TYPES:
+                raise ValueError('Data Type {} not supported.'.format(data_type))
+        num_time_steps = set([bands for bands in num_bands if bands > 1])
+        if len(num_time_steps) > 1:
+            raise ValueError('All variables with more than one band must have the same number of bands')
+        num_time_steps = num_time_steps.pop() if len(num_time_steps) > 0 else 1
+        if self._times is not None and len(self._times) != num_time_steps:
+            raise ValueError('Number of times must match the number of bands')
+        self._width = width
+        self._height = height
+        output_file_name = self._output_file_name
+        if output_file_name is None:
+            output_file_name = os.path.join(os.path.dirname(file_names[0]), DEFAULT_OUTPUT_FILE_NAME)
+        parent_dir = os.path.dirname(output_file_name)
+        if parent_dir != '' and not os.path.exists(parent_dir):
+            os.makedirs(parent_dir)
+        self._data_set = Dataset(output_file_name, 'w', format='NETCDF4')
+        self._data_set.createDimension('time', num_time_steps)
+        self._data_set.createDimension('y', height)
+        self._data_set.createDimension('x', width)
+        x = self._data_set.createVariable('x', 'f8', ('x',))
+        x[:] = geo_transform[0] + (np.arange(width) + 0.5) * geo_transform[1]
+        y = self._data_set.createVariable('y', 'f8', ('y',))
+        y[:] = geo_transform[3] + (np.arange(height) + 0.5) * geo_transform[5]
+        time = self._data_set.createVariable('time', 'f8', ('time',))
+        if self._times is not None:
+            time.units = _TIME_UNITS
+            time[:] = date2num(self._times, _TIME_UNITS)
+        else:
+            time[:] = np.arange(num_time_steps)
+        crs = self._data_set.createVariable('crs', 'i4')
+        crs.spatial_ref = projection
+        crs.crs_wkt = projection
+        crs.GeoTransform = ' '.join([str(value) for value in geo_transform])
+        self._variables = []
+        for i, file_name in enumerate(file_names):
+            variable_name = os.path.splitext(os.path.basename(file_name))[0]
+            if num_bands[i] > 1:
+                dimensions = ('time', 'y', 'x')
+                chunk_sizes = (num_time_steps, min(self._spatial_chunk_size, height),
+                               min(self._spatial_chunk_size, width))
+            else:
+                dimensions = ('y', 'x')
+                chunk_sizes = (min(self._spatial_chunk_size, height), min(self._spatial_chunk_size, width))
+            variable = self._data_set.createVariable(variable_name, _NETCDF_DATA_TYPES[data_types[i]], dimensions,
+                                                     zlib=True, complevel=self._compression_level, shuffle=True,
+                                                     chunksizes=chunk_sizes)
+            variable.grid_mapping = 'crs'
+            self._variables.append(variable)
+
+    def write(self, data: List[np.array], width: Optional[int] = None, height: Optional[int] = None,
+              offset_x: Optional[int] = 0, offset_y: Optional[int] = 0):
+        assert len(data) == len(self._variables)
+        if width is None:
+            width = self._width
+        if height is None:
+            height = self._height
+        for i, d in enumerate(data):
+            self._check_shape(i, d, width, height)
+            d = d.reshape((self.num_bands[i], height, width) if self.num_bands[i] > 1 else (height, width))
+            if self.num_bands[i] > 1:
+                self._variables[i][:, offset_y:offset_y + height, offset_x:offset_x + width] = d
+            else:
+                self._variables[i][offset_y:offset_y + height, offset_x:offset_x + width] = d
+
+    def close(self):
+        if self._data_set is None:
+            # already closed
+            return
+        self._data_set.close()
+        self._data_set = None
+        self._variables = None
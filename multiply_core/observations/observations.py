@@ -12,7 +12,7 @@ import pkg_resources
 import scipy.sparse as sp
 from typing import List, Optional, Union
 
-from multiply_core.util import FileRef, Reprojection, get_time_from_string
+from multiply_core.util import FileRef, FileRefTable, Reprojection, get_time_from_string
 
 __author__ = "Tonio Fincke (Brockmann Consult GmbH)"
 
@@ -115,9 +115,10 @@ class ObservationsWrapper(object):
         self.dates = []  # datetime objects
         self.bands_per_observation = {}
 
-    def add_observations(self, product_observations: ProductObservations, date: str):
+    def add_observations(self, product_observations: ProductObservations, date: Union[str, datetime]):
         bands_per_observation = product_observations.bands_per_observation
-        date = get_time_from_string(date)
+        if isinstance(date, str):
+            date = get_time_from_string(date)
         self.dates.append(date)
         self._observations[date] = product_observations
         self.bands_per_observation[date] = bands_per_observation
@@ -178,20 +179,29 @@ class ObservationsFactory(object):
                 observations = observations_creator.create_observations(file_ref, reprojection, emulator_folder)
                 return observations
 
-    def create_observations(self, file_refs: List[FileRef], reprojection: Optional[Reprojection] = None,
-                            emulator_folder: Optional[str] = None) -> \
+    def create_observations(self, file_refs: Union[List[FileRef], FileRefTable],
+                            reprojection: Optional[Reprojection] = None, emulator_folder: Optional[str] = None) -> \
             ObservationsWrapper:
         observations_wrapper = ObservationsWrapper()
-        self.sort_file_ref_list(file_refs)
+        if isinstance(file_refs, FileRefTable):
+            file_refs.sort()
+        else:
+            self.sort_file_ref_list(file_refs)
         for file_ref in file_refs:
             observations = self._create_observations(file_ref, reprojection, emulator_folder)
             if observations is not None:
-                observations_wrapper.add_observations(observations, file_ref.start_time)
+                observations_wrapper.add_observations(observations, file_ref.start_datetime)
         return observations_wrapper
 
     @staticmethod
-    def _start_time(file_ref: FileRef):
-        return file_ref.start_time
+    def _start_time(file_ref: FileRef) -> tuple:
+        # the parsed start time is cached by the file ref, so every string is parsed only once. File refs with start
+        # times that cannot be parsed are sorted after all others, by their start time strings.
+        try:
+            start_datetime = file_ref.start_datetime
+        except ValueError:
+            return True, file_ref.start_time
+        return False, datetime.min if start_datetime is None else start_datetime
 
     def sort_file_ref_list(self, file_refs: List[FileRef]):
         file_refs.sort(key=self._start_time)
@@ -1,11 +1,44 @@
 from abc import ABCMeta, abstractmethod
+from functools import lru_cache
 import gdal
 import numpy as np
 import os
-from typing import List, Optional
+import queue
+import threading
+import time
+from typing import Callable, List, Optional, Union
+
+from multiply_core.util import GeoTiffProfile, WriterMetrics, convert_to_cloud_optimized_geotiff, \
+    get_geotiff_profile
 
 __author__ = "Tonio Fincke (Brockmann Consult GmbH)"
 
+_NUMPY_DATA_TYPES = {gdal.GDT_Float32: np.float32, gdal.GDT_Float64: np.float64, gdal.GDT_Int32: np.int32,
+                     gdal.GDT_Int16: np.int16, gdal.GDT_UInt16: np.uint16, gdal.GDT_Byte: np.uint8}
+
+
+def _can_write_from_buffer() -> bool:
+    # older gdal versions only accept bytes, newer ones any object supporting the buffer protocol
+    data_set = gdal.GetDriverByName('MEM').Create('', 1, 1, 1, gdal.GDT_Byte)
+    try:
+        data_set.WriteRaster(0, 0, 1, 1, np.zeros(1, dtype=np.uint8))
+        return True
+    except TypeError:
+        return False
+
+
+_WRITE_FROM_BUFFER = _can_write_from_buffer()
+_LAYOUT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=_LAYOUT_CACHE_SIZE)
+def _get_layouts(bands: int, width: int, height: int) -> frozenset:
+    # the shapes in which data may be passed are determined only once per chunk size
+    layouts = {(bands, width * height), (bands, height, width)}
+    if bands == 1:
+        layouts.update({(width * height,), (height, width)})
+    return frozenset(layouts)
+
 
 class Writer(metaclass=ABCMeta):
 
@@ -27,9 +60,89 @@ class Writer(metaclass=ABCMeta):
     def close(self):
         pass
 
+    def _check_shape(self, index: int, data: np.array, width: int, height: int):
+        # the same rules apply to all writers: data for several bands must have a band axis
+        if data.shape not in _get_layouts(self.num_bands[index], width, height):
+            raise ValueError('Data of shape {} cannot be written as {} band(s) of {}x{} pixels'.format(
+                data.shape, self.num_bands[index], width, height))
+
+    def get_metrics(self) -> dict:
+        """
+        :return: The metrics of the output files, if the writer collects them. See WriterMetrics.get_metrics.
+        """
+        return {}
+
+
+class _WriteWorker(threading.Thread):
+    """A thread that performs write tasks from a bounded queue. The first error is kept and later tasks are skipped."""
+
+    def __init__(self, queue_size: int):
+        super().__init__(daemon=True)
+        self._tasks = queue.Queue(maxsize=queue_size)
+        self.error = None
+
+    def submit(self, task: Optional[Callable]):
+        # blocks while the queue is full, so that callers cannot run ahead of the disk
+        self._tasks.put(task)
+
+    def run(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                break
+            if self.error is None:
+                try:
+                    task()
+                except Exception as e:
+                    self.error = e
+
 
 class GeoTiffWriter(Writer):
 
+    def __init__(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
+                 num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None,
+                 asynchronous: bool = False, queue_size: int = 4, num_workers: int = 1,
+                 profile: Union[str, GeoTiffProfile, None] = None, cloud_optimized: bool = False,
+                 overview_resampling: str = 'average', metrics: Optional[WriterMetrics] = None,
+                 scales: Optional[List[Union[float, List[float], None]]] = None,
+                 offsets: Optional[List[Union[float, List[float], None]]] = None,
+                 no_data_values: Optional[List[Union[float, List[float], None]]] = None):
+        """
+        :param asynchronous: If true, data is compressed and written by background threads while the caller
+        continues. Data passed to write is copied, so callers may reuse their buffers.
+        :param queue_size: The number of writes each background thread may lag behind before write blocks.
+        :param num_workers: The number of background threads. Each output file is always written by the same thread.
+        :param profile: The GeoTIFF profile which determines compression, block size and the number of compression
+        threads. Either a GeoTiffProfile or the name of one of the presets 'default', 'fast', 'small' and
+        'uncompressed'.
+        :param cloud_optimized: If true, the files are turned into cloud optimized GeoTIFFs with internal overviews
+        when the writer is closed.
+        :param overview_resampling: The resampling method used to compute the overviews of cloud optimized GeoTIFFs.
+        :param metrics: If given, the blocks and bytes written and the time spent writing and closing are added to it
+        for each output file.
+        :param scales: For each output file, the scale with which values are packed, either for all bands or as a
+        list with one scale per band, or None. Float data is written as round((value - offset) / scale) when the
+        output has an integer data type ('Int', 'Int16', 'UInt16' or 'Byte'), and as (value - offset) / scale
+        otherwise. Scale and offset are set as band metadata, so readers can unpack the values.
+        :param offsets: For each output file, the offset with which values are packed, in the same form as the scales.
+        :param no_data_values: For each output file, the no data value, in the same form as the scales. NaN values
+        are written as the no data value.
+        """
+        self._scales = scales
+        self._offsets = offsets
+        self._no_data_values = no_data_values
+        self._profile = get_geotiff_profile(profile)
+        self._cloud_optimized = cloud_optimized
+        self._overview_resampling = overview_resampling
+        self._metrics = metrics
+        self._write_from_buffer = _WRITE_FROM_BUFFER
+        self._workers = []
+        super().__init__(file_names, geo_transform, projection, width, height, num_bands, data_types)
+        if asynchronous:
+            self._workers = [_WriteWorker(queue_size) for _ in range(max(1, min(num_workers, len(file_names))))]
+            for worker in self._workers:
+                worker.start()
+
     def init(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
              num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None):
         if num_bands is None or len(num_bands) == 0:
@@ -44,10 +157,19 @@ class GeoTiffWriter(Writer):
         gdal_data_types = []
         for data_type in data_types:
             gdal_data_types.append(self._get_gdal_data_type(data_type))
+        self._gdal_data_types = gdal_data_types
+        self._numpy_data_types = [_NUMPY_DATA_TYPES[gdal_data_type] for gdal_data_type in gdal_data_types]
+        self._band_lists = [list(range(1, bands + 1)) for bands in num_bands]
+        scales = self._get_band_values(self._scales, num_bands, 'scales')
+        offsets = self._get_band_values(self._offsets, num_bands, 'offsets')
+        no_data_values = self._get_band_values(self._no_data_values, num_bands, 'no data values')
+        self._packings = [self._get_packing(scales[i], offsets[i], no_data_values[i], self._numpy_data_types[i])
+                          for i in range(len(file_names))]
         self._width = width
         self._height = height
         drv = gdal.GetDriverByName('GTiff')
         self._destination_data_sets = []
+        self._file_names = []
         for i, file_name in enumerate(file_names):
             parent_dir = os.path.dirname(file_name)
             if not os.path.exists(parent_dir):
@@ -55,10 +177,19 @@ class GeoTiffWriter(Writer):
             if not file_name.endswith('.tif') and not file_name.endswith('tiff'):
                 file_name = file_name + '.tif'
             data_set = drv.Create(file_name, width, height, num_bands[i], gdal_data_types[i],
-                                  ['COMPRESS=DEFLATE', 'BIGTIFF=YES', 'PREDICTOR=1', 'TILED=YES'])
+                                  self._profile.get_creation_options(gdal_data_types[i]))
             data_set.SetProjection(projection)
             data_set.SetGeoTransform(geo_transform)
+            for band_index in range(num_bands[i]):
+                band = data_set.GetRasterBand(band_index + 1)
+                if scales[i] is not None:
+                    band.SetScale(float(scales[i][band_index]))
+                if offsets[i] is not None:
+                    band.SetOffset(float(offsets[i][band_index]))
+                if no_data_values[i] is not None:
+                    band.SetNoDataValue(float(no_data_values[i][band_index]))
             self._destination_data_sets.append(data_set)
+            self._file_names.append(file_name)
 
     @staticmethod
     def _get_gdal_data_type(data_type: str) -> str:
@@ -68,30 +199,142 @@ class GeoTiffWriter(Writer):
             return gdal.GDT_Float64
         elif data_type == 'Int':
             return gdal.GDT_Int32
+        elif data_type == 'Int16':
+            return gdal.GDT_Int16
+        elif data_type == 'UInt16':
+            return gdal.GDT_UInt16
+        elif data_type == 'Byte':
+            return gdal.GDT_Byte
         raise ValueError('Data Type {} not supported.'.format(data_type))
 
     def write(self, data: List[np.array], width: Optional[int] = None, height: Optional[int] = None,
               offset_x: Optional[int] = 0, offset_y: Optional[int] = 0):
         assert len(data) == len(self._destination_data_sets)
+        self._raise_worker_error()
         if width is None:
             width = self._width
         if height is None:
             height = self._height
         for i, d in enumerate(data):
-            if d.shape == (width * height, ):
-                d = d.reshape(height, width)
-            elif d.shape == (self.num_bands[i], width * height):
-                d = d.reshape(self.num_bands[i], height, width)
-            if d.shape == (self.num_bands[i], height, width) and self.num_bands[i] == 1:
-                d = d.reshape(height, width)
-            assert d.shape == (height, width) or d.shape == (self.num_bands[i], height, width)
-            if self.num_bands[i] > 1:
-                for band in range(self.num_bands[i]):
-                    self._destination_data_sets[i].GetRasterBand(band + 1).WriteArray(d[band])
+            self._check_shape(i, d, width, height)
+            if self._packings[i] is not None and np.issubdtype(d.dtype, np.floating):
+                d = self._pack(d, i)
             else:
-                self._destination_data_sets[i].GetRasterBand(1).WriteArray(d)
+                # a view if the data is already C-contiguous and of the output type, a copy otherwise
+                d = np.ascontiguousarray(d, dtype=self._numpy_data_types[i])
+            if len(self._workers) > 0:
+                if np.may_share_memory(d, data[i]):
+                    d = d.copy()
+                self._workers[i % len(self._workers)].submit(self._get_write_task(i, d, width, height, offset_x,
+                                                                                  offset_y))
+            else:
+                self._write_data_set(i, d, width, height, offset_x, offset_y)
+
+    @staticmethod
+    def _get_band_values(values: Optional[List[Union[float, List[float], None]]], num_bands: List[int],
+                         name: str) -> List[Optional[np.array]]:
+        if values is None:
+            return [None] * len(num_bands)
+        if len(values) != len(num_bands):
+            raise ValueError('List with {} must be of same size as list of file names'.format(name))
+        band_values = []
+        for i, value in enumerate(values):
+            if value is None:
+                band_values.append(None)
+                continue
+            value = np.array(value, dtype=np.float64).ravel()
+            if value.size == 1:
+                value = np.repeat(value, num_bands[i])
+            elif value.size != num_bands[i]:
+                raise ValueError('Expected one or {} {}, got {}'.format(num_bands[i], name, value.size))
+            band_values.append(value)
+        return band_values
+
+    @staticmethod
+    def _get_packing(scales: Optional[np.array], offsets: Optional[np.array], no_data_values: Optional[np.array],
+                     numpy_data_type: type) -> Optional[tuple]:
+        is_integer = np.issubdtype(numpy_data_type, np.integer)
+        if scales is None and offsets is None and not is_integer:
+            return None
+        if scales is None:
+            scales = np.ones(1)
+        if offsets is None:
+            offsets = np.zeros(1)
+        if is_integer:
+            minimum, maximum = np.iinfo(numpy_data_type).min, np.iinfo(numpy_data_type).max
+            if no_data_values is not None:
+                # valid values which saturate must not turn into no data values at the limits of the range
+                minimum = np.where(no_data_values == minimum, minimum + 1, minimum)[:, np.newaxis]
+                maximum = np.where(no_data_values == maximum, maximum - 1, maximum)[:, np.newaxis]
+            value_range = (minimum, maximum)
+        else:
+            value_range = None
+        return scales[:, np.newaxis], offsets[:, np.newaxis], no_data_values, value_range
+
+    def _pack(self, data: np.array, index: int) -> np.array:
+        # all layouts are packed as bands x pixels, so that scales and offsets broadcast over the bands
+        scales, offsets, no_data_values, value_range = self._packings[index]
+        packed = data.reshape(self.num_bands[index], -1) - offsets.astype(data.dtype)
+        packed /= scales.astype(data.dtype)
+        if value_range is not None:
+            np.rint(packed, out=packed)
+            np.clip(packed, value_range[0], value_range[1], out=packed)
+        invalid = np.isnan(packed)
+        if no_data_values is not None:
+            packed[invalid] = np.broadcast_to(no_data_values[:, np.newaxis], packed.shape)[invalid]
+        elif value_range is not None:
+            packed[invalid] = 0
+        return packed.astype(self._numpy_data_types[index])
+
+    def _get_write_task(self, index: int, data: np.array, width: int, height: int, offset_x: int,
+                        offset_y: int) -> Callable:
+        return lambda: self._write_data_set(index, data, width, height, offset_x, offset_y)
+
+    def _write_data_set(self, index: int, data: np.array, width: int, height: int, offset_x: int, offset_y: int):
+        start = time.perf_counter()
+        self._write_raster(index, data, width, height, offset_x, offset_y)
+        if self._metrics is not None:
+            self._metrics.add_write(self._file_names[index], data.nbytes, time.perf_counter() - start)
+
+    def _write_raster(self, index: int, data: np.array, width: int, height: int, offset_x: int, offset_y: int):
+        # all bands are written with a single call, directly from the buffer of the array if gdal supports it
+        buffer = data if self._write_from_buffer else data.tobytes()
+        error = self._destination_data_sets[index].WriteRaster(offset_x, offset_y, width, height, buffer,
+                                                               buf_type=self._gdal_data_types[index],
+                                                               band_list=self._band_lists[index])
+        # without gdal.UseExceptions, failures such as windows out of bounds are only reported by the return code
+        if error != gdal.CE_None:
+            raise IOError('Could not write to {}: {}'.format(self._file_names[index], gdal.GetLastErrorMsg()))
+
+    def _raise_worker_error(self):
+        for worker in self._workers:
+            if worker.error is not None:
+                raise worker.error
 
     def close(self):
-        for dataset in self._destination_data_sets:
-            dataset = None
+        if self._destination_data_sets is None:
+            # already closed
+            return
+        for worker in self._workers:
+            worker.submit(None)
+        for worker in self._workers:
+            worker.join()
+        for i, file_name in enumerate(self._file_names):
+            start = time.perf_counter()
+            # releasing a dataset flushes and closes it
+            self._destination_data_sets[i] = None
+            self._add_close_metrics(file_name, start)
         self._destination_data_sets = None
+        self._raise_worker_error()
+        if self._cloud_optimized:
+            for file_name in self._file_names:
+                convert_to_cloud_optimized_geotiff(file_name, self._overview_resampling, self._profile, self._metrics)
+
+    def _add_close_metrics(self, file_name: str, start: float):
+        if self._metrics is not None:
+            self._metrics.add_close(file_name, time.perf_counter() - start)
+
+    def get_metrics(self) -> dict:
+        if self._metrics is None:
+            return {}
+        return self._metrics.get_metrics()
@@ -0,0 +1,137 @@
+"""
+Description
+===========
+
+This module contains a writer that allows processes of a pool to write the tiles of one output in parallel.
+"""
+import gdal
+import glob
+import numpy as np
+import os
+import shutil
+from typing import List, Optional, Union
+
+from multiply_core.observations.output import GeoTiffWriter, Writer
+from multiply_core.util import GeoTiffProfile, get_geotiff_profile
+
+__author__ = "MULTIPLY Team"
+
+_TILE_DIR_EXTENSION = '.tiles'
+# values for areas of the outputs which no tile covers
+_DEFAULT_NO_DATA_VALUES = {gdal.GDT_Float32: np.nan, gdal.GDT_Float64: np.nan, gdal.GDT_Int32: np.iinfo(np.int32).min,
+                           gdal.GDT_Int16: np.iinfo(np.int16).min, gdal.GDT_UInt16: np.iinfo(np.uint16).max,
+                           gdal.GDT_Byte: np.iinfo(np.uint8).max}
+
+
+class TiledGeoTiffWriter(Writer):
+    """
+    Writes GeoTIFFs from several processes at once. Every call to write stores its window in a tile file of its own,
+    so the writer holds no open datasets and can be passed to the processes of a pool, which then compute and write
+    their tiles independently. When the writer is closed, the tiles of each output are combined through a VRT into
+    the final GeoTIFF. The writer must be closed once, by the coordinating process, after all tiles have been written.
+    Areas of the outputs which no tile covers are set to the no data value.
+    """
+
+    def __init__(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
+                 num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None,
+                 profile: Union[str, GeoTiffProfile, None] = None, no_data_values: Optional[List[float]] = None):
+        """
+        :param profile: The GeoTIFF profile of the final outputs. Either a GeoTiffProfile or the name of one of the
+        presets 'default', 'fast', 'small' and 'uncompressed'. Tile files are not compressed.
+        :param no_data_values: For each output file, the no data value. If not given, NaN is used for float data, the
+        minimum for signed and the maximum for unsigned integer data.
+        """
+        if no_data_values is not None and len(no_data_values) != len(file_names):
+            raise ValueError('List with no data values must be of same size as list of file names')
+        self._no_data_values = no_data_values
+        self._profile = get_geotiff_profile(profile)
+        super().__init__(file_names, geo_transform, projection, width, height, num_bands, data_types)
+
+    def init(self, file_names: List[str], geo_transform: tuple, projection: str, width: int, height: int,
+             num_bands: Optional[List[int]] = None, data_types: Optional[List[str]] = None):
+        if num_bands is None or len(num_bands) == 0:
+            num_bands = [1] * len(file_names)
+        elif len(num_bands) != len(file_names):
+            raise ValueError('List with number of bands must be of same size as list of file names')
+        self.num_bands = num_bands
+        if data_types is None or len(data_types) == 0:
+            data_types = ['Float'] * len(file_names)
+        elif len(data_types) != len(file_names):
+            raise ValueError('List with data types must be of same size as list of file names')
+        self._gdal_data_types = [GeoTiffWriter._get_gdal_data_type(data_type) for data_type in data_types]
+        if self._no_data_values is None:
+            self._no_data_values = [_DEFAULT_NO_DATA_VALUES[data_type] for data_type in self._gdal_data_types]
+        self._geo_transform = geo_transform
+        self._projection = projection
+        self._width = width
+        self._height = height
+        self._file_names = []
+        for file_name in file_names:
+            if not file_name.endswith('.tif') and not file_name.endswith('tiff'):
+                file_name = file_name + '.tif'
+            tile_dir = file_name + _TILE_DIR_EXTENSION
+            if not os.path.exists(tile_dir):
+                os.makedirs(tile_dir)
+            self._file_names.append(file_name)
+
+    def write(self, data: List[np.array], width: Optional[int] = None, height: Optional[int] = None,
+              offset_x: Optional[int] = 0, offset_y: Optional[int] = 0):
+        assert len(data) == len(self._file_names)
+        if width is None:
+            width = self._width
+        if height is None:
+            height = self._height
+        geo_t = self._geo_transform
+        tile_geo_transform = (geo_t[0] + offset_x * geo_t[1] + offset_y * geo_t[2], geo_t[1], geo_t[2],
+                              geo_t[3] + offset_x * geo_t[4] + offset_y * geo_t[5], geo_t[4], geo_t[5])
+        drv = gdal.GetDriverByName('GTiff')
+        for i, d in enumerate(data):
+            self._check_shape(i, d, width, height)
+            d = d.reshape(self.num_bands[i], height, width)
+            tile_file_name = os.path.join(self._file_names[i] + _TILE_DIR_EXTENSION,
+                                          'tile_{}_{}.tif'.format(offset_y, offset_x))
+            # tiles are written under a temporary name, so that close never picks up incomplete tiles
+            temporary_file_name = '{}.{}.tmp'.format(tile_file_name, os.getpid())
+            data_set = drv.Create(temporary_file_name, width, height, self.num_bands[i], self._gdal_data_types[i],
+                                  ['TILED=YES'])
+            data_set.SetProjection(self._projection)
+            data_set.SetGeoTransform(tile_geo_transform)
+            for band in range(self.num_bands[i]):
+                data_set.GetRasterBand(band + 1).WriteArray(d[band])
+            data_set = None
+            os.replace(temporary_file_name, tile_file_name)
+
+    def close(self):
+        geo_t = self._geo_transform
+        x_0, x_1 = geo_t[0], geo_t[0] + self._width * geo_t[1]
+        y_0, y_1 = geo_t[3], geo_t[3] + self._height * geo_t[5]
+        bounds = [min(x_0, x_1), min(y_0, y_1), max(x_0, x_1), max(y_0, y_1)]
+        for i, file_name in enumerate(self._file_names):
+            tile_dir = file_name + _TILE_DIR_EXTENSION
+            tile_file_names = sorted(glob.glob(os.path.join(tile_dir, 'tile_*.tif')))
+            creation_options = self._profile.get_creation_options(self._gdal_data_types[i])
+            no_data_value = float(self._no_data_values[i])
+            if len(tile_file_names) == 0:
+                # gdal cannot build a VRT without sources
+                self._create_empty_output(i, creation_options)
+            else:
+                vrt_options = gdal.BuildVRTOptions(outputBounds=bounds, xRes=abs(geo_t[1]), yRes=abs(geo_t[5]),
+                                                   VRTNodata=no_data_value)
+                vrt_data_set = gdal.BuildVRT('', tile_file_names, options=vrt_options)
+                data_set = gdal.Translate(file_name, vrt_data_set, creationOptions=creation_options,
+                                          noData=no_data_value)
+                data_set = None
+                vrt_data_set = None
+            shutil.rmtree(tile_dir)
+
+    def _create_empty_output(self, index: int, creation_options: List[str]):
+        no_data_value = float(self._no_data_values[index])
+        data_set = gdal.GetDriverByName('GTiff').Create(self._file_names[index], self._width, self._height,
+                                                        self.num_bands[index], self._gdal_data_types[index],
+                                                        creation_options)
+        data_set.SetProjection(self._projection)
+        data_set.SetGeoTransform(self._geo_transform)
+        for band in range(self.num_bands[index]):
+            data_set.GetRasterBand(band + 1).SetNoDataValue(no_data_value)
+            data_set.GetRasterBand(band + 1).Fill(no_data_value)
+        data_set = None
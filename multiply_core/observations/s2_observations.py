@@ -1,4 +1,4 @@
-from gdal import Open
+from gdal import BuildVRT, Open
 import _pickle as cPickle
 import glob
 import os
@@ -9,7 +9,7 @@ import xml.etree.ElementTree as eT
 from multiply_core.observations import ProductObservations, ObservationData, ProductObservationsCreator, \
     data_validation
 from multiply_core.util import FileRef, Reprojection
-from typing import Optional, Tuple, Union
+from typing import List, Optional, Tuple, Union
 
 __author__ = "Tonio Fincke (Brockmann Consult GmbH)"
 
@@ -140,6 +140,38 @@ class S2Observations(ProductObservations):
                                            metadata=self._meta_data_infos, emulator=band_emulator)
         return observation_data
 
+    def get_stacked_band_data(self, band_indexes: List[int]) -> np.array:
+        """
+        Returns the data of several bands as one array. Bands that share a resolution are stacked into a single VRT
+        and reprojected in one warp, so that grid setup and source reads are shared between them.
+        :param band_indexes: The indexes of the bands within the product.
+        :return: An array of shape (bands, height, width) with the bands in the order of the given indexes. Invalid
+        pixels are set to the no data value of the respective band.
+        """
+        band_data = [None] * len(band_indexes)
+        for positions in self._group_by_grid(band_indexes):
+            data_set_urls = [self._get_data_set_url(band_indexes[position]) for position in positions]
+            data_set = BuildVRT('', data_set_urls, separate=True)
+            if self._reprojection is not None:
+                data_set = self._reprojection.reproject(data_set)
+            data = data_set.ReadAsArray().reshape(len(positions), data_set.RasterYSize, data_set.RasterXSize)
+            for i, position in enumerate(positions):
+                band_data[position] = data[i]
+        if len(set(data.shape for data in band_data)) > 1:
+            raise ValueError('Bands of different resolutions can only be stacked when a reprojection is set')
+        data = np.stack(band_data)
+        mask = data > 0
+        no_data_values = np.array([self._no_data_values[band_index] for band_index in band_indexes])
+        return np.where(mask, data / 10000., no_data_values[:, np.newaxis, np.newaxis])
+
+    def _group_by_grid(self, band_indexes: List[int]) -> List[List[int]]:
+        grids = {}
+        for position, band_index in enumerate(band_indexes):
+            data_set = Open(self._get_data_set_url(band_index))
+            grid = (data_set.GetGeoTransform(), data_set.RasterXSize, data_set.RasterYSize)
+            grids.setdefault(grid, []).append(position)
+        return list(grids.values())
+
     def _get_band_emulator(self, band_index: int):
         if self._band_emulators is not None:
             s2_band = bytes("S2A_MSI_{:02d}".format(EMULATOR_BAND_MAP[band_index]), 'latin1')
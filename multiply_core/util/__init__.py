@@ -1,6 +1,17 @@
 from .util import AttributeDict, FileRef, compute_distance, get_time_from_string, get_days_of_month, \
     get_time_from_year_and_day_of_year, is_leap_year, get_mime_type, block_diag, are_times_equal, \
-    are_polygons_almost_equal, get_logger
+    are_polygons_almost_equal, get_logger, blocks_to_sparse, cholesky_blocks, invert_blocks, multiply_blocks, \
+    solve_blocks
+from .config import Config
+from .dates import get_days_of_months, get_times_from_day_of_year_tokens, get_times_from_years_and_days_of_year, \
+    is_leap_years
+from .mime_types import MimeTypeDetector, get_mime_types
+from .distances import NearestPointFinder, compute_distance_matrix, compute_distances
+from .roi import RegionOfInterest, are_rings_almost_equal, get_region_of_interest, intersect_bounds, normalize_ring
 from .reproject import transform_coordinates, get_spatial_reference_system_from_dataset, get_target_resolutions, \
-    reproject_dataset, reproject_image, Reprojection
+    reproject_dataset, reproject_image, reproject_to_grid, Reprojection, TargetGrid
+from .reprojection_cache import ReprojectionCache
+from .write import GeoTiffProfile, WriterMetrics, convert_to_cloud_optimized_geotiff, get_geotiff_profile, \
+    write_gdal_raster
+from .file_ref_table import FileRefTable
 from .file_ref_creation import FileRefCreation
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Description
+===========
+
+This module contains a mapping type for configurations, e.g. as loaded from YAML files. Unlike AttributeDict, it does
+not convert nested dictionaries when it is created, but wraps them when they are accessed. Entries can be looked up by
+dotted paths, and configurations can be frozen to make them immutable.
+"""
+
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Iterator, Optional, Tuple, Union
+
+__author__ = "MULTIPLY Team"
+
+_PATH_CACHE_SIZE = 4096
+_MISSING = object()
+
+
+@lru_cache(maxsize=_PATH_CACHE_SIZE)
+def _split_path(path: str) -> Tuple[str, ...]:
+    # dotted paths are split once and then reused for every lookup
+    return tuple(path.split('.'))
+
+
+class Config(Mapping):
+    """
+    A view on a nested dictionary. Entries can be accessed by key (config['key']), by attribute
+    (config.key) or by dotted path (config.get_entry('key.nested_key')). Nested dictionaries are returned as Config
+    objects, which are created on first access and then kept. Values can be set as long as the config is not frozen.
+    """
+    __slots__ = ('_entries', '_children', '_frozen')
+
+    def __init__(self, entries: Optional[dict] = None, frozen: bool = False, **kwargs):
+        """
+        :param entries: The entries of the configuration. The dictionary is used as is, it is not copied.
+        :param frozen: If true, the configuration is immutable
+        :param kwargs: Further entries
+        """
+        if entries is None:
+            entries = {}
+        if len(kwargs) > 0:
+            entries = dict(entries, **kwargs)
+        object.__setattr__(self, '_entries', entries)
+        object.__setattr__(self, '_children', {})
+        object.__setattr__(self, '_frozen', frozen)
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
+    def freeze(self) -> 'Config':
+        """
+        Makes this configuration and all configurations nested in it immutable.
+        :return: This configuration
+        """
+        object.__setattr__(self, '_frozen', True)
+        for child in self._children.values():
+            child.freeze()
+        return self
+
+    def _wrap(self, key: Union[str, Tuple[str, ...]], value: Any) -> Any:
+        if type(value) is not dict:
+            return value
+        child = self._children.get(key)
+        if child is None or child._entries is not value:
+            child = Config(value, self._frozen)
+            self._children[key] = child
+        return child
+
+    def __getitem__(self, key: str) -> Any:
+        return self._wrap(key, self._entries[key])
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            # private and special names are never looked up as entries, e.g. by copy or pickle
+            raise AttributeError(name)
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError('Config has no entry {}'.format(name))
+
+    def __setitem__(self, key: str, value: Any):
+        if self._frozen:
+            raise TypeError('Config is frozen, entry {} cannot be set'.format(key))
+        self._entries[key] = value
+        self._children.pop(key, None)
+
+    def __setattr__(self, name: str, value: Any):
+        self[name] = value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __repr__(self) -> str:
+        return 'Config({!r})'.format(self._entries)
+
+    def __getstate__(self):
+        return self._entries, self._frozen
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def get_entry(self, path: str, default: Any = None) -> Any:
+        """
+        :param path: The keys of the entry, separated by dots, e.g. 'inference.optimization.method'
+        :param default: The value returned if there is no such entry
+        :return: The entry or the default value
+        """
+        keys = _split_path(path)
+        value = self._entries
+        for key in keys:
+            if type(value) is not dict:
+                return default
+            value = value.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+        # nested configs are kept by their path, so that they are wrapped only once
+        return self._wrap(keys[0] if len(keys) == 1 else keys, value)
+
+    def has_entry(self, path: str) -> bool:
+        """
+        :param path: The keys of the entry, separated by dots, e.g. 'inference.optimization.method'
+        :return: True if there is an entry at the path
+        """
+        entries = self._entries
+        for key in _split_path(path):
+            if type(entries) is not dict or key not in entries:
+                return False
+            entries = entries[key]
+        return True
+
+    def to_dict(self) -> dict:
+        """
+        :return: A deep copy of the entries as nested dictionaries
+        """
+        return _copy_dict(self._entries)
+
+
+def _copy_dict(entries: dict) -> dict:
+    return {key: _copy_dict(value) if type(value) is dict else value for key, value in entries.items()}
@@ -0,0 +1,88 @@
+"""
+Description
+===========
+
+This module contains vectorized calendar functions. They determine leap years, lengths of months and dates from years
+and days of year for whole arrays at once, e.g. for all 'AYYYYDDD' tokens of a listing of MODIS files.
+"""
+
+import numpy as np
+
+__author__ = "MULTIPLY Team"
+
+_DAYS_PER_MONTH = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+_SECONDS_PER_DAY = 86400
+_DAY_OF_YEAR_TOKEN_LENGTH = 8
+_DAY_OF_YEAR_TOKEN_PREFIX = ord('A')
+_YEAR_DIGIT_WEIGHTS = np.array([1000, 100, 10, 1], dtype=np.int64)
+_DAY_OF_YEAR_DIGIT_WEIGHTS = np.array([100, 10, 1], dtype=np.int64)
+
+
+def is_leap_years(years: np.array) -> np.array:
+    """
+    :param years: The years
+    :return: A boolean array which is true for the leap years
+    """
+    years = np.asarray(years, dtype=np.int64)
+    return (years % 4 == 0) & ((years % 100 != 0) | (years % 400 == 0))
+
+
+def get_days_of_months(years: np.array, months: np.array) -> np.array:
+    """
+    Determines the numbers of days of months. Years and months are broadcast against each other.
+    :param years: The years (required to determine whether they are leap years)
+    :param months: The months, from 1 to 12
+    :return: The numbers of days of the months
+    """
+    months = np.asarray(months, dtype=np.int64)
+    invalid = (months < 1) | (months > 12)
+    if np.any(invalid):
+        raise ValueError('Invalid month: {}'.format(months[invalid].flat[0]))
+    return _DAYS_PER_MONTH[months - 1] + ((months == 2) & is_leap_years(years))
+
+
+def get_times_from_years_and_days_of_year(years: np.array, days_of_year: np.array,
+                                          set_to_end: bool = False) -> np.array:
+    """
+    Converts years and days of year into times. Years and days of year are broadcast against each other.
+    :param years: The years
+    :param days_of_year: The days of year. Supposed to start with 1 for January 1st.
+    :param set_to_end: If true, the times will be set to the last second of the day; if False, to the first second.
+    False is the default.
+    :return: The times as datetime64 array with a resolution of seconds
+    """
+    years = np.asarray(years, dtype=np.int64)
+    days_of_year = np.asarray(days_of_year, dtype=np.int64)
+    invalid = (days_of_year < 1) | (days_of_year > 365 + is_leap_years(years))
+    if np.any(invalid):
+        raise ValueError('Invalid day of year: {}'.format(np.broadcast_to(days_of_year, invalid.shape)[invalid][0]))
+    days = (years - 1970).astype('datetime64[Y]').astype('datetime64[D]') + (days_of_year - 1)
+    times = days.astype('datetime64[s]')
+    if set_to_end:
+        times += np.timedelta64(_SECONDS_PER_DAY - 1, 's')
+    return times
+
+
+def get_times_from_day_of_year_tokens(tokens: np.array, set_to_end: bool = False) -> np.array:
+    """
+    Converts tokens of the form 'AYYYYDDD', as used in the names of MODIS files, into times. The tokens are parsed
+    digit by digit over the whole array, without handling any of them on its own.
+    :param tokens: The tokens, e.g. ['A2017238', 'A2017239']
+    :param set_to_end: If true, the times will be set to the last second of the day; if False, to the first second.
+    False is the default.
+    :return: The times as datetime64 array with a resolution of seconds, of the shape of the tokens
+    """
+    tokens = np.asarray(tokens, dtype=np.str_)
+    if tokens.size == 0:
+        return np.empty(tokens.shape, dtype='datetime64[s]')
+    if tokens.dtype.itemsize != _DAY_OF_YEAR_TOKEN_LENGTH * 4 or \
+            np.any(np.char.str_len(tokens) != _DAY_OF_YEAR_TOKEN_LENGTH):
+        raise ValueError('Day of year tokens must be of the form AYYYYDDD')
+    # unicode strings are stored as 4 byte code points, so each token can be viewed as a row of 8 characters
+    characters = np.ascontiguousarray(tokens).view(np.uint32).reshape(tokens.shape + (_DAY_OF_YEAR_TOKEN_LENGTH,))
+    digits = characters[..., 1:].astype(np.int64) - ord('0')
+    if np.any(characters[..., 0] != _DAY_OF_YEAR_TOKEN_PREFIX) or np.any((digits < 0) | (digits > 9)):
+        raise ValueError('Day of year tokens must be of the form AYYYYDDD')
+    years = digits[..., :4] @ _YEAR_DIGIT_WEIGHTS
+    days_of_year = digits[..., 4:] @ _DAY_OF_YEAR_DIGIT_WEIGHTS
+    return get_times_from_years_and_days_of_year(years, days_of_year, set_to_end)
@@ -0,0 +1,102 @@
+"""
+Description
+===========
+
+This module contains functions to compute great circle distances between many points at once, e.g., to match pixels
+to stations or tiles to regions of interest.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+from typing import Tuple
+
+__author__ = "MULTIPLY Team"
+
+
+def compute_distances(lons_0: np.array, lats_0: np.array, lons_1: np.array, lats_1: np.array,
+                      sphere_radius: float) -> np.array:
+    """
+    Computes great circle distances with the haversine formula, in float64. The coordinates are broadcast against each
+    other, so points can be compared pairwise or, by adding axes, each point of one set to each point of another.
+    The formula is stable for small distances as well as for nearly antipodal points.
+    :param lons_0: The longitudes of the first points in degrees
+    :param lats_0: The latitudes of the first points in degrees
+    :param lons_1: The longitudes of the second points in degrees
+    :param lats_1: The latitudes of the second points in degrees
+    :param sphere_radius: The radius of the sphere. The distances are given in its unit.
+    :return: The distances
+    """
+    lats_0_rad = np.deg2rad(lats_0, dtype=np.float64)
+    lats_1_rad = np.deg2rad(lats_1, dtype=np.float64)
+    delta_lons = np.deg2rad(lons_1, dtype=np.float64) - np.deg2rad(lons_0, dtype=np.float64)
+    a = np.sin((lats_1_rad - lats_0_rad) / 2) ** 2 + \
+        np.cos(lats_0_rad) * np.cos(lats_1_rad) * np.sin(delta_lons / 2) ** 2
+    # rounding may push a slightly above 1 for antipodal points
+    a = np.minimum(a, 1.)
+    return 2 * sphere_radius * np.arctan2(np.sqrt(a), np.sqrt(1. - a))
+
+
+def compute_distance_matrix(lons_0: np.array, lats_0: np.array, lons_1: np.array, lats_1: np.array,
+                            sphere_radius: float) -> np.array:
+    """
+    Computes the great circle distances from each of the first points to each of the second points.
+    :param lons_0: The longitudes of the first points in degrees. May be of any shape, e.g. a grid.
+    :param lats_0: The latitudes of the first points in degrees, of the same shape as their longitudes
+    :param lons_1: The longitudes of the second points in degrees. May be of any shape.
+    :param lats_1: The latitudes of the second points in degrees, of the same shape as their longitudes
+    :param sphere_radius: The radius of the sphere. The distances are given in its unit.
+    :return: The distances, in an array with the shape of the first points followed by the shape of the second points
+    """
+    lons_0 = np.asarray(lons_0)
+    lats_0 = np.asarray(lats_0)
+    if lons_0.shape != lats_0.shape:
+        raise ValueError('Longitudes and latitudes must be of the same shape')
+    expanded_shape = lons_0.shape + (1,) * np.ndim(lons_1)
+    return compute_distances(lons_0.reshape(expanded_shape), lats_0.reshape(expanded_shape), lons_1, lats_1,
+                             sphere_radius)
+
+
+def _to_unit_vectors(lons: np.array, lats: np.array) -> np.array:
+    lons_rad = np.deg2rad(np.asarray(lons, dtype=np.float64)).ravel()
+    lats_rad = np.deg2rad(np.asarray(lats, dtype=np.float64)).ravel()
+    cos_lats = np.cos(lats_rad)
+    return np.column_stack((cos_lats * np.cos(lons_rad), cos_lats * np.sin(lons_rad), np.sin(lats_rad)))
+
+
+class NearestPointFinder(object):
+    """
+    Finds the nearest of a set of points on a sphere. The points are converted to unit vectors and held in a KD-tree,
+    so that queries for many points take logarithmic time per point. Chord lengths found in the tree are converted back
+    to great circle distances.
+    """
+
+    def __init__(self, lons: np.array, lats: np.array, sphere_radius: float):
+        """
+        :param lons: The longitudes of the points in degrees
+        :param lats: The latitudes of the points in degrees, of the same shape as the longitudes
+        :param sphere_radius: The radius of the sphere. The distances are given in its unit.
+        """
+        if np.shape(lons) != np.shape(lats):
+            raise ValueError('Longitudes and latitudes must be of the same shape')
+        self._tree = cKDTree(_to_unit_vectors(lons, lats))
+        self._sphere_radius = sphere_radius
+
+    @property
+    def num_points(self) -> int:
+        return self._tree.n
+
+    def query(self, lons: np.array, lats: np.array, k: int = 1) -> Tuple[np.array, np.array]:
+        """
+        :param lons: The longitudes of the query points in degrees
+        :param lats: The latitudes of the query points in degrees, of the same shape as the longitudes
+        :param k: The number of nearest points to find for each query point
+        :return: The great circle distances to the nearest points and their indexes in the flattened point set. Both
+        have the shape of the query points, with an additional last axis of length k if k is greater than 1.
+        """
+        if k < 1 or k > self.num_points:
+            raise ValueError('k must be between 1 and the number of points ({}), is {}'.format(self.num_points, k))
+        shape = np.shape(lons)
+        chord_lengths, indexes = self._tree.query(_to_unit_vectors(lons, lats), k=k)
+        distances = 2 * self._sphere_radius * np.arcsin(np.clip(chord_lengths / 2, 0., 1.))
+        result_shape = shape if k == 1 else shape + (k,)
+        return distances.reshape(result_shape), indexes.reshape(result_shape)
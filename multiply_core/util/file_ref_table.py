@@ -0,0 +1,247 @@
+"""
+Description
+===========
+
+This module contains a columnar collection of file refs. Catalogs of whole archives hold millions of products; as a
+table, their times are kept in NumPy arrays and their urls, mime types and data types are stored once in string tables
+and referenced by integer codes.
+"""
+
+from datetime import datetime, timedelta
+import numpy as np
+from typing import Iterator, List, Optional, Sequence, Union
+
+from .util import FileRef, get_time_from_string
+
+__author__ = "MULTIPLY Team"
+
+_EPOCH = np.datetime64('1970-01-01T00:00:00', 's')
+_EPOCH_DATETIME = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
+
+
+class _FileRefView(FileRef):
+    """
+    A file ref of a row of a file ref table. Times are taken from the table and are formatted as strings only when
+    requested.
+    """
+    __slots__ = ()
+
+    def __init__(self, url: str, start_datetime: datetime, end_datetime: datetime, mime_type: str):
+        self._url = url
+        self._mime_type = mime_type
+        self._start_datetime = start_datetime
+        self._end_datetime = end_datetime
+        self._start_time = None
+        self._end_time = None
+        self._comparison_key = None
+
+    @property
+    def start_time(self) -> str:
+        if self._start_time is None:
+            self._start_time = str(self._start_datetime)
+        return self._start_time
+
+    @property
+    def end_time(self) -> str:
+        if self._end_time is None:
+            self._end_time = str(self._end_datetime)
+        return self._end_time
+
+    def __reduce__(self):
+        # views are pickled as plain file refs
+        return FileRef, (self._url, self.start_time, self.end_time, self._mime_type)
+
+
+def _intern(values: Sequence[Optional[str]]) -> tuple:
+    table = {}
+    codes = np.fromiter((table.setdefault(value, len(table)) for value in values), dtype=np.int32, count=len(values))
+    return codes, list(table.keys())
+
+
+def _to_epoch_seconds(times: Sequence[Union[str, datetime]], adjust_to_last_day: bool) -> np.array:
+    if isinstance(times, np.ndarray) and np.issubdtype(times.dtype, np.datetime64):
+        return (times.astype('datetime64[s]') - _EPOCH).astype(np.int64)
+    datetimes = []
+    for time in times:
+        if isinstance(time, str):
+            time = get_time_from_string(time, adjust_to_last_day)
+        if time is None:
+            raise ValueError('File refs in a file ref table must have start and end times')
+        datetimes.append(time)
+    return (np.array(datetimes, dtype='datetime64[s]') - _EPOCH).astype(np.int64)
+
+
+def _to_datetime64(time: Union[str, datetime, np.datetime64], adjust_to_last_day: bool) -> np.datetime64:
+    if isinstance(time, str):
+        time = get_time_from_string(time, adjust_to_last_day)
+    return np.datetime64(time, 's')
+
+
+class FileRefTable(object):
+    """
+    A columnar collection of file refs. Start and end times are held as int64 seconds since 1970-01-01, urls, mime types
+    and data types as int32 codes into string tables. The table can be sorted, sliced by time and filtered by masks
+    without creating file refs. Iterating over a table yields file refs which are created for one row at a time.
+    Their time strings are given in the form 'YYYY-MM-DD HH:MM:SS'.
+    """
+
+    def __init__(self, urls: Sequence[str], start_times: Sequence[Union[str, datetime]],
+                 end_times: Sequence[Union[str, datetime]], mime_types: Sequence[str],
+                 data_types: Optional[Sequence[Optional[str]]] = None):
+        """
+        :param urls: The urls of the files
+        :param start_times: The start times of the files, as time strings, datetimes or an array of datetime64
+        :param end_times: The end times of the files, in the same form as the start times. Time strings which do not
+        state a time of day are set to the end of the day, month or year they denote.
+        :param mime_types: The mime types of the files
+        :param data_types: The names of the data types of the files, e.g. 'AWS_S2_L2'. Optional.
+        """
+        num_rows = len(urls)
+        if data_types is None:
+            data_types = [None] * num_rows
+        if not len(start_times) == len(end_times) == len(mime_types) == len(data_types) == num_rows:
+            raise ValueError('All columns of a file ref table must have the same length')
+        self._start_times = _to_epoch_seconds(start_times, False)
+        self._end_times = _to_epoch_seconds(end_times, True)
+        self._url_codes, self._urls = _intern(urls)
+        self._mime_type_codes, self._mime_types = _intern(mime_types)
+        self._data_type_codes, self._data_types = _intern(data_types)
+        self._is_sorted = num_rows < 2 or bool(np.all(self._start_times[1:] >= self._start_times[:-1]))
+
+    @classmethod
+    def from_file_refs(cls, file_refs: Sequence[FileRef], data_types: Optional[Sequence[Optional[str]]] = None) \
+            -> 'FileRefTable':
+        """
+        :param file_refs: The file refs
+        :param data_types: The names of the data types of the file refs. Optional.
+        :return: A table with the file refs
+        """
+        return cls([file_ref.url for file_ref in file_refs],
+                   [file_ref.start_datetime for file_ref in file_refs],
+                   [file_ref.end_datetime for file_ref in file_refs],
+                   [file_ref.mime_type for file_ref in file_refs], data_types)
+
+    def _take(self, rows: Union[slice, np.array], is_sorted: bool) -> 'FileRefTable':
+        # the string tables are shared, so tables of selected rows are cheap to create
+        table = FileRefTable.__new__(FileRefTable)
+        table._start_times = self._start_times[rows]
+        table._end_times = self._end_times[rows]
+        table._url_codes = self._url_codes[rows]
+        table._urls = self._urls
+        table._mime_type_codes = self._mime_type_codes[rows]
+        table._mime_types = self._mime_types
+        table._data_type_codes = self._data_type_codes[rows]
+        table._data_types = self._data_types
+        table._is_sorted = is_sorted
+        return table
+
+    @property
+    def start_times(self) -> np.array:
+        """The start times as array of datetime64[s]."""
+        return self._start_times.view('datetime64[s]')
+
+    @property
+    def end_times(self) -> np.array:
+        """The end times as array of datetime64[s]."""
+        return self._end_times.view('datetime64[s]')
+
+    @property
+    def is_sorted(self) -> bool:
+        """Whether the rows are ordered by start time."""
+        return self._is_sorted
+
+    def sort(self):
+        """
+        Orders the rows by start time, then by end time. Rows with equal times keep their order.
+        """
+        if len(self) < 2:
+            return
+        order = np.lexsort((self._end_times, self._start_times))
+        self._start_times = self._start_times[order]
+        self._end_times = self._end_times[order]
+        self._url_codes = self._url_codes[order]
+        self._mime_type_codes = self._mime_type_codes[order]
+        self._data_type_codes = self._data_type_codes[order]
+        self._is_sorted = True
+
+    def get_time_range(self, start_time: Union[str, datetime, np.datetime64],
+                       end_time: Union[str, datetime, np.datetime64]) -> 'FileRefTable':
+        """
+        :param start_time: The start of the time range
+        :param end_time: The end of the time range. Time strings which do not state a time of day are set to the end of
+        the day, month or year they denote.
+        :return: A table with the rows which start within the time range, including its start and end. For sorted
+        tables, the rows are found by binary search.
+        """
+        start = (_to_datetime64(start_time, False) - _EPOCH).astype(np.int64)
+        end = (_to_datetime64(end_time, True) - _EPOCH).astype(np.int64)
+        if self._is_sorted:
+            first = np.searchsorted(self._start_times, start, side='left')
+            last = np.searchsorted(self._start_times, end, side='right')
+            return self._take(slice(first, last), True)
+        return self.filter((self._start_times >= start) & (self._start_times <= end))
+
+    def filter(self, mask: np.array) -> 'FileRefTable':
+        """
+        :param mask: A boolean array with one entry per row
+        :return: A table with the rows for which the mask is true, in their current order
+        """
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != self._start_times.shape:
+            raise ValueError('Mask of shape {} does not fit table with {} rows'.format(mask.shape, len(self)))
+        return self._take(mask, self._is_sorted)
+
+    def get_mime_type_mask(self, mime_type: str) -> np.array:
+        """
+        :return: A boolean array which is true for the rows of the given mime type
+        """
+        if mime_type not in self._mime_types:
+            return np.zeros(len(self), dtype=bool)
+        return self._mime_type_codes == self._mime_types.index(mime_type)
+
+    def get_data_type_mask(self, data_type: str) -> np.array:
+        """
+        :return: A boolean array which is true for the rows of the given data type
+        """
+        if data_type not in self._data_types:
+            return np.zeros(len(self), dtype=bool)
+        return self._data_type_codes == self._data_types.index(data_type)
+
+    def get_data_type(self, index: int) -> Optional[str]:
+        """
+        :return: The name of the data type of the row, or None if it has not been given
+        """
+        return self._data_types[self._data_type_codes[index]]
+
+    def __len__(self) -> int:
+        return len(self._start_times)
+
+    def __getitem__(self, item: Union[int, slice, np.array]) -> Union[FileRef, 'FileRefTable']:
+        if isinstance(item, slice):
+            return self._take(item, self._is_sorted and (item.step is None or item.step > 0))
+        if isinstance(item, (np.ndarray, list)):
+            item = np.asarray(item)
+            if item.dtype == bool:
+                return self.filter(item)
+            return self._take(item, False)
+        return _FileRefView(self._urls[self._url_codes[item]],
+                            _EPOCH_DATETIME + _ONE_SECOND * int(self._start_times[item]),
+                            _EPOCH_DATETIME + _ONE_SECOND * int(self._end_times[item]),
+                            self._mime_types[self._mime_type_codes[item]])
+
+    def __iter__(self) -> Iterator[FileRef]:
+        urls = self._urls
+        mime_types = self._mime_types
+        for url_code, start_time, end_time, mime_type_code in zip(self._url_codes.tolist(),
+                                                                  self._start_times.tolist(),
+                                                                  self._end_times.tolist(),
+                                                                  self._mime_type_codes.tolist()):
+            yield _FileRefView(urls[url_code], _EPOCH_DATETIME + _ONE_SECOND * start_time,
+                               _EPOCH_DATETIME + _ONE_SECOND * end_time, mime_types[mime_type_code])
+
+    def to_file_refs(self) -> List[FileRef]:
+        """
+        :return: The rows as list of file refs
+        """
+        return list(self)
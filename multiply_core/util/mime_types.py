@@ -0,0 +1,179 @@
+"""
+Description
+===========
+
+This module contains the detection of mime types. Mime types are looked up by file extension. Files without a known
+extension may be identified by the magic number in their first bytes, directories by the entry type of a directory
+scan.
+"""
+
+import os
+from typing import Dict, List, Optional
+
+__author__ = "MULTIPLY Team"
+
+UNKNOWN_MIME_TYPE = 'unknown mime type'
+DIRECTORY_MIME_TYPE = 'application/x-directory'
+_MAGIC_NUMBER_LENGTH = 8
+_DEFAULT_EXTENSIONS = {'nc': 'application/x-netcdf',
+                       'zip': 'application/zip',
+                       'json': 'application/json',
+                       'hdf': 'application/x-hdf',
+                       'pkl': 'application/octet-stream',
+                       'tif': 'image/tiff',
+                       'tiff': 'image/tiff',
+                       'vrt': 'x-world/x-vrt'}
+# names which end like this without a separating dot are also known, e.g. 'B01_surtif'
+_DEFAULT_SUFFIXES = [('tiff', 'image/tiff'), ('tif', 'image/tiff')]
+_DEFAULT_MAGIC_NUMBERS = [(b'CDF\x01', 'application/x-netcdf'),
+                          (b'CDF\x02', 'application/x-netcdf'),
+                          (b'\x89HDF\r\n\x1a\n', 'application/x-hdf5'),
+                          (b'\x0e\x03\x13\x01', 'application/x-hdf'),
+                          (b'II*\x00', 'image/tiff'),
+                          (b'MM\x00*', 'image/tiff'),
+                          (b'II+\x00', 'image/tiff'),
+                          (b'MM\x00+', 'image/tiff'),
+                          (b'PK\x03\x04', 'application/zip'),
+                          (b'\x80\x02', 'application/octet-stream'),
+                          (b'\x80\x03', 'application/octet-stream'),
+                          (b'\x80\x04', 'application/octet-stream')]
+
+
+class MimeTypeDetector(object):
+    """
+    Detects the mime types of files and directories. The extension of a name is looked up in a table. Names without a
+    known extension are checked for being a directory and, if sniffing is enabled, the first bytes of the file are
+    compared with known magic numbers.
+    """
+
+    def __init__(self, sniff: bool = False):
+        """
+        :param sniff: If true, the types of files without a known extension are determined from their first bytes.
+        """
+        self._sniff = sniff
+        self._extensions = dict(_DEFAULT_EXTENSIONS)
+        self._suffixes = list(_DEFAULT_SUFFIXES)
+        self._magic_numbers = list(_DEFAULT_MAGIC_NUMBERS)
+
+    def add_extension(self, extension: str, mime_type: str):
+        """
+        :param extension: A file extension without dot, e.g. 'nc'
+        :param mime_type: The mime type of files with this extension
+        """
+        self._extensions[extension] = mime_type
+
+    def add_magic_number(self, magic_number: bytes, mime_type: str):
+        """
+        :param magic_number: The first bytes of files of the mime type. At most eight bytes are compared.
+        :param mime_type: The mime type of files starting with the magic number
+        """
+        self._magic_numbers.append((magic_number[:_MAGIC_NUMBER_LENGTH], mime_type))
+
+    def get_mime_type_from_name(self, file_name: str) -> Optional[str]:
+        """
+        :return: The mime type derived from the name, without accessing the file system, or None
+        """
+        dot_index = file_name.rfind('.')
+        if dot_index >= 0:
+            mime_type = self._extensions.get(file_name[dot_index + 1:])
+            if mime_type is not None:
+                return mime_type
+        for suffix, mime_type in self._suffixes:
+            if file_name.endswith(suffix):
+                return mime_type
+        return None
+
+    def get_mime_type_from_magic_number(self, file_name: str) -> Optional[str]:
+        """
+        :return: The mime type derived from the first bytes of the file, or None
+        """
+        try:
+            with open(file_name, 'rb') as file:
+                header = file.read(_MAGIC_NUMBER_LENGTH)
+        except OSError:
+            return None
+        for magic_number, mime_type in self._magic_numbers:
+            if header.startswith(magic_number):
+                return mime_type
+        return None
+
+    def _get_mime_type(self, path: str, is_dir: Optional[bool]) -> str:
+        mime_type = self.get_mime_type_from_name(path)
+        if mime_type is not None:
+            return mime_type
+        if is_dir is None:
+            is_dir = os.path.isdir(path)
+        if is_dir:
+            return DIRECTORY_MIME_TYPE
+        if self._sniff:
+            mime_type = self.get_mime_type_from_magic_number(path)
+            if mime_type is not None:
+                return mime_type
+        return UNKNOWN_MIME_TYPE
+
+    def get_mime_type(self, path: str) -> str:
+        """
+        :param path: The path to a file or directory
+        :return: The mime type, 'application/x-directory' for directories or 'unknown mime type'
+        """
+        return self._get_mime_type(path, None)
+
+    def get_mime_types(self, paths: List[str]) -> List[str]:
+        """
+        Determines the mime types of many paths. Paths whose type cannot be derived from their names are looked up in
+        scans of their parent directories, so that each directory is listed once and no path is stat'ed on its own.
+        :param paths: The paths to files or directories
+        :return: The mime types, in the order of the paths
+        """
+        mime_types = [self.get_mime_type_from_name(path) for path in paths]
+        unresolved_paths = [path for path, mime_type in zip(paths, mime_types) if mime_type is None]
+        entry_types = {}
+        for parent_dir in set(os.path.dirname(os.path.normpath(path)) for path in unresolved_paths):
+            entry_types.update(_scan_entry_types(parent_dir))
+        for i, path in enumerate(paths):
+            if mime_types[i] is None:
+                is_dir = entry_types.get(os.path.normpath(path), False)
+                mime_types[i] = self._get_mime_type(path, is_dir)
+        return mime_types
+
+    def scan_directory(self, directory: str) -> Dict[str, str]:
+        """
+        :param directory: A directory
+        :return: The mime types of all entries of the directory, by path. Directory entries are recognized by their
+        entry type, without further system calls.
+        """
+        mime_types = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                mime_types[entry.path] = self._get_mime_type(entry.path, entry.is_dir())
+        return mime_types
+
+
+def _scan_entry_types(directory: str) -> Dict[str, bool]:
+    entry_types = {}
+    try:
+        with os.scandir(directory if directory != '' else '.') as entries:
+            for entry in entries:
+                entry_types[os.path.normpath(os.path.join(directory, entry.name))] = entry.is_dir()
+    except OSError:
+        pass
+    return entry_types
+
+
+_MIME_TYPE_DETECTOR = MimeTypeDetector()
+
+
+def get_mime_type(file_name: str) -> str:
+    """
+    :param file_name: The path to a file or directory
+    :return: The mime type of the path, determined by the default detector
+    """
+    return _MIME_TYPE_DETECTOR.get_mime_type(file_name)
+
+
+def get_mime_types(paths: List[str]) -> List[str]:
+    """
+    :param paths: The paths to files or directories
+    :return: The mime types of the paths, determined by the default detector
+    """
+    return _MIME_TYPE_DETECTOR.get_mime_types(paths)
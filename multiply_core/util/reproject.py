@@ -2,7 +2,10 @@ import gdal
 import logging
 import numpy as np
 import osr
-from typing import Optional, Sequence, Union
+import uuid
+from typing import Optional, Sequence, Tuple, Union
+
+from .reprojection_cache import ReprojectionCache
 
 __author__ = "José Luis Gómez-Dans (University College London)," \
              "Tonio Fincke (Brockmann Consult GmbH)"
@@ -53,14 +56,17 @@ def get_target_resolutions(dataset: gdal.Dataset) -> (float, float):
     return geo_transform[1], -geo_transform[5]
 
 
-def reproject_dataset(dataset: Union[str, gdal.Dataset], bounds: Sequence[float], x_res: int, y_res: int,
-                      destination_srs: osr.SpatialReference, bounds_srs: Optional[osr.SpatialReference],
-                      resampling_mode: Optional[str]) -> gdal.Dataset:
+def reproject_dataset(dataset: Union[str, gdal.Dataset], bounds: Union[Sequence[float], 'TargetGrid'],
+                      x_res: Optional[int] = None, y_res: Optional[int] = None,
+                      destination_srs: Optional[osr.SpatialReference] = None,
+                      bounds_srs: Optional[osr.SpatialReference] = None, resampling_mode: Optional[str] = None,
+                      lazy: bool = False) -> gdal.Dataset:
     """
     Reprojects a gdal dataset to a reference system with the given bounds and the given spatial resolution.
     :param dataset: A dataset
     :param bounds: A 1-d float array specifying the bounds of the resulting dataset. Must consist of the following
-    four float values: xmin, ymin, xmax, ymax.
+    four float values: xmin, ymin, xmax, ymax. Alternatively, the target grid of the resulting dataset, in which case
+    resolutions and spatial reference systems must not be given.
     :param x_res: The resolution the resulting dataset shall have in x-direction. Must be set in accordance to
     destination_srs.
     :param y_res: The resolution the resulting dataset shall have in y-direction. Must be set in accordance to
@@ -84,19 +90,50 @@ def reproject_dataset(dataset: Union[str, gdal.Dataset], bounds: Sequence[float]
     * q3
     If none is selected, 'bilinear' will be selected in case the source values need to be sampled up to a finer
     destination resolution and 'average' in case the values need to be sampled down to a coarser destination resolution.
+    :param lazy: If true, a warped VRT is returned instead of an in-memory dataset. Pixels are then only computed for
+    the windows that are actually read. This requires the dataset to be backed by a file.
     :return: A spatial dataset with the chosen destination spatial reference system, in the bounds and the x- and y-
     resolutions that have been set.
     """
+    if isinstance(bounds, TargetGrid):
+        if x_res is not None or y_res is not None or destination_srs is not None or bounds_srs is not None:
+            raise ValueError('Resolutions and spatial reference systems are given by the target grid')
+        return reproject_to_grid(dataset, bounds, resampling_mode, lazy)
+    if x_res is None or y_res is None or destination_srs is None:
+        raise ValueError('Either a target grid or bounds, resolutions and a destination srs must be given')
     if type(dataset) is str:
         dataset = gdal.Open(dataset)
     if bounds_srs is None:
         bounds_srs = destination_srs
     if resampling_mode is None:
         resampling_mode = _get_resampling(dataset, bounds, x_res, y_res, bounds_srs, destination_srs)
-    warp_options = gdal.WarpOptions(format='Mem', outputBounds=bounds, outputBoundsSRS=bounds_srs,
-                                    xRes=x_res, yRes=y_res, dstSRS=destination_srs, resampleAlg=resampling_mode)
-    reprojected_data_set = gdal.Warp('', dataset, options=warp_options)
-    return reprojected_data_set
+    return _warp(dataset, lazy, outputBounds=bounds, outputBoundsSRS=bounds_srs, xRes=x_res, yRes=y_res,
+                 dstSRS=destination_srs, resampleAlg=resampling_mode)
+
+
+def _warp(dataset: gdal.Dataset, lazy: bool, **warp_arguments) -> gdal.Dataset:
+    if lazy and _is_file_based(dataset):
+        return _warp_to_vrt(dataset, **warp_arguments)
+    warp_options = gdal.WarpOptions(format='Mem', **warp_arguments)
+    return gdal.Warp('', dataset, options=warp_options)
+
+
+def _is_file_based(dataset: gdal.Dataset) -> bool:
+    # a warped vrt refers to its source by name, so in-memory datasets cannot be warped lazily
+    driver = dataset.GetDriver()
+    return driver is not None and driver.ShortName.upper() != 'MEM' and dataset.GetDescription() != ''
+
+
+def _warp_to_vrt(dataset: gdal.Dataset, **warp_arguments) -> gdal.Dataset:
+    # the vrt is serialized and re-opened so that it opens its source itself and does not depend on the lifetime of
+    # the source dataset object
+    vrt_file_name = '/vsimem/{}.vrt'.format(uuid.uuid4().hex)
+    warp_options = gdal.WarpOptions(format='VRT', **warp_arguments)
+    vrt_data_set = gdal.Warp(vrt_file_name, dataset, options=warp_options)
+    vrt_data_set = None
+    vrt_data_set = gdal.Open(vrt_file_name)
+    gdal.Unlink(vrt_file_name)
+    return vrt_data_set
 
 
 def _get_resampling(dataset: gdal.Dataset, bounds: Sequence[float], x_res: float, y_res: float,
@@ -127,63 +164,366 @@ def _get_dist_measure(source_coordinates: Sequence[float], x_res: float, y_res:
     return (x_dist / x_res) * (y_dist / y_res)
 
 
+class TargetGrid(object):
+    """
+    Describes the grid a dataset shall be reprojected to by its geographic transform, its size and the well-known
+    text of its spatial reference system. A target grid is immutable and hashable, so its geometry can be computed
+    once and be reused for any number of reprojections.
+    """
+    __slots__ = ('_geo_transform', '_width', '_height', '_wkt', '_srs')
+
+    def __init__(self, geo_transform: Sequence[float], width: int, height: int, wkt: str):
+        self._geo_transform = tuple(float(value) for value in geo_transform)
+        self._width = int(width)
+        self._height = int(height)
+        self._wkt = wkt
+        self._srs = None
+
+    @classmethod
+    def from_dataset(cls, dataset: Union[str, gdal.Dataset]) -> 'TargetGrid':
+        """
+        Creates a target grid that matches the grid of a dataset.
+        :param dataset: A dataset or the path to it
+        :return: The grid of the dataset
+        """
+        if type(dataset) is str:
+            dataset = gdal.Open(dataset)
+        return TargetGrid(dataset.GetGeoTransform(), dataset.RasterXSize, dataset.RasterYSize,
+                          dataset.GetProjection())
+
+    @classmethod
+    def from_reprojection(cls, reprojection: 'Reprojection') -> 'TargetGrid':
+        """
+        Creates the target grid onto which a reprojection maps datasets.
+        :param reprojection: A reprojection
+        :return: The grid of datasets produced by the reprojection
+        """
+        return reprojection.get_target_grid()
+
+    @property
+    def geo_transform(self) -> tuple:
+        return self._geo_transform
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def wkt(self) -> str:
+        return self._wkt
+
+    @property
+    def srs(self) -> osr.SpatialReference:
+        """The spatial reference system of the grid. It is created only once."""
+        if self._srs is None:
+            self._srs = osr.SpatialReference()
+            self._srs.ImportFromWkt(self._wkt)
+        return self._srs
+
+    @property
+    def bounds(self) -> Sequence[float]:
+        """The bounds of the grid as xmin, ymin, xmax, ymax."""
+        geo_t = self._geo_transform
+        x_0, x_1 = geo_t[0], geo_t[0] + self._width * geo_t[1]
+        y_0, y_1 = geo_t[3], geo_t[3] + self._height * geo_t[5]
+        return min(x_0, x_1), min(y_0, y_1), max(x_0, x_1), max(y_0, y_1)
+
+    @property
+    def resolutions(self) -> (float, float):
+        """The resolutions of the grid in x- and y-direction."""
+        return abs(self._geo_transform[1]), abs(self._geo_transform[5])
+
+    def _key(self) -> tuple:
+        return self._geo_transform, self._width, self._height, self._wkt
+
+    def __eq__(self, other):
+        return isinstance(other, TargetGrid) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return 'TargetGrid(geo_transform={}, width={}, height={})'.format(self._geo_transform, self._width,
+                                                                         self._height)
+
+
+def reproject_to_grid(dataset: Union[str, gdal.Dataset], target_grid: TargetGrid,
+                      resampling_mode: Optional[str] = None, lazy: bool = False) -> gdal.Dataset:
+    """
+    Reprojects a gdal dataset so that it fits exactly onto a target grid.
+    :param dataset: A dataset
+    :param target_grid: The grid the resulting dataset shall have
+    :param resampling_mode: The mode by which the values from the source dataset shall be combined to values in the
+    target dataset. See reproject_dataset for the available modes. If none is selected, 'bilinear' or 'average'
+    will be selected, depending on whether the values need to be sampled up or down.
+    :param lazy: If true, a warped VRT is returned instead of an in-memory dataset.
+    :return: A spatial dataset on the target grid
+    """
+    if type(dataset) is str:
+        dataset = gdal.Open(dataset)
+    if resampling_mode is None:
+        x_res, y_res = target_grid.resolutions
+        resampling_mode = _get_resampling(dataset, target_grid.bounds, x_res, y_res, target_grid.srs,
+                                          target_grid.srs)
+    if not lazy:
+        reprojected_data_set = _reproject_aligned(dataset, target_grid, resampling_mode)
+        if reprojected_data_set is not None:
+            return reprojected_data_set
+    return _warp(dataset, lazy, outputBounds=target_grid.bounds, width=target_grid.width, height=target_grid.height,
+                 dstSRS=target_grid.wkt, resampleAlg=resampling_mode)
+
+
+# resampling modes for which grids that are aligned by integer factors are resampled without gdal.Warp
+ALIGNED_RESAMPLING_MODES = ['average', 'min', 'max', 'mode']
+
+
+def get_alignment(source_grid: TargetGrid, target_grid: TargetGrid) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Determines whether a target grid can be derived from a source grid by combining blocks of source pixels. This is
+    the case when both grids share their spatial reference system, the target resolution is an integer multiple of
+    the source resolution and the target grid starts at a source pixel border within the source grid.
+    :param source_grid: The grid of the source dataset
+    :param target_grid: The grid to reproject to
+    :return: The factors by which the target resolution is coarser in x- and y-direction, followed by the offsets
+    of the target grid within the source grid in source pixels. None, if the grids are not aligned.
+    """
+    source_geo_t = source_grid.geo_transform
+    target_geo_t = target_grid.geo_transform
+    if source_geo_t[2] != 0 or source_geo_t[4] != 0 or target_geo_t[2] != 0 or target_geo_t[4] != 0:
+        return None
+    if source_geo_t[1] * target_geo_t[1] <= 0 or source_geo_t[5] * target_geo_t[5] <= 0:
+        return None
+    x_factor = _as_integer(target_geo_t[1] / source_geo_t[1])
+    y_factor = _as_integer(target_geo_t[5] / source_geo_t[5])
+    x_offset = _as_integer((target_geo_t[0] - source_geo_t[0]) / source_geo_t[1])
+    y_offset = _as_integer((target_geo_t[3] - source_geo_t[3]) / source_geo_t[5])
+    if x_factor is None or y_factor is None or x_offset is None or y_offset is None:
+        return None
+    if x_factor < 1 or y_factor < 1 or x_offset < 0 or y_offset < 0:
+        return None
+    if x_offset + target_grid.width * x_factor > source_grid.width or \
+            y_offset + target_grid.height * y_factor > source_grid.height:
+        return None
+    if source_grid.wkt != target_grid.wkt and not source_grid.srs.IsSame(target_grid.srs):
+        return None
+    return x_factor, y_factor, x_offset, y_offset
+
+
+def _as_integer(value: float, tolerance: float = 1e-6) -> Optional[int]:
+    rounded_value = int(round(value))
+    if abs(value - rounded_value) > tolerance * max(1., abs(value)):
+        return None
+    return rounded_value
+
+
+def block_reduce(data: np.array, x_factor: int, y_factor: int, resampling_mode: str,
+                 no_data_value: Optional[float] = None) -> np.array:
+    """
+    Combines blocks of y_factor x x_factor pixels of a two-dimensional array into single pixels.
+    :param data: A two-dimensional array. Its height and width must be multiples of the factors.
+    :param x_factor: The number of pixels to combine in x-direction
+    :param y_factor: The number of pixels to combine in y-direction
+    :param resampling_mode: One of 'average', 'min', 'max' and 'mode'
+    :param no_data_value: Pixels with this value (and NaN pixels) are not taken into account. Blocks without any
+    valid pixels are set to it. If not given, all pixels are considered valid.
+    :return: The reduced array, of the same data type as the input array
+    """
+    if resampling_mode not in ALIGNED_RESAMPLING_MODES:
+        raise ValueError('Resampling mode {} not supported for block reduction.'.format(resampling_mode))
+    height = data.shape[0] // y_factor
+    width = data.shape[1] // x_factor
+    blocks = data.reshape(height, y_factor, width, x_factor).swapaxes(1, 2).reshape(height, width,
+                                                                                  y_factor * x_factor)
+    valid = np.ones(blocks.shape, dtype=bool)
+    if no_data_value is not None:
+        valid &= blocks != no_data_value
+    if np.issubdtype(data.dtype, np.floating):
+        valid &= ~np.isnan(blocks)
+    num_valid = valid.sum(axis=-1)
+    if resampling_mode == 'average':
+        reduced = np.where(valid, blocks, 0).sum(axis=-1, dtype=np.float64) / np.maximum(num_valid, 1)
+    elif resampling_mode == 'min':
+        reduced = np.where(valid, blocks, _get_extreme_value(data.dtype, 'max')).min(axis=-1)
+    elif resampling_mode == 'max':
+        reduced = np.where(valid, blocks, _get_extreme_value(data.dtype, 'min')).max(axis=-1)
+    else:
+        reduced = _block_mode(blocks, valid)
+    if not np.issubdtype(data.dtype, np.floating):
+        reduced = np.floor(reduced + 0.5)
+    if no_data_value is not None:
+        reduced = np.where(num_valid > 0, reduced, no_data_value)
+    return reduced.astype(data.dtype)
+
+
+def _get_extreme_value(dtype: np.dtype, which: str):
+    if np.issubdtype(dtype, np.floating):
+        return np.inf if which == 'max' else -np.inf
+    info = np.iinfo(dtype)
+    return info.max if which == 'max' else info.min
+
+
+def _block_mode(blocks: np.array, valid: np.array, max_chunk_elements: int = 2 ** 24) -> np.array:
+    # as in gdal, the value that occurs most often wins, and among these the one encountered first.
+    # The pairwise comparison is quadratic in the block size, so it is done on chunks of rows.
+    height, width, block_size = blocks.shape
+    reduced = np.empty((height, width), dtype=blocks.dtype)
+    rows_per_chunk = max(1, max_chunk_elements // max(1, width * block_size * block_size))
+    for y in range(0, height, rows_per_chunk):
+        chunk = blocks[y:y + rows_per_chunk]
+        chunk_valid = valid[y:y + rows_per_chunk]
+        counts = ((chunk[..., :, np.newaxis] == chunk[..., np.newaxis, :]) &
+                  chunk_valid[..., np.newaxis, :]).sum(axis=-1)
+        counts[~chunk_valid] = -1
+        indexes = counts.argmax(axis=-1)
+        reduced[y:y + rows_per_chunk] = np.take_along_axis(chunk, indexes[..., np.newaxis], axis=-1)[..., 0]
+    return reduced
+
+
+def _reproject_aligned(dataset: gdal.Dataset, target_grid: TargetGrid, resampling_mode: str) \
+        -> Optional[gdal.Dataset]:
+    if resampling_mode not in ALIGNED_RESAMPLING_MODES:
+        return None
+    alignment = get_alignment(TargetGrid.from_dataset(dataset), target_grid)
+    if alignment is None:
+        return None
+    x_factor, y_factor, x_offset, y_offset = alignment
+    first_band = dataset.GetRasterBand(1)
+    reprojected_data_set = gdal.GetDriverByName('MEM').Create('', target_grid.width, target_grid.height,
+                                                              dataset.RasterCount, first_band.DataType)
+    reprojected_data_set.SetGeoTransform(target_grid.geo_transform)
+    reprojected_data_set.SetProjection(target_grid.wkt)
+    for band_index in range(1, dataset.RasterCount + 1):
+        band = dataset.GetRasterBand(band_index)
+        no_data_value = band.GetNoDataValue()
+        data = band.ReadAsArray(x_offset, y_offset, target_grid.width * x_factor, target_grid.height * y_factor)
+        reprojected_band = reprojected_data_set.GetRasterBand(band_index)
+        reprojected_band.WriteArray(block_reduce(data, x_factor, y_factor, resampling_mode, no_data_value))
+        if no_data_value is not None:
+            reprojected_band.SetNoDataValue(no_data_value)
+    return reprojected_data_set
+
+
 class Reprojection(object):
 
     def __init__(self, bounds: Sequence[float], x_res: int, y_res: int, destination_srs: osr.SpatialReference,
-                 bounds_srs: Optional[osr.SpatialReference]=None, resampling_mode: Optional[str]=None):
+                 bounds_srs: Optional[osr.SpatialReference]=None, resampling_mode: Optional[str]=None,
+                 lazy: bool=False, cache: Optional[ReprojectionCache]=None):
         self._bounds = bounds
         self._x_res = x_res
         self._y_res = y_res
         self._destination_srs = destination_srs
         self._resampling_mode = resampling_mode
+        self._lazy = lazy
+        self._cache = cache
+        self._target_grid = None
+        self._fixed_target_grid = False
         if bounds_srs is None:
             self._bounds_srs = destination_srs
         else:
             self._bounds_srs = bounds_srs
 
+    @classmethod
+    def from_target_grid(cls, target_grid: TargetGrid, resampling_mode: Optional[str]=None,
+                         lazy: bool=False, cache: Optional[ReprojectionCache]=None) -> 'Reprojection':
+        """
+        Creates a reprojection that maps datasets exactly onto a target grid.
+        :param target_grid: The target grid
+        :param resampling_mode: The resampling mode. See reproject_dataset for the available modes.
+        :param lazy: Whether reprojected datasets shall be returned as warped VRTs
+        :param cache: An optional cache from which reprojected datasets are read if they have been reprojected before
+        :return: A reprojection onto the target grid
+        """
+        x_res, y_res = target_grid.resolutions
+        reprojection = Reprojection(target_grid.bounds, x_res, y_res, target_grid.srs,
+                                    resampling_mode=resampling_mode, lazy=lazy, cache=cache)
+        reprojection._target_grid = target_grid
+        reprojection._fixed_target_grid = True
+        return reprojection
+
     def reproject(self, dataset: Union[str, gdal.Dataset]) -> gdal.Dataset:
         if type(dataset) is str:
             dataset = gdal.Open(dataset)
-        if self._resampling_mode is None:
-            resampling_mode = _get_resampling(dataset, self._bounds, self._x_res, self._y_res, self._bounds_srs,
-                                              self._destination_srs)
-        else:
-            resampling_mode = self._resampling_mode
-        warp_options = gdal.WarpOptions(format='Mem', outputBounds=self._bounds, outputBoundsSRS=self._bounds_srs,
-                                        xRes=self._x_res, yRes=self._y_res, dstSRS=self._destination_srs,
-                                        resampleAlg=resampling_mode)
-        reprojected_data_set = gdal.Warp('', dataset, options=warp_options)
-        return reprojected_data_set
+        resampling_mode = self._get_resampling_mode(dataset)
+        if self._cache is None or self._lazy:
+            return self._reproject(dataset, resampling_mode)
+        key = self._cache.get_key(dataset, self.get_target_grid(), resampling_mode)
+        if key is None:
+            return self._reproject(dataset, resampling_mode)
+        cached_data_set = self._cache.get(key)
+        if cached_data_set is not None:
+            return cached_data_set
+        return self._cache.put(key, self._reproject(dataset, resampling_mode))
+
+    def _get_resampling_mode(self, dataset: gdal.Dataset) -> str:
+        if self._resampling_mode is not None:
+            return self._resampling_mode
+        if self._fixed_target_grid:
+            x_res, y_res = self._target_grid.resolutions
+            return _get_resampling(dataset, self._target_grid.bounds, x_res, y_res, self._target_grid.srs,
+                                   self._target_grid.srs)
+        return _get_resampling(dataset, self._bounds, self._x_res, self._y_res, self._bounds_srs,
+                               self._destination_srs)
+
+    def _reproject(self, dataset: gdal.Dataset, resampling_mode: str) -> gdal.Dataset:
+        if self._fixed_target_grid:
+            return reproject_to_grid(dataset, self._target_grid, resampling_mode, self._lazy)
+        if not self._lazy and resampling_mode in ALIGNED_RESAMPLING_MODES:
+            reprojected_data_set = _reproject_aligned(dataset, self.get_target_grid(), resampling_mode)
+            if reprojected_data_set is not None:
+                return reprojected_data_set
+        return _warp(dataset, self._lazy, outputBounds=self._bounds, outputBoundsSRS=self._bounds_srs,
+                     xRes=self._x_res, yRes=self._y_res, dstSRS=self._destination_srs, resampleAlg=resampling_mode)
 
     def get_destination_srs(self) -> osr.SpatialReference:
         return self._destination_srs
 
+    def get_target_grid(self) -> TargetGrid:
+        """
+        Returns the grid onto which this reprojection maps datasets. The grid is determined only once.
+        :return: The target grid
+        """
+        if self._target_grid is None:
+            self._target_grid = self._compute_target_grid()
+        return self._target_grid
 
-def reproject_image(source_img, target_img, dstSRSs=None):
-    # TODO: replace this method with the other functionality in this module
-    """Reprojects/Warps an image to fit exactly another image.
-    Additionally, you can set the destination SRS if you want
-    to or if it isn't defined in the source image."""
-    if type(target_img) is str:
-        g = gdal.Open(target_img)
-    else:
-        g = target_img
-    if type(source_img) is str:
-        s = gdal.Open(source_img)
-    else:
-        s = source_img
-    geo_t = g.GetGeoTransform()
-    x_size, y_size = g.RasterXSize, g.RasterYSize
-    xmin = min(geo_t[0], geo_t[0] + x_size * geo_t[1])
-    xmax = max(geo_t[0], geo_t[0] + x_size * geo_t[1])
-    ymin = min(geo_t[3], geo_t[3] + y_size * geo_t[5])
-    ymax = max(geo_t[3], geo_t[3] + y_size * geo_t[5])
-    xRes, yRes = abs(geo_t[1]), abs(geo_t[5])
-    if dstSRSs is None:
-        dstSRS = osr.SpatialReference()
-        raster_wkt = g.GetProjection()
-        dstSRS.ImportFromWkt(raster_wkt)
+    def _compute_target_grid(self) -> TargetGrid:
+        # the grid geometry is derived by warping a single pixel dataset into a vrt, so that it is computed exactly
+        # as gdal would compute it for an actual reprojection. No pixels are computed.
+        x_min, y_min, x_max, y_max = self._bounds
+        dummy_data_set = gdal.GetDriverByName('MEM').Create('', 1, 1, 1, gdal.GDT_Byte)
+        dummy_data_set.SetProjection(self._bounds_srs.ExportToWkt())
+        dummy_data_set.SetGeoTransform((x_min, x_max - x_min, 0, y_max, 0, y_min - y_max))
+        warp_options = gdal.WarpOptions(format='VRT', outputBounds=self._bounds, outputBoundsSRS=self._bounds_srs,
+                                        xRes=self._x_res, yRes=self._y_res, dstSRS=self._destination_srs)
+        vrt_data_set = gdal.Warp('', dummy_data_set, options=warp_options)
+        return TargetGrid.from_dataset(vrt_data_set)
+
+    @property
+    def lazy(self) -> bool:
+        """Whether reprojected datasets are returned as warped VRTs which are only computed when read."""
+        return self._lazy
+
+
+def reproject_image(source_img: Union[str, gdal.Dataset], target_img: Union[str, gdal.Dataset, TargetGrid],
+                    dstSRSs: Optional[osr.SpatialReference]=None) -> gdal.Dataset:
+    """
+    Reprojects/Warps an image to fit exactly another image. Additionally, you can set the destination SRS if you want
+    to or if it isn't defined in the source image.
+    :param source_img: The image to be reprojected
+    :param target_img: The image to fit onto or its target grid. Pass a target grid when reprojecting many images
+    onto the same image, so that the grid geometry is not determined again for every image.
+    :param dstSRSs: An optional spatial reference system to replace the one of the target image
+    :return: An in-memory dataset on the grid of the target image
+    """
+    if isinstance(target_img, TargetGrid):
+        target_grid = target_img
     else:
-        dstSRS = dstSRSs
-    g = gdal.Warp('', s, format='MEM', outputBounds=[xmin, ymin, xmax, ymax], xRes=xRes, yRes=yRes, dstSRS=dstSRS)
-    return g
+        target_grid = TargetGrid.from_dataset(target_img)
+    if dstSRSs is not None:
+        target_grid = TargetGrid(target_grid.geo_transform, target_grid.width, target_grid.height,
+                                 dstSRSs.ExportToWkt())
+    return reproject_to_grid(source_img, target_grid, resampling_mode='near')
@@ -0,0 +1,141 @@
+"""
+Description
+===========
+
+This module contains an on-disk cache for reprojected datasets. Re-running a campaign reprojects the same inputs to
+the same grids again; with the cache, these reprojections are read from disk instead.
+"""
+
+import gdal
+import hashlib
+import os
+import uuid
+from typing import Optional, Union
+
+__author__ = "MULTIPLY Team"
+
+_CACHE_FILE_EXTENSION = '.tif'
+_TEMPORARY_FILE_EXTENSION = '.tmp'
+_CREATION_OPTIONS = ['COMPRESS=DEFLATE', 'BIGTIFF=IF_SAFER', 'TILED=YES', 'BLOCKXSIZE=256', 'BLOCKYSIZE=256']
+
+
+class ReprojectionCache(object):
+    """
+    A cache for reprojected datasets. Entries are stored as tiled, compressed GeoTIFFs in a cache directory and are
+    identified by the path and modification time of the input, the target grid and the resampling mode. When the cache
+    exceeds its maximum size, the least recently used entries are removed. Several processes may share one cache
+    directory: entries are written to temporary files which are then moved to their final name atomically.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int = 10 * 1024 ** 3):
+        """
+        :param cache_dir: The directory in which the reprojected datasets are stored.
+        :param max_size: The maximum accumulated size of all entries in bytes.
+        """
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._max_size = max_size
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    def get_key(self, dataset: Union[str, gdal.Dataset], target_grid, resampling_mode: str) -> Optional[str]:
+        """
+        Determines the key under which the reprojection of a dataset is stored.
+        :param dataset: The source dataset or the path to it
+        :param target_grid: The target grid of the reprojection
+        :param resampling_mode: The resampling mode of the reprojection
+        :return: The key or None, if the dataset is not backed by a file and can therefore not be cached.
+        """
+        path = dataset if type(dataset) is str else dataset.GetDescription()
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        key = repr((os.path.abspath(path), stat.st_mtime_ns, stat.st_size, target_grid.geo_transform,
+                    target_grid.width, target_grid.height, target_grid.wkt, resampling_mode))
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[gdal.Dataset]:
+        """
+        Returns the reprojected dataset stored under the given key.
+        :param key: The key of the entry
+        :return: The dataset or None, if there is no such entry
+        """
+        path = self._get_path(key)
+        try:
+            # the modification time marks when an entry has been used last
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return gdal.Open(path)
+
+    def put(self, key: str, dataset: gdal.Dataset) -> gdal.Dataset:
+        """
+        Stores a reprojected dataset under the given key.
+        :param key: The key of the entry
+        :param dataset: The reprojected dataset
+        :return: The dataset as read from the cache, or the given dataset if the entry has been evicted right away
+        """
+        path = self._get_path(key)
+        temporary_path = '{}.{}{}'.format(path, uuid.uuid4().hex, _TEMPORARY_FILE_EXTENSION)
+        driver = gdal.GetDriverByName('GTiff')
+        cached_data_set = driver.CreateCopy(temporary_path, dataset, options=_CREATION_OPTIONS)
+        cached_data_set = None
+        os.replace(temporary_path, path)
+        self._evict()
+        cached_data_set = gdal.Open(path) if os.path.exists(path) else None
+        if cached_data_set is None:
+            # the entry exceeded the maximum size on its own or has been removed by another process
+            return dataset
+        return cached_data_set
+
+    def get_size(self) -> int:
+        """Returns the accumulated size of all entries in bytes."""
+        return sum(size for _, size, _ in self._list_entries())
+
+    def clear(self):
+        """Removes all entries from the cache."""
+        for path, _, _ in self._list_entries():
+            _remove(path)
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self._cache_dir, key + _CACHE_FILE_EXTENSION)
+
+    def _list_entries(self):
+        entries = []
+        with os.scandir(self._cache_dir) as directory_entries:
+            for entry in directory_entries:
+                if not entry.name.endswith(_CACHE_FILE_EXTENSION):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self):
+        entries = self._list_entries()
+        size = sum(entry_size for _, entry_size, _ in entries)
+        if size <= self._max_size:
+            return
+        entries.sort(key=lambda entry: entry[2])
+        for path, entry_size, _ in entries:
+            if size <= self._max_size:
+                break
+            _remove(path)
+            size -= entry_size
+
+
+def _remove(path: str):
+    # another process might have removed the file already
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,172 @@
+"""
+Description
+===========
+
+This module contains utilities for regions of interest. Regions given as WKT are parsed only once; their geometries,
+prepared geometries and bounds are kept, so that repeated tests against many footprints are cheap.
+"""
+
+from functools import lru_cache
+import numpy as np
+from shapely.geometry import Polygon
+from shapely.geometry.base import BaseGeometry
+from shapely.prepared import prep
+from shapely.wkt import loads
+from typing import Tuple, Union
+
+__author__ = "MULTIPLY Team"
+
+_ROI_CACHE_SIZE = 256
+
+
+class RegionOfInterest(object):
+    """
+    A region of interest. Its bounds are computed when it is created, its prepared geometry when it is first needed.
+    """
+
+    def __init__(self, roi: Union[str, BaseGeometry]):
+        """
+        :param roi: The region of interest, as WKT or as shapely geometry
+        """
+        self._geometry = loads(roi) if isinstance(roi, str) else roi
+        self._bounds = tuple(self._geometry.bounds)
+        self._prepared_geometry = None
+
+    @property
+    def geometry(self) -> BaseGeometry:
+        return self._geometry
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """The bounds as (min_x, min_y, max_x, max_y)."""
+        return self._bounds
+
+    @property
+    def prepared_geometry(self):
+        if self._prepared_geometry is None:
+            self._prepared_geometry = prep(self._geometry)
+        return self._prepared_geometry
+
+    def intersects(self, geometry: Union[str, BaseGeometry]) -> bool:
+        """
+        :param geometry: A geometry, as WKT or as shapely geometry
+        :return: True if the region of interest intersects the geometry
+        """
+        geometry = get_region_of_interest(geometry)
+        if not bool(intersect_bounds(self._bounds, geometry.bounds)):
+            return False
+        return self.prepared_geometry.intersects(geometry.geometry)
+
+    def contains(self, geometry: Union[str, BaseGeometry]) -> bool:
+        """
+        :param geometry: A geometry, as WKT or as shapely geometry
+        :return: True if the region of interest contains the geometry
+        """
+        return self.prepared_geometry.contains(get_region_of_interest(geometry).geometry)
+
+    def intersect_bounds(self, footprint_bounds: np.array) -> np.array:
+        """
+        :param footprint_bounds: The bounds of footprints, as array of shape (n, 4) with rows (min_x, min_y, max_x,
+        max_y)
+        :return: A boolean array which is true for the footprints whose bounds intersect the bounds of the region
+        """
+        return intersect_bounds(self._bounds, footprint_bounds)
+
+
+@lru_cache(maxsize=_ROI_CACHE_SIZE)
+def _get_region_of_interest_from_wkt(wkt: str) -> RegionOfInterest:
+    return RegionOfInterest(wkt)
+
+
+def get_region_of_interest(roi: Union[str, BaseGeometry, RegionOfInterest]) -> RegionOfInterest:
+    """
+    :param roi: The region of interest, as WKT, as shapely geometry or as RegionOfInterest
+    :return: The region of interest. Regions given as WKT are cached, so every WKT string is parsed only once.
+    """
+    if isinstance(roi, RegionOfInterest):
+        return roi
+    if isinstance(roi, str):
+        return _get_region_of_interest_from_wkt(roi)
+    return RegionOfInterest(roi)
+
+
+def intersect_bounds(bounds: Union[tuple, np.array], footprint_bounds: Union[tuple, np.array]) -> np.array:
+    """
+    Tests bounds against the bounds of many footprints at once. Bounds which only touch are considered to intersect.
+    :param bounds: Bounds as (min_x, min_y, max_x, max_y)
+    :param footprint_bounds: The bounds of the footprints, as array of shape (n, 4), or as single bounds
+    :return: A boolean array which is true for the footprints whose bounds intersect the bounds
+    """
+    min_x, min_y, max_x, max_y = bounds
+    footprint_bounds = np.asarray(footprint_bounds, dtype=np.float64)
+    return (footprint_bounds[..., 0] <= max_x) & (footprint_bounds[..., 2] >= min_x) & \
+           (footprint_bounds[..., 1] <= max_y) & (footprint_bounds[..., 3] >= min_y)
+
+
+def _open_ring(coordinates: np.array) -> np.array:
+    coordinates = np.asarray(coordinates, dtype=np.float64)[:, :2]
+    if len(coordinates) > 1 and np.array_equal(coordinates[0], coordinates[-1]):
+        coordinates = coordinates[:-1]
+    return coordinates
+
+
+def normalize_ring(coordinates: np.array) -> np.array:
+    """
+    Brings the coordinates of a ring into a form which does not depend on its orientation or its first point: the
+    closing point is removed, the ring is oriented counter-clockwise and starts at its lexicographically smallest point.
+    :param coordinates: The coordinates of the ring, as array of shape (n, 2)
+    :return: The normalized coordinates, as array of shape (m, 2)
+    """
+    coordinates = _open_ring(coordinates)
+    x = coordinates[:, 0]
+    y = coordinates[:, 1]
+    signed_area = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+    if signed_area < 0:
+        coordinates = coordinates[::-1]
+    start = np.lexsort((coordinates[:, 1], coordinates[:, 0]))[0] if len(coordinates) > 0 else 0
+    return np.roll(coordinates, -start, axis=0)
+
+
+def are_rings_almost_equal(coordinates_1: np.array, coordinates_2: np.array, decimal: int = 6) -> bool:
+    """
+    :param coordinates_1: The coordinates of a ring, as array of shape (n, 2)
+    :param coordinates_2: The coordinates of another ring, as array of shape (m, 2)
+    :param decimal: The number of decimal places to which coordinates must be equal
+    :return: True if the rings consist of the same points, regardless of their orientation and first point
+    """
+    coordinates_1 = _open_ring(coordinates_1)
+    coordinates_2 = _open_ring(coordinates_2)
+    if coordinates_1.shape != coordinates_2.shape:
+        return False
+    if len(coordinates_1) == 0:
+        return True
+    tolerance = 0.5 * 10 ** (-decimal)
+    # the first point is not chosen exactly, as points equal within the tolerance might be ordered either way:
+    # every point of the other ring which matches the first point, in both orientations, is tried as start instead
+    for candidate in (coordinates_2, coordinates_2[::-1]):
+        starts = np.flatnonzero(np.all(np.abs(candidate - coordinates_1[0]) < tolerance, axis=1))
+        for start in starts:
+            if np.all(np.abs(np.roll(candidate, -start, axis=0) - coordinates_1) < tolerance):
+                return True
+    return False
+
+
+def are_polygons_almost_equal(polygon_1: Union[str, Polygon], polygon_2: Union[str, Polygon],
+                              decimal: int = 6) -> bool:
+    """
+    :param polygon_1: A polygon, as WKT or as shapely polygon
+    :param polygon_2: Another polygon, as WKT or as shapely polygon
+    :param decimal: The number of decimal places to which coordinates must be equal
+    :return: True if the exteriors and the interiors of the polygons consist of the same points, regardless of the
+    orientation and first points of the rings
+    """
+    polygon_1 = get_region_of_interest(polygon_1).geometry
+    polygon_2 = get_region_of_interest(polygon_2).geometry
+    if not are_rings_almost_equal(polygon_1.exterior.coords, polygon_2.exterior.coords, decimal):
+        return False
+    interiors_1 = list(polygon_1.interiors)
+    interiors_2 = list(polygon_2.interiors)
+    if len(interiors_1) != len(interiors_2):
+        return False
+    return all(are_rings_almost_equal(interior_1.coords, interior_2.coords, decimal)
+               for interior_1, interior_2 in zip(interiors_1, interiors_2))
@@ -1,14 +1,24 @@
 from datetime import datetime, timedelta
+from functools import lru_cache, total_ordering
 import scipy.sparse
 import logging
 import numpy as np
-import os
-from shapely.geometry import Point, Polygon
-from shapely.wkt import loads
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
+
+from .dates import get_days_of_months, get_times_from_years_and_days_of_year, is_leap_years
+from .mime_types import get_mime_type
+from .roi import are_polygons_almost_equal
 
 __author__ = "MULTIPLY Team"
 
+# formats, the time to be added to reach the end of the period and whether that time depends on the month
+_TIME_FORMATS = [("%Y-%m-%dT%H:%M:%S", timedelta(), False),
+                 ("%Y-%m-%d %H:%M:%S", timedelta(), False),
+                 ("%Y-%m-%d", timedelta(hours=24, seconds=-1), False),
+                 ("%Y-%m", timedelta(), True),
+                 ("%Y", timedelta(days=365, seconds=-1), False)]
+_TIME_CACHE_SIZE = 16384
+
 
 class AttributeDict(object):
     """
@@ -28,18 +38,12 @@ class AttributeDict(object):
                 self.__dict__[key] = value
 
     def has_entry(self, entry: str):
-        return self._has_entry(entry, 0)
-
-    def _has_entry(self, entry: str, current_index: int):
-        entry_keys = entry.split('.')
-        if entry_keys[current_index] in self.__dict__.keys():
-            if current_index < len(entry_keys):
-                dict_entry = self.__dict__[entry_keys[current_index]]
-                if type(dict_entry) is not dict:
-                    return False
-                return dict_entry._has_entry(entry, current_index + 1)
-            return True
-        return False
+        current = self
+        for key in entry.split('.'):
+            if type(current) is not AttributeDict or key not in current.__dict__:
+                return False
+            current = current.__dict__[key]
+        return True
 
     def __getitem__(self, key):
         """
@@ -48,16 +52,28 @@ class AttributeDict(object):
         return getattr(self, key)
 
 
+_NOT_PARSED = object()
+
+
+@total_ordering
 class FileRef:
     """
-    A reference to the physical location of a file.
+    A reference to the physical location of a file. Start and end time are kept as strings and are parsed into
+    datetimes only when these are requested. File refs are compared and ordered by start time, end time, url and mime
+    type, so file refs whose times are given in different formats are equal if they denote the same times. File refs
+    with times that cannot be parsed are compared by their time strings and are ordered after all others.
     """
+    __slots__ = ('_url', '_start_time', '_end_time', '_mime_type', '_start_datetime', '_end_datetime',
+                 '_comparison_key')
 
     def __init__(self, url: str, start_time: str, end_time: str, mime_type: str):
         self._url = url
         self._start_time = start_time
         self._end_time = end_time
         self._mime_type = mime_type
+        self._start_datetime = _NOT_PARSED
+        self._end_datetime = _NOT_PARSED
+        self._comparison_key = None
 
     @property
     def url(self) -> str:
@@ -79,6 +95,58 @@ class FileRef:
         """The mime type of the file in question."""
         return self._mime_type
 
+    @property
+    def start_datetime(self) -> Optional[datetime]:
+        """The dataset's start time as datetime, or None if the start time is empty."""
+        if self._start_datetime is _NOT_PARSED:
+            self._start_datetime = get_time_from_string(self._start_time)
+        return self._start_datetime
+
+    @property
+    def end_datetime(self) -> Optional[datetime]:
+        """
+        The dataset's end time as datetime, or None if the end time is empty. If the end time does not state a time of
+        day, it is set to the last second of the day, month or year it denotes.
+        """
+        if self._end_datetime is _NOT_PARSED:
+            self._end_datetime = get_time_from_string(self._end_time, adjust_to_last_day=True)
+        return self._end_datetime
+
+    def _get_comparison_key(self) -> tuple:
+        # the key is determined once; a leading flag keeps keys of parsed and of unparsable times apart
+        if self._comparison_key is None:
+            try:
+                start_datetime = self.start_datetime
+                end_datetime = self.end_datetime
+                self._comparison_key = (False, datetime.min if start_datetime is None else start_datetime,
+                                        datetime.min if end_datetime is None else end_datetime, self._url,
+                                        self._mime_type)
+            except ValueError:
+                self._comparison_key = (True, self._start_time, self._end_time, self._url, self._mime_type)
+        return self._comparison_key
+
+    def __eq__(self, other):
+        if not isinstance(other, FileRef):
+            return NotImplemented
+        return self._get_comparison_key() == other._get_comparison_key()
+
+    def __lt__(self, other):
+        if not isinstance(other, FileRef):
+            return NotImplemented
+        return self._get_comparison_key() < other._get_comparison_key()
+
+    def __hash__(self):
+        return hash(self._get_comparison_key())
+
+    def __repr__(self):
+        return 'FileRef({!r}, {!r}, {!r}, {!r})'.format(self._url, self._start_time, self._end_time, self._mime_type)
+
+    def __getstate__(self):
+        return self._url, self._start_time, self._end_time, self._mime_type
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -122,22 +190,72 @@ def get_time_from_string(time_string: str, adjust_to_last_day: bool = False) ->
     """
     if time_string == '':
         return None
-    format_to_timedelta = [("%Y-%m-%dT%H:%M:%S", timedelta(), False),
-                           ("%Y-%m-%d %H:%M:%S", timedelta(), False),
-                           ("%Y-%m-%d", timedelta(hours=24, seconds=-1), False),
-                           ("%Y-%m", timedelta(), True),
-                           ("%Y", timedelta(days=365, seconds=-1), False)]
-    for f, td, adjust in format_to_timedelta:
+    return _get_time_from_string(time_string, adjust_to_last_day)
+
+
+@lru_cache(maxsize=_TIME_CACHE_SIZE)
+def _get_time_from_string(time_string: str, adjust_to_last_day: bool) -> datetime:
+    parsed_time = _parse_iso_time(time_string)
+    if parsed_time is not None:
+        dt, format_index = parsed_time
+        return _adjust_time(dt, format_index, adjust_to_last_day)
+    for format_index, (time_format, _, _) in enumerate(_TIME_FORMATS):
         try:
-            dt = datetime.strptime(time_string, f)
-            if adjust:
-                td = timedelta(days=get_days_of_month(dt.year, dt.month), seconds=-1)
-            return dt + td if adjust_to_last_day else dt
+            dt = datetime.strptime(time_string, time_format)
+            return _adjust_time(dt, format_index, adjust_to_last_day)
         except ValueError:
             pass
     raise ValueError('Invalid date/time value: "%s"' % time_string)
 
 
+def _parse_iso_time(time_string: str) -> Optional[Tuple[datetime, int]]:
+    # Parses the canonical forms of the supported formats without strptime. The format is chosen from the length
+    # and the separators of the string. Returns None if the string is not in canonical form or has invalid values,
+    # so that strptime decides.
+    length = len(time_string)
+    if length == 19:
+        if time_string[10] == 'T':
+            format_index = 0
+        elif time_string[10] == ' ':
+            format_index = 1
+        else:
+            return None
+        if time_string[4] != '-' or time_string[7] != '-' or time_string[13] != ':' or time_string[16] != ':':
+            return None
+        fields = [time_string[0:4], time_string[5:7], time_string[8:10], time_string[11:13], time_string[14:16],
+                  time_string[17:19]]
+    elif length == 10:
+        if time_string[4] != '-' or time_string[7] != '-':
+            return None
+        format_index = 2
+        fields = [time_string[0:4], time_string[5:7], time_string[8:10]]
+    elif length == 7:
+        if time_string[4] != '-':
+            return None
+        format_index = 3
+        fields = [time_string[0:4], time_string[5:7], '01']
+    elif length == 4:
+        format_index = 4
+        fields = [time_string, '01', '01']
+    else:
+        return None
+    if not ''.join(fields).isdigit():
+        return None
+    try:
+        return datetime(*[int(field) for field in fields]), format_index
+    except ValueError:
+        return None
+
+
+def _adjust_time(dt: datetime, format_index: int, adjust_to_last_day: bool) -> datetime:
+    if not adjust_to_last_day:
+        return dt
+    time_format, td, adjust = _TIME_FORMATS[format_index]
+    if adjust:
+        td = timedelta(days=get_days_of_month(dt.year, dt.month), seconds=-1)
+    return dt + td
+
+
 def get_time_from_year_and_day_of_year(year: int, day_of_year: int, set_to_end: bool=False):
     """
     :param year: The year
@@ -146,20 +264,7 @@ def get_time_from_year_and_day_of_year(year: int, day_of_year: int, set_to_end:
     if False, to the first second. False is the default.
     :return: A datetime object reperesenting the year and the day of year
     """
-    days_per_months = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
-    if is_leap_year(year):
-        days_per_months[1] = 29
-    accumulated_days = 0
-    month = 0
-    for i, days_per_month in enumerate(days_per_months):
-        month += 1
-        if accumulated_days + days_per_month >= day_of_year:
-            break
-        accumulated_days += days_per_month
-    day_of_month = day_of_year - accumulated_days
-    if set_to_end:
-        return datetime(year, month, day_of_month, 23, 59, 59)
-    return datetime(year, month, day_of_month)
+    return get_times_from_years_and_days_of_year(year, day_of_year, set_to_end).item()
 
 
 def get_days_of_month(year: int, month: int) -> int:
@@ -169,15 +274,7 @@ def get_days_of_month(year: int, month: int) -> int:
     :param month: The month
     :return: The number of days of this month
     """
-    if month < 1 or month > 12:
-        raise ValueError('Invalid month: %', month)
-    if month in [1, 3, 5, 7, 8, 10, 12]:
-        return 31
-    if month in [4, 6, 9, 11]:
-        return 30
-    if is_leap_year(year):
-        return 29
-    return 28
+    return int(get_days_of_months(year, month))
 
 
 def is_leap_year(year: int) -> bool:
@@ -186,13 +283,7 @@ def is_leap_year(year: int) -> bool:
     :param year: The year.
     :return: True, when the given year is a leap year
     """
-    if year % 4 > 0:
-        return False
-    if year % 400 == 0:
-        return True
-    if year % 100 == 0:
-        return False
-    return True
+    return bool(is_leap_years(year))
 
 
 def are_times_equal(time_1: Union[str, datetime], time_2: Union[str, datetime]):
@@ -203,42 +294,7 @@ def are_times_equal(time_1: Union[str, datetime], time_2: Union[str, datetime]):
     return time_1 == time_2
 
 
-def get_mime_type(file_name: str):
-    if file_name.endswith('.nc'):
-        return 'application/x-netcdf'
-    elif file_name.endswith('.zip'):
-        return 'application/zip'
-    elif file_name.endswith('.json'):
-        return 'application/json'
-    elif file_name.endswith('.hdf'):
-        return 'application/x-hdf'
-    elif file_name.endswith('.pkl'):
-        return 'application/octet-stream'
-    elif file_name.endswith('tiff') or file_name.endswith('tif'):
-        return 'image/tiff'
-    elif file_name.endswith('.vrt'):
-        return 'x-world/x-vrt'
-    elif os.path.isdir(file_name):
-        return 'application/x-directory'
-    return 'unknown mime type'
-
-
-def are_polygons_almost_equal(polygon_1: Union[str, Polygon], polygon_2: Union[str, Polygon]):
-    if type(polygon_2) == str:
-        polygon_2 = loads(polygon_2)
-    if type(polygon_1 == str):
-        polygon_1 = loads(polygon_1)
-    if polygon_1.almost_equals(polygon_2):
-        return True
-    x_list, y_list = polygon_1.exterior.coords.xy
-    reversed_points = []
-    for i in range(len(x_list) - 1, -1, -1):
-        reversed_points.append(Point(x_list[i], y_list[i]))
-    reversed_polygon = Polygon([[p.x, p.y] for p in reversed_points])
-    return reversed_polygon.almost_equals(polygon_2)
-
-
-def block_diag(matrices, format: str=None, dtype: type=None) -> scipy.sparse.coo.coo_matrix:
+def block_diag(matrices, format: str=None, dtype: type=None) -> scipy.sparse.spmatrix:
     """
     Build a block diagonal sparse matrix from provided matrices.
     This is a faster version for equally-sized blocks. Currently, open PR on scipy's github
@@ -251,7 +307,8 @@ def block_diag(matrices, format: str=None, dtype: type=None) -> scipy.sparse.coo
          numpy.matrix or sparse matrix ("csr', 'coo"...)
     format : str, optional
         The sparse format of the result (e.g. "csr").  If not given, the matrix
-        is returned in "coo" format.
+        is returned in "dia" format if all matrices are square and diagonal and
+        in "coo" format otherwise.
     dtype : dtype specifier, optional
         The data-type of the output matrix.  If not given, the dtype is
         determined from that of `blocks`.
@@ -262,8 +319,9 @@ def block_diag(matrices, format: str=None, dtype: type=None) -> scipy.sparse.coo
 
     Notes
     -----
-    Providing a sequence of equally shaped matrices
-     will provide marginally faster results
+    Providing a sequence or an array of equally shaped dense matrices
+     will provide faster results. For these, "csr" results are built
+     directly, without conversion from "coo".
 
     .. versionadded:: 0.18.0
 
@@ -285,51 +343,151 @@ def block_diag(matrices, format: str=None, dtype: type=None) -> scipy.sparse.coo
            [ 0,  0,  0,  0,  9, 10],
            [ 0,  0,  0,  0, 11, 12]])
     """
-    from scipy.sparse.coo import coo_matrix
-    from scipy.sparse import issparse
-
     num_matrices = len(matrices)
-    mats_ = [None] * num_matrices
-    for ia, a in enumerate(matrices):
-        if hasattr(a, 'shape'):
-            mats_[ia] = a
-        else:
-            mats_[ia] = coo_matrix(a)
+    if num_matrices == 0:
+        return scipy.sparse.coo_matrix((0, 0), dtype=dtype).asformat(format)
+    if isinstance(matrices, np.ndarray) and matrices.ndim == 3:
+        return _equally_shaped_blocks_to_sparse(matrices.astype(dtype, copy=False) if dtype else matrices, format)
+    mats_ = [a if hasattr(a, 'shape') else np.asarray(a) for a in matrices]
+    if not any(scipy.sparse.issparse(mat) for mat in mats_) and all(mat.shape == mats_[0].shape for mat in mats_):
+        return _equally_shaped_blocks_to_sparse(np.array(mats_, dtype), format)
+    if format in [None, 'dia']:
+        diagonals = [_get_diagonal(mat) for mat in mats_]
+        if all(diagonal is not None for diagonal in diagonals):
+            return _diagonals_to_sparse(np.concatenate(diagonals), format, dtype)
 
     data = []
     col = []
     row = []
+    origin = np.array([0, 0], dtype=np.int64)
+    for mat in mats_:
+        # any sparse format and dense matrices of any shape are converted to coo
+        mat = scipy.sparse.coo_matrix(mat)
+        data.append(mat.data)
+        row.append(mat.row + origin[0])
+        col.append(mat.col + origin[1])
+        origin += mat.shape
+    data = np.hstack(data)
+    if dtype is not None:
+        data = data.astype(dtype, copy=False)
+    return scipy.sparse.coo_matrix((data, (np.hstack(row), np.hstack(col))), shape=tuple(origin)).asformat(format)
+
+
+def _equally_shaped_blocks_to_sparse(blocks: np.array, format: Optional[str]) -> scipy.sparse.spmatrix:
+    num_blocks, num_rows, num_cols = blocks.shape
+    if format in [None, 'dia'] and num_rows == num_cols:
+        diagonals = np.diagonal(blocks, axis1=1, axis2=2)
+        if np.count_nonzero(blocks) == np.count_nonzero(diagonals):
+            return _diagonals_to_sparse(diagonals.ravel(), format)
+    total_shape = (num_blocks * num_rows, num_blocks * num_cols)
+    data = blocks.ravel()
+    if format in [None, 'coo']:
+        row = np.repeat(np.arange(num_blocks * num_rows), num_cols)
+        col = (np.arange(num_blocks)[:, np.newaxis, np.newaxis] * num_cols +
+               np.arange(num_cols)[np.newaxis, np.newaxis, :])
+        col = np.broadcast_to(col, blocks.shape).ravel()
+        return scipy.sparse.coo_matrix((data, (row, col)), shape=total_shape)
+    # every row holds the num_cols entries of one row of its block
+    indptr = np.arange(0, data.size + 1, num_cols)
+    indices = (np.arange(num_blocks)[:, np.newaxis, np.newaxis] * num_cols +
+               np.arange(num_cols)[np.newaxis, np.newaxis, :])
+    indices = np.broadcast_to(indices, blocks.shape).ravel()
+    return scipy.sparse.csr_matrix((data, indices, indptr), shape=total_shape).asformat(format)
+
+
+def _get_diagonal(matrix) -> Optional[np.array]:
+    # returns the diagonal of a square matrix which has no entries off the diagonal, None for any other matrix
+    if matrix.shape[0] != matrix.shape[1]:
+        return None
+    if scipy.sparse.issparse(matrix):
+        if matrix.format == 'dia' and np.all(matrix.offsets == 0):
+            return matrix.diagonal()
+        coo = matrix.tocoo()
+        if np.any(coo.row[coo.data != 0] != coo.col[coo.data != 0]):
+            return None
+        return matrix.diagonal()
+    matrix = np.asarray(matrix)
+    diagonal = np.diagonal(matrix)
+    if np.count_nonzero(matrix) != np.count_nonzero(diagonal):
+        return None
+    return diagonal
 
-    if num_matrices == 0:
-        total_shape = (0, 0)
-    elif any(mat.shape != mats_[-1].shape for mat in mats_) or (any(issparse(mat) for mat in mats_)):
-        origin = np.array([0, 0], dtype=np.int)
-        for mat in mats_:
-            if issparse(mat):
-                data.append(mat.data)
-                row.append(mat.row + origin[0])
-                col.append(mat.col + origin[1])
 
-            else:
-                data.append(mat.ravel())
-                row_, col_ = np.indices(mat.shape)
-                row.append(row_.ravel() + origin[0])
-                col.append(col_.ravel() + origin[1])
+def _diagonals_to_sparse(diagonal: np.array, format: Optional[str], dtype: type=None) -> scipy.sparse.spmatrix:
+    if dtype is not None:
+        diagonal = diagonal.astype(dtype, copy=False)
+    return scipy.sparse.dia_matrix((diagonal[np.newaxis, :], [0]), shape=(diagonal.size, diagonal.size)).\
+        asformat(format)
 
-            origin += mat.shape
 
-        data = np.hstack(data)
-        col = np.hstack(col)
-        row = np.hstack(row)
-        total_shape = origin
-    else:
-        shape = mats_[0].shape
-        data = np.array(mats_, dtype).ravel()
-        row_, col_ = np.indices(shape)
-        row = (np.tile(row_.ravel(), num_matrices) +
-               np.arange(num_matrices).repeat(shape[0] * shape[1]) * shape[0]).ravel()
-        col = (np.tile(col_.ravel(), num_matrices) +
-               np.arange(num_matrices).repeat(shape[0] * shape[1]) * shape[1]).ravel()
-        total_shape = (shape[0] * num_matrices, shape[1] * num_matrices)
-
-    return coo_matrix((data, (row, col)), shape=total_shape).asformat(format)
+def _check_blocks(blocks: np.array) -> np.array:
+    blocks = np.asarray(blocks)
+    if blocks.ndim != 3 or blocks.shape[1] != blocks.shape[2]:
+        raise ValueError('Blocks must be given as array of shape (n, k, k), got shape {}'.format(blocks.shape))
+    return blocks
+
+
+def _check_vectors(blocks: np.array, vectors: np.array) -> np.array:
+    vectors = np.asarray(vectors)
+    if vectors.shape[:2] != blocks.shape[:2] or vectors.ndim not in [2, 3]:
+        raise ValueError('Vectors of shape {} do not fit blocks of shape {}'.format(vectors.shape, blocks.shape))
+    return vectors
+
+
+def solve_blocks(blocks: np.array, vectors: np.array) -> np.array:
+    """
+    Solves the linear systems of a stack of blocks at once. This is equivalent to solving the system of the block
+    diagonal matrix of the blocks, without building a sparse matrix.
+    :param blocks: The square matrices, as array of shape (n, k, k)
+    :param vectors: The right hand sides, as array of shape (n, k), or of shape (n, k, m) for m right hand sides per
+    block
+    :return: The solutions, in the shape of the right hand sides
+    """
+    blocks = _check_blocks(blocks)
+    vectors = _check_vectors(blocks, vectors)
+    if vectors.ndim == 2:
+        return np.linalg.solve(blocks, vectors[..., np.newaxis])[..., 0]
+    return np.linalg.solve(blocks, vectors)
+
+
+def invert_blocks(blocks: np.array) -> np.array:
+    """
+    :param blocks: The square matrices, as array of shape (n, k, k)
+    :return: The inverses of the blocks, as array of shape (n, k, k)
+    """
+    return np.linalg.inv(_check_blocks(blocks))
+
+
+def cholesky_blocks(blocks: np.array) -> np.array:
+    """
+    :param blocks: Symmetric positive-definite matrices, as array of shape (n, k, k)
+    :return: The lower triangular Cholesky factors of the blocks, as array of shape (n, k, k). A LinAlgError is raised
+    if any block is not positive-definite.
+    """
+    return np.linalg.cholesky(_check_blocks(blocks))
+
+
+def multiply_blocks(blocks: np.array, vectors: np.array) -> np.array:
+    """
+    Multiplies each block with its vector.
+    :param blocks: The square matrices, as array of shape (n, k, k)
+    :param vectors: The vectors, as array of shape (n, k), or of shape (n, k, m) for m vectors per block
+    :return: The products, in the shape of the vectors
+    """
+    blocks = _check_blocks(blocks)
+    vectors = _check_vectors(blocks, vectors)
+    if vectors.ndim == 2:
+        return np.matmul(blocks, vectors[..., np.newaxis])[..., 0]
+    return np.matmul(blocks, vectors)
+
+
+def blocks_to_sparse(blocks: np.array, format: str=None, dtype: type=None) -> scipy.sparse.spmatrix:
+    """
+    Converts a stack of blocks into the block diagonal sparse matrix. Only needed where a sparse matrix is required,
+    the functions for stacked blocks work on the blocks directly.
+    :param blocks: The square matrices, as array of shape (n, k, k)
+    :param format: The sparse format of the result. See block_diag.
+    :param dtype: The data type of the result
+    :return: The block diagonal matrix
+    """
+    return block_diag(_check_blocks(blocks), format=format, dtype=dtype)
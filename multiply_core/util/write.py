@@ -1,23 +1,238 @@
 import gdal
+import os
+import threading
+import time
+from typing import List, Optional, Union
+
+from .util import get_logger
 
 __author__ = "Tonio Fincke (Brockmann Consult GmbH)"
 
 
-def write_gdal_raster(dataset: gdal.Dataset, output_file_name: str):
+class GeoTiffProfile(object):
+    """
+    A set of creation options for GeoTIFF outputs: compression, predictor, block size and the number of threads
+    used for compression.
+    """
+
+    def __init__(self, compression: str = 'DEFLATE', predictor: int = 1, block_size: Optional[int] = None,
+                 num_threads: Optional[Union[int, str]] = None, compression_level: Optional[int] = None):
+        """
+        :param compression: The compression algorithm, e.g. 'DEFLATE', 'LZW', 'ZSTD' or 'NONE'
+        :param predictor: 1 for no predictor, 2 for horizontal differencing, 3 for floating point prediction.
+        Floating point prediction falls back to horizontal differencing for integer outputs.
+        :param block_size: The width and height of the tiles. If not given, gdal's default is used.
+        :param num_threads: The number of threads used for compression, or 'ALL_CPUS'
+        :param compression_level: The level of DEFLATE or ZSTD compression
+        """
+        self.compression = compression
+        self.predictor = predictor
+        self.block_size = block_size
+        self.num_threads = num_threads
+        self.compression_level = compression_level
+
+    def get_creation_options(self, data_type: int = gdal.GDT_Float32) -> List[str]:
+        """
+        :param data_type: The gdal data type of the output
+        :return: The creation options for a GeoTIFF of this data type
+        """
+        options = ['COMPRESS={}'.format(self.compression), 'BIGTIFF=YES', 'TILED=YES']
+        if self.compression != 'NONE':
+            predictor = self.predictor
+            if predictor == 3 and data_type not in [gdal.GDT_Float32, gdal.GDT_Float64]:
+                predictor = 2
+            options.append('PREDICTOR={}'.format(predictor))
+        if self.compression_level is not None:
+            if self.compression == 'DEFLATE':
+                options.append('ZLEVEL={}'.format(self.compression_level))
+            elif self.compression == 'ZSTD':
+                options.append('ZSTD_LEVEL={}'.format(self.compression_level))
+        if self.block_size is not None:
+            options.append('BLOCKXSIZE={}'.format(self.block_size))
+            options.append('BLOCKYSIZE={}'.format(self.block_size))
+        if self.num_threads is not None:
+            options.append('NUM_THREADS={}'.format(self.num_threads))
+        return options
+
+
+class WriterMetrics(object):
+    """
+    Collects, per output file, the number of blocks written, the number of raw and compressed bytes and the time
+    spent writing and closing. Metrics may be updated from several threads.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_file_metrics(self, file_name: str) -> dict:
+        if file_name not in self._metrics:
+            self._metrics[file_name] = {'blocks_written': 0, 'raw_bytes': 0, 'compressed_bytes': 0,
+                                        'write_time': 0.0, 'close_time': 0.0}
+        return self._metrics[file_name]
+
+    def add_write(self, file_name: str, num_bytes: int, seconds: float):
+        """
+        :param file_name: The name of the output file
+        :param num_bytes: The number of uncompressed bytes of the block that has been written
+        :param seconds: The time it took to write the block
+        """
+        with self._lock:
+            file_metrics = self._get_file_metrics(file_name)
+            file_metrics['blocks_written'] += 1
+            file_metrics['raw_bytes'] += num_bytes
+            file_metrics['write_time'] += seconds
+
+    def add_close(self, file_name: str, seconds: float):
+        """
+        Adds the time it took to flush and close a file. The number of compressed bytes is set to the size of the file.
+        :param file_name: The name of the output file
+        :param seconds: The time it took to flush and close the file
+        """
+        with self._lock:
+            file_metrics = self._get_file_metrics(file_name)
+            file_metrics['close_time'] += seconds
+            if os.path.exists(file_name):
+                file_metrics['compressed_bytes'] = os.path.getsize(file_name)
+
+    def get_metrics(self) -> dict:
+        """
+        :return: A dictionary which maps the names of the output files to dictionaries with the entries
+        'blocks_written', 'raw_bytes', 'compressed_bytes', 'write_time' and 'close_time'. Times are in seconds.
+        """
+        with self._lock:
+            return {file_name: dict(file_metrics) for file_name, file_metrics in self._metrics.items()}
+
+    def log_metrics(self, logger_name: str = 'WriterMetrics'):
+        """
+        Logs one line with the metrics of each output file.
+        :param logger_name: The name of the logger
+        """
+        logger = get_logger(logger_name)
+        for file_name, file_metrics in self.get_metrics().items():
+            total_time = file_metrics['write_time'] + file_metrics['close_time']
+            throughput = file_metrics['raw_bytes'] / total_time / 2 ** 20 if total_time > 0 else 0.
+            logger.info('{}: {} blocks, {} raw bytes, {} compressed bytes, write {:.3f} s, close {:.3f} s, '
+                        '{:.1f} MiB/s'.format(file_name, file_metrics['blocks_written'], file_metrics['raw_bytes'],
+                                              file_metrics['compressed_bytes'], file_metrics['write_time'],
+                                              file_metrics['close_time'], throughput))
+
+
+def _is_compression_supported(compression: str) -> bool:
+    creation_options = gdal.GetDriverByName('GTiff').GetMetadataItem('DMD_CREATIONOPTIONLIST')
+    return creation_options is not None and '<Value>{}</Value>'.format(compression) in creation_options
+
+
+def _create_profiles() -> dict:
+    has_zstd = _is_compression_supported('ZSTD')
+    return {
+        # the options GeoTIFFs have always been written with
+        'default': GeoTiffProfile('DEFLATE', predictor=1),
+        'fast': GeoTiffProfile('ZSTD' if has_zstd else 'LZW', predictor=3, block_size=512, num_threads='ALL_CPUS',
+                               compression_level=1 if has_zstd else None),
+        'small': GeoTiffProfile('DEFLATE', predictor=3, block_size=512, num_threads='ALL_CPUS', compression_level=9),
+        'uncompressed': GeoTiffProfile('NONE', block_size=512)
+    }
+
+
+GEOTIFF_PROFILES = _create_profiles()
+
+
+def get_geotiff_profile(profile: Union[str, GeoTiffProfile, None]) -> GeoTiffProfile:
+    """
+    :param profile: A profile or the name of one of the presets 'default', 'fast', 'small' and 'uncompressed'.
+    If None, the default profile is returned.
+    :return: The GeoTIFF profile
+    """
+    if profile is None:
+        return GEOTIFF_PROFILES['default']
+    if isinstance(profile, GeoTiffProfile):
+        return profile
+    if profile not in GEOTIFF_PROFILES:
+        raise ValueError('GeoTIFF profile {} not supported.'.format(profile))
+    return GEOTIFF_PROFILES[profile]
+
+
+def write_gdal_raster(dataset: gdal.Dataset, output_file_name: str,
+                      profile: Union[str, GeoTiffProfile, None] = None, metrics: Optional[WriterMetrics] = None):
+    """
+    Writes a dataset to a tiled, compressed GeoTIFF. The data is copied block row by block row, with blocks aligned
+    to the tiles of the output file, so memory use does not depend on the size of the dataset. All bands are written
+    and their data types and no data values are preserved.
+    :param dataset: The dataset to be written. May be a lazily reprojected dataset.
+    :param output_file_name: The name of the output file
+    :param profile: The GeoTIFF profile or the name of a preset. If not given, the default profile is used.
+    :param metrics: If given, the blocks and bytes written and the time spent writing and closing are added to it.
+    """
     raster_width = dataset.RasterXSize
     raster_height = dataset.RasterYSize
+    num_bands = dataset.RasterCount
     driver = gdal.GetDriverByName('GTiff')
-    s2_file = driver.Create(output_file_name, raster_width, raster_height, 1, gdal.GDT_Float32,
-                            ['COMPRESS=DEFLATE', 'BIGTIFF=YES', 'PREDICTOR=1', 'TILED=YES'])
-    tiff_data = dataset.GetRasterBand(1).ReadAsArray()
-    projection = dataset.GetProjection()
-    transform = dataset.GetGeoTransform()
-    s2_file.SetProjection(projection)
-    s2_file.SetGeoTransform(transform)
-    tile_width = 256
-    tile_height = 256
+    data_type = dataset.GetRasterBand(1).DataType
+    output_data_set = driver.Create(output_file_name, raster_width, raster_height, num_bands, data_type,
+                                    get_geotiff_profile(profile).get_creation_options(data_type))
+    output_data_set.SetProjection(dataset.GetProjection())
+    output_data_set.SetGeoTransform(dataset.GetGeoTransform())
+    for band_index in range(1, num_bands + 1):
+        no_data_value = dataset.GetRasterBand(band_index).GetNoDataValue()
+        if no_data_value is not None:
+            output_data_set.GetRasterBand(band_index).SetNoDataValue(no_data_value)
+    tile_width, tile_height = output_data_set.GetRasterBand(1).GetBlockSize()
     for y in range(0, raster_height, tile_height):
         y_end = min(y + tile_height, raster_height)
-        for x in range(0, raster_width, tile_width):
-            x_end = min(x + tile_height, raster_width)
-            s2_file.GetRasterBand(1).WriteArray(tiff_data[y:y_end, x:x_end], xoff=x, yoff=y)
\ No newline at end of file
+        for band_index in range(1, num_bands + 1):
+            # one block row at a time: lazily reprojected datasets are computed only for this window
+            block_row = dataset.GetRasterBand(band_index).ReadAsArray(0, y, raster_width, y_end - y)
+            start = time.perf_counter()
+            output_data_set.GetRasterBand(band_index).WriteArray(block_row, xoff=0, yoff=y)
+            if metrics is not None:
+                metrics.add_write(output_file_name, block_row.nbytes, time.perf_counter() - start)
+    start = time.perf_counter()
+    output_data_set.FlushCache()
+    output_data_set = None
+    if metrics is not None:
+        metrics.add_close(output_file_name, time.perf_counter() - start)
+
+
+def get_overview_levels(width: int, height: int, block_size: int) -> List[int]:
+    """
+    :return: The factors 2, 4, 8, ... of the overviews required until an overview fits into a single block.
+    """
+    levels = []
+    factor = 1
+    while max(width, height) / factor > block_size:
+        factor *= 2
+        levels.append(factor)
+    return levels
+
+
+def convert_to_cloud_optimized_geotiff(file_name: str, overview_resampling: str = 'average',
+                                       profile: Union[str, GeoTiffProfile, None] = None,
+                                       metrics: Optional[WriterMetrics] = None):
+    """
+    Turns a GeoTIFF into a cloud optimized GeoTIFF. Internal overviews are added and the file is rewritten so that
+    the overviews and tiles are laid out for reading by HTTP range requests. The file is replaced only once it
+    has been rewritten completely.
+    :param file_name: The name of a tiled GeoTIFF file
+    :param overview_resampling: The resampling method used to compute the overviews, e.g. 'average', 'nearest' or
+    'mode'
+    :param profile: The GeoTIFF profile for the rewritten file. If not given, the default profile is used.
+    :param metrics: If given, the time spent on the conversion is added to the close time of the file and the size of
+    the rewritten file is recorded as its compressed bytes.
+    """
+    start = time.perf_counter()
+    profile = get_geotiff_profile(profile)
+    data_set = gdal.Open(file_name, gdal.GA_Update)
+    block_size = data_set.GetRasterBand(1).GetBlockSize()[0]
+    data_type = data_set.GetRasterBand(1).DataType
+    levels = get_overview_levels(data_set.RasterXSize, data_set.RasterYSize, block_size)
+    if len(levels) > 0:
+        data_set.BuildOverviews(overview_resampling.upper(), levels)
+    data_set = None
+    temporary_file_name = file_name + '.cog.tif'
+    creation_options = profile.get_creation_options(data_type) + ['COPY_SRC_OVERVIEWS=YES']
+    cloud_optimized_data_set = gdal.Translate(temporary_file_name, file_name, creationOptions=creation_options)
+    cloud_optimized_data_set = None
+    os.replace(temporary_file_name, file_name)
+    if metrics is not None:
+        metrics.add_close(file_name, time.perf_counter() - start)
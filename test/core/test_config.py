@@ -0,0 +1,71 @@
+from multiply_core.util import Config
+import pickle
+import pytest
+
+__author__ = "MULTIPLY Team"
+
+
+def _create_config() -> Config:
+    return Config({'General': {'roi': 'POLYGON((5 5, 20 5, 20 20, 5 20, 5 5))', 'spatial_resolution': 20},
+                   'Inference': {'optimization': {'method': 'L-BFGS-B', 'max_iterations': 100}},
+                   'output_directory': '/some/dir'})
+
+
+def test_config_access():
+    config = _create_config()
+
+    assert 3 == len(config)
+    assert 'output_directory' in config
+    assert '/some/dir' == config['output_directory']
+    assert '/some/dir' == config.output_directory
+    assert 20 == config.General.spatial_resolution
+    assert 'L-BFGS-B' == config['Inference']['optimization']['method']
+    assert isinstance(config.Inference, Config)
+    assert config.Inference is config.Inference
+    assert ['General', 'Inference', 'output_directory'] == list(config)
+    with pytest.raises(AttributeError):
+        config.missing
+    with pytest.raises(KeyError):
+        config['missing']
+
+
+def test_config_get_and_has_entry():
+    config = _create_config()
+
+    assert 100 == config.get_entry('Inference.optimization.max_iterations')
+    assert {'method': 'L-BFGS-B', 'max_iterations': 100} == config.get_entry('Inference.optimization')
+    assert config.get_entry('Inference.optimization.tolerance') is None
+    assert 0.1 == config.get_entry('Inference.optimization.tolerance', 0.1)
+    assert config.get_entry('output_directory.sub_directory') is None
+    assert config.has_entry('Inference.optimization.method')
+    assert config.has_entry('General')
+    assert not config.has_entry('General.roi.something')
+    assert not config.has_entry('General.time')
+
+
+def test_config_set_and_freeze():
+    config = _create_config()
+    config['output_directory'] = '/other/dir'
+    config.General.spatial_resolution = 10
+
+    assert '/other/dir' == config.output_directory
+    assert 10 == config.get_entry('General.spatial_resolution')
+    assert config.freeze() is config
+    assert config.frozen
+    assert config.General.frozen
+    assert config.Inference.optimization.frozen
+    with pytest.raises(TypeError):
+        config['output_directory'] = '/dir'
+    with pytest.raises(TypeError):
+        config.General.spatial_resolution = 60
+
+
+def test_config_to_dict_and_pickle():
+    config = _create_config().freeze()
+    entries = config.to_dict()
+    entries['General']['spatial_resolution'] = 10
+
+    assert 20 == config.General.spatial_resolution
+    unpickled_config = pickle.loads(pickle.dumps(config))
+    assert config == unpickled_config
+    assert unpickled_config.frozen
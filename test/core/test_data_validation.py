@@ -243,6 +243,9 @@ def test_aster_is_valid_for():
     assert validator.is_valid_for('ASTGTM2_N12E133_dem.tif', polygon, datetime(1000, 1, 1), datetime(1000, 1, 3))
     assert validator.is_valid_for('/some/path/ASTGTM2_N12E133_dem.tif', polygon, datetime(1000, 1, 1), datetime(1000, 1, 3))
     assert not validator.is_valid_for('ASTGTM2_N13E133_dem.tif', polygon, datetime(1000, 1, 1), datetime(1000, 1, 3))
+    wkt = 'POLYGON((134.20 12.09, 133.91 12.09, 133.91 11.94, 134.2 11.94, 134.20 12.09))'
+    assert validator.is_valid_for('ASTGTM2_N12E134_dem.tif', wkt, datetime(1000, 1, 1), datetime(1000, 1, 3))
+    assert not validator.is_valid_for('ASTGTM2_N13E133_dem.tif', wkt, datetime(1000, 1, 1), datetime(1000, 1, 3))
 
 
 def test_get_valid_types():
@@ -0,0 +1,66 @@
+from datetime import datetime
+from multiply_core.util import get_days_of_months, get_times_from_day_of_year_tokens, \
+    get_times_from_years_and_days_of_year, is_leap_years
+import numpy as np
+import pytest
+
+__author__ = "MULTIPLY Team"
+
+
+def test_is_leap_years():
+    np.testing.assert_array_equal([True, False, True, False, True], is_leap_years([2004, 2003, 2000, 1900, 1600]))
+
+
+def test_get_days_of_months():
+    days = get_days_of_months(2017, np.arange(1, 13))
+
+    np.testing.assert_array_equal([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], days)
+    np.testing.assert_array_equal([29, 29, 28, 29], get_days_of_months([2016, 2000, 1900, 1600], 2))
+
+
+def test_get_days_of_months_invalid_month():
+    with pytest.raises(ValueError):
+        get_days_of_months([2017, 2017], [12, 13])
+
+
+def test_get_times_from_years_and_days_of_year():
+    times = get_times_from_years_and_days_of_year([2017, 2017, 2016, 2016], [151, 238, 60, 366])
+
+    assert 'datetime64[s]' == times.dtype
+    assert [datetime(2017, 5, 31), datetime(2017, 8, 26), datetime(2016, 2, 29), datetime(2016, 12, 31)] == \
+        times.tolist()
+
+
+def test_get_times_from_years_and_days_of_year_set_to_end():
+    times = get_times_from_years_and_days_of_year(2017, [1, 365], set_to_end=True)
+
+    assert [datetime(2017, 1, 1, 23, 59, 59), datetime(2017, 12, 31, 23, 59, 59)] == times.tolist()
+
+
+def test_get_times_from_years_and_days_of_year_invalid_day_of_year():
+    with pytest.raises(ValueError):
+        get_times_from_years_and_days_of_year([2016, 2017], [366, 366])
+    with pytest.raises(ValueError):
+        get_times_from_years_and_days_of_year(2017, 0)
+
+
+def test_get_times_from_day_of_year_tokens():
+    times = get_times_from_day_of_year_tokens(np.array([['A2017238', 'A2016366'], ['A2000001', 'A2017151']]))
+
+    assert (2, 2) == times.shape
+    assert [[datetime(2017, 8, 26), datetime(2016, 12, 31)], [datetime(2000, 1, 1), datetime(2017, 5, 31)]] == \
+        times.tolist()
+
+
+def test_get_times_from_day_of_year_tokens_empty():
+    times = get_times_from_day_of_year_tokens([])
+
+    assert (0,) == times.shape
+    assert 'datetime64[s]' == times.dtype
+
+
+@pytest.mark.parametrize('tokens', [['A2017238', 'A201723'], ['A2017238', 'A20172380'], ['B2017238'], ['A2017x38'],
+                                    ['A2017000']])
+def test_get_times_from_day_of_year_tokens_invalid(tokens):
+    with pytest.raises(ValueError):
+        get_times_from_day_of_year_tokens(tokens)
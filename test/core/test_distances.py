@@ -0,0 +1,57 @@
+from multiply_core.util import NearestPointFinder, compute_distance, compute_distance_matrix, compute_distances
+import numpy as np
+import pytest
+
+__author__ = "MULTIPLY Team"
+
+MEAN_EARTH_RADIUS = 6372000
+
+
+def test_compute_distances():
+    distances = compute_distances(np.array([7.8, 7.8, 8.8]), np.array([53.5, 53.5, 53.5]),
+                                  np.array([8.8, 7.8, 8.8]), np.array([53.8, 53.8, 53.8]), MEAN_EARTH_RADIUS)
+
+    np.testing.assert_allclose([73878.9732269, 33363.713981, 33363.713981], distances)
+
+
+def test_compute_distances_small_and_antipodal():
+    # one millimetre, which the arccos formula cannot resolve
+    small_distance = compute_distances(8.0, 53.0, 8.0, 53.0 + np.rad2deg(0.001 / MEAN_EARTH_RADIUS), MEAN_EARTH_RADIUS)
+    assert pytest.approx(0.001, rel=1e-6) == small_distance
+    assert pytest.approx(np.pi * MEAN_EARTH_RADIUS) == compute_distances(0., 0., 180., 0., MEAN_EARTH_RADIUS)
+    assert 0. == compute_distances(8.0, 53.0, 8.0, 53.0, MEAN_EARTH_RADIUS)
+
+
+def test_compute_distance_matrix():
+    lons, lats = np.meshgrid([7.8, 8.3, 8.8], [53.5, 53.8])
+    station_lons = np.array([7.8, 8.8, 9.0, 7.0])
+    station_lats = np.array([53.5, 53.8, 54.0, 53.0])
+    distances = compute_distance_matrix(lons, lats, station_lons, station_lats, MEAN_EARTH_RADIUS)
+
+    assert (2, 3, 4) == distances.shape
+    assert 0. == distances[0, 0, 0]
+    assert pytest.approx(73878.9732269) == distances[0, 0, 1]
+    assert pytest.approx(compute_distance(8.3, 53.8, 7.0, 53.0, MEAN_EARTH_RADIUS)) == distances[1, 1, 3]
+    with pytest.raises(ValueError):
+        compute_distance_matrix(lons, lats[0], station_lons, station_lats, MEAN_EARTH_RADIUS)
+
+
+def test_nearest_point_finder():
+    random_state = np.random.RandomState(0)
+    lons = random_state.uniform(-180, 180, 500)
+    lats = np.rad2deg(np.arcsin(random_state.uniform(-1, 1, 500)))
+    query_lons = random_state.uniform(-180, 180, (4, 5))
+    query_lats = random_state.uniform(-90, 90, (4, 5))
+    finder = NearestPointFinder(lons, lats, MEAN_EARTH_RADIUS)
+
+    distances, indexes = finder.query(query_lons, query_lats)
+    all_distances = compute_distance_matrix(query_lons, query_lats, lons, lats, MEAN_EARTH_RADIUS)
+    assert (4, 5) == indexes.shape
+    np.testing.assert_array_equal(np.argmin(all_distances, axis=-1), indexes)
+    np.testing.assert_allclose(np.min(all_distances, axis=-1), distances)
+
+    distances, indexes = finder.query(query_lons, query_lats, k=3)
+    assert (4, 5, 3) == indexes.shape
+    np.testing.assert_allclose(np.sort(all_distances, axis=-1)[..., :3], distances)
+    with pytest.raises(ValueError):
+        finder.query(query_lons, query_lats, k=501)
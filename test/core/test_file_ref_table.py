@@ -0,0 +1,85 @@
+from datetime import datetime
+from multiply_core.util import FileRef, FileRefTable
+import numpy as np
+import pickle
+import pytest
+
+__author__ = "MULTIPLY Team"
+
+
+def _create_table() -> FileRefTable:
+    return FileRefTable(urls=['loc1', 'loc2', 'loc3', 'loc4', 'loc5'],
+                        start_times=['2017-06-04', '2017-06-01', '2017-06-03', '2017-06-02', '2017-06-05 12:00:00'],
+                        end_times=['2017-06-07', '2017-06-06', '2017-06-10', '2017-06-09', '2017-06-08'],
+                        mime_types=['image/tiff', 'application/x-directory', 'image/tiff', 'image/tiff',
+                                    'application/x-directory'],
+                        data_types=['MODIS', 'AWS_S2_L2', 'MODIS', None, 'AWS_S2_L2'])
+
+
+def test_file_ref_table_create():
+    table = _create_table()
+
+    assert 5 == len(table)
+    assert not table.is_sorted
+    assert np.datetime64('2017-06-04T00:00:00') == table.start_times[0]
+    assert np.datetime64('2017-06-07T23:59:59') == table.end_times[0]
+    assert 'AWS_S2_L2' == table.get_data_type(1)
+    assert table.get_data_type(3) is None
+    with pytest.raises(ValueError):
+        FileRefTable(['loc1', 'loc2'], ['2017-06-04'], ['2017-06-07'], ['image/tiff'])
+
+
+def test_file_ref_table_get_item():
+    file_ref = _create_table()[4]
+
+    assert isinstance(file_ref, FileRef)
+    assert 'loc5' == file_ref.url
+    assert 'application/x-directory' == file_ref.mime_type
+    assert datetime(2017, 6, 5, 12) == file_ref.start_datetime
+    assert '2017-06-05 12:00:00' == file_ref.start_time
+    assert '2017-06-08 23:59:59' == file_ref.end_time
+    assert FileRef('loc5', '2017-06-05 12:00:00', '2017-06-08 23:59:59', 'application/x-directory') == file_ref
+    assert file_ref == pickle.loads(pickle.dumps(file_ref))
+
+
+def test_file_ref_table_sort():
+    table = _create_table()
+    table.sort()
+
+    assert table.is_sorted
+    assert ['loc2', 'loc4', 'loc3', 'loc1', 'loc5'] == [file_ref.url for file_ref in table]
+    assert ['AWS_S2_L2', None, 'MODIS', 'MODIS', 'AWS_S2_L2'] == [table.get_data_type(i) for i in range(len(table))]
+
+
+def test_file_ref_table_get_time_range():
+    table = _create_table()
+    unsorted_range = table.get_time_range('2017-06-02', '2017-06-04')
+    table.sort()
+    sorted_range = table.get_time_range(datetime(2017, 6, 2), '2017-06-04')
+
+    assert ['loc4', 'loc3', 'loc1'] == [file_ref.url for file_ref in sorted_range]
+    assert {'loc1', 'loc3', 'loc4'} == set([file_ref.url for file_ref in unsorted_range])
+    assert 0 == len(table.get_time_range('2018-01-01', '2018-12-31'))
+
+
+def test_file_ref_table_filter():
+    table = _create_table()
+    directories = table.filter(table.get_mime_type_mask('application/x-directory'))
+    modis = table[table.get_data_type_mask('MODIS')]
+
+    assert ['loc2', 'loc5'] == [file_ref.url for file_ref in directories]
+    assert ['loc1', 'loc3'] == [file_ref.url for file_ref in modis]
+    assert 'MODIS' == modis.get_data_type(1)
+    assert 0 == len(table.filter(table.get_data_type_mask('CAMS')))
+    with pytest.raises(ValueError):
+        table.filter(np.array([True, False]))
+
+
+def test_file_ref_table_from_file_refs():
+    file_refs = [FileRef('loc1', '2017-06-04', '2017-06-07', 'image/tiff'),
+                 FileRef('loc2', '2017-06-01', '2017-06-06', 'image/tiff')]
+    table = FileRefTable.from_file_refs(file_refs)
+
+    assert 2 == len(table)
+    assert [file_ref.url for file_ref in file_refs] == [file_ref.url for file_ref in table]
+    assert [file_ref.end_datetime for file_ref in file_refs] == [file_ref.end_datetime for file_ref in table]
@@ -0,0 +1,59 @@
+from multiprocessing import Pool
+from multiply_core.observations import MemmapWriter, read_memmap
+import numpy as np
+import os
+import shutil
+
+__author__ = "MULTIPLY Team"
+
+MEMMAP_WRITE_FOLDER = './test/test_data/memmap'
+GEO_TRANSFORM = (582414.9967658486, 120.0, 0.0, 4317096.927011872, 0.0, -120.0)
+PROJECTION = 'PROJCS["UTM Zone 30, Northern Hemisphere",GEOGCS["WGS 84",DATUM["WGS_1984",' \
+             'SPHEROID["WGS 84",6378137,298.257223563]],PRIMEM["Greenwich",0],UNIT["degree",0.0174532925199433]],' \
+             'PROJECTION["Transverse_Mercator"],PARAMETER["central_meridian",-3],UNIT["Meter",1]]'
+
+
+def _write_rows(writer: MemmapWriter, offset_y: int):
+    data = np.full((2, 2, 6), offset_y, dtype=np.float32)
+    writer.write([data], width=6, height=2, offset_y=offset_y)
+    writer.close()
+
+
+def test_memmap_writer_write_and_read():
+    file_names = [os.path.abspath('{}/name1'.format(MEMMAP_WRITE_FOLDER)),
+                  os.path.abspath('{}/name2.npy'.format(MEMMAP_WRITE_FOLDER))]
+    try:
+        writer = MemmapWriter(file_names, GEO_TRANSFORM, PROJECTION, 6, 4, [1, 2], ['Int', 'Float'])
+        data_1 = np.arange(24, dtype=np.int32).reshape(4, 6)
+        data_2 = np.arange(48, dtype=np.float32).reshape(2, 4, 6)
+        writer.write([data_1[:, :3], data_2[:, :, :3]], width=3, height=4)
+        writer.write([data_1[:, 3:], data_2[:, :, 3:]], width=3, height=4, offset_x=3)
+        writer.close()
+        # closing again has no effect
+        writer.close()
+
+        array, geo_transform, projection = read_memmap(file_names[0])
+        assert isinstance(array, np.memmap)
+        np.testing.assert_array_equal(data_1, array[0])
+        assert GEO_TRANSFORM == geo_transform
+        assert PROJECTION == projection
+        array, _, _ = read_memmap(file_names[1])
+        assert np.float32 == array.dtype
+        np.testing.assert_array_equal(data_2, array)
+    finally:
+        shutil.rmtree(MEMMAP_WRITE_FOLDER, ignore_errors=True)
+
+
+def test_memmap_writer_write_from_several_processes():
+    file_names = [os.path.abspath('{}/name3.npy'.format(MEMMAP_WRITE_FOLDER))]
+    try:
+        writer = MemmapWriter(file_names, GEO_TRANSFORM, PROJECTION, 6, 8, [2])
+        with Pool(2) as pool:
+            pool.starmap(_write_rows, [(writer, offset_y) for offset_y in range(0, 8, 2)])
+        writer.close()
+
+        array, _, _ = read_memmap(file_names[0])
+        expected = np.repeat(np.arange(0, 8, 2), 2)[np.newaxis, :, np.newaxis] * np.ones((2, 8, 6))
+        np.testing.assert_array_equal(expected, array)
+    finally:
+        shutil.rmtree(MEMMAP_WRITE_FOLDER, ignore_errors=True)
@@ -0,0 +1,65 @@
+from multiply_core.util import MimeTypeDetector, get_mime_type, get_mime_types
+import os
+import shutil
+import tempfile
+
+__author__ = "MULTIPLY Team"
+
+
+def _create_files(directory: str):
+    os.makedirs(os.path.join(directory, 'S2A_granule'))
+    with open(os.path.join(directory, 'tiff_without_extension'), 'wb') as file:
+        file.write(b'II*\x00\x08\x00\x00\x00')
+    with open(os.path.join(directory, 'netcdf_without_extension'), 'wb') as file:
+        file.write(b'CDF\x01\x00\x00\x00\x00')
+    with open(os.path.join(directory, 'text'), 'wb') as file:
+        file.write(b'text')
+
+
+def test_get_mime_type_from_name():
+    detector = MimeTypeDetector()
+
+    assert 'application/x-netcdf' == detector.get_mime_type_from_name('dir/file.nc')
+    assert 'image/tiff' == detector.get_mime_type_from_name('file.tiff')
+    assert 'image/tiff' == detector.get_mime_type_from_name('B01_surtif')
+    assert 'x-world/x-vrt' == detector.get_mime_type_from_name('file.vrt')
+    assert detector.get_mime_type_from_name('./file') is None
+    detector.add_extension('jp2', 'image/jp2')
+    assert 'image/jp2' == detector.get_mime_type_from_name('file.jp2')
+
+
+def test_get_mime_type_with_sniffing():
+    directory = tempfile.mkdtemp()
+    try:
+        _create_files(directory)
+        detector = MimeTypeDetector(sniff=True)
+
+        assert 'application/x-directory' == detector.get_mime_type(os.path.join(directory, 'S2A_granule'))
+        assert 'image/tiff' == detector.get_mime_type(os.path.join(directory, 'tiff_without_extension'))
+        assert 'application/x-netcdf' == detector.get_mime_type(os.path.join(directory, 'netcdf_without_extension'))
+        assert 'unknown mime type' == detector.get_mime_type(os.path.join(directory, 'text'))
+        assert 'unknown mime type' == get_mime_type(os.path.join(directory, 'tiff_without_extension'))
+        detector.add_magic_number(b'text', 'text/plain')
+        assert 'text/plain' == detector.get_mime_type(os.path.join(directory, 'text'))
+    finally:
+        shutil.rmtree(directory)
+
+
+def test_get_mime_types_and_scan_directory():
+    directory = tempfile.mkdtemp()
+    try:
+        _create_files(directory)
+        paths = [os.path.join(directory, 'S2A_granule'), os.path.join(directory, 'file.nc'),
+                 os.path.join(directory, 'S2A_granule/'), os.path.join(directory, 'tiff_without_extension'),
+                 os.path.join(directory, 'missing')]
+
+        assert ['application/x-directory', 'application/x-netcdf', 'application/x-directory', 'unknown mime type',
+                'unknown mime type'] == get_mime_types(paths)
+        assert [MimeTypeDetector(sniff=True).get_mime_type(path) for path in paths] == \
+            MimeTypeDetector(sniff=True).get_mime_types(paths)
+        mime_types = MimeTypeDetector(sniff=True).scan_directory(directory)
+        assert 4 == len(mime_types)
+        assert 'application/x-directory' == mime_types[os.path.join(directory, 'S2A_granule')]
+        assert 'image/tiff' == mime_types[os.path.join(directory, 'tiff_without_extension')]
+    finally:
+        shutil.rmtree(directory)
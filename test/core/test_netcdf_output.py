@@ -0,0 +1,75 @@
+from datetime import datetime
+from multiply_core.observations import NetCDFWriter
+from netCDF4 import Dataset
+import numpy as np
+import os
+from pytest import raises
+
+__author__ = "MULTIPLY Team"
+
+NETCDF_WRITE_FOLDER = './test/test_data/netcdf'
+GEO_TRANSFORM = (582414.9967658486, 120.0, 0.0, 4317096.927011872, 0.0, -120.0)
+PROJECTION = 'PROJCS["UTM Zone 30, Northern Hemisphere",GEOGCS["WGS 84",DATUM["WGS_1984",' \
+             'SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],' \
+             'PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,' \
+             'AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","4326"]],PROJECTION["Transverse_Mercator"],' \
+             'PARAMETER["latitude_of_origin",0],PARAMETER["central_meridian",-3],PARAMETER["scale_factor",0.9996],' \
+             'PARAMETER["false_easting",500000],PARAMETER["false_northing",0],UNIT["Meter",1]]'
+
+
+def test_netcdf_writer_write():
+    file_names = [os.path.abspath('{}/lai.tif'.format(NETCDF_WRITE_FOLDER)),
+                  os.path.abspath('{}/sm.tif'.format(NETCDF_WRITE_FOLDER))]
+    output_file_name = os.path.abspath('{}/multiply_output.nc'.format(NETCDF_WRITE_FOLDER))
+    try:
+        times = [datetime(2017, 6, 1), datetime(2017, 6, 2), datetime(2017, 6, 3)]
+        writer = NetCDFWriter(file_names, GEO_TRANSFORM, PROJECTION, 6, 4, [3, 1], ['Float', 'Double'],
+                              times=times, spatial_chunk_size=2)
+        lai = np.arange(3 * 4 * 6, dtype=np.float32).reshape(3, 4, 6)
+        sm = np.arange(4 * 6, dtype=np.float64).reshape(4, 6)
+        writer.write([lai[:, :2], sm[:2]], width=6, height=2)
+        writer.write([lai[:, 2:], sm[2:]], width=6, height=2, offset_y=2)
+        writer.close()
+        # closing again has no effect
+        writer.close()
+
+        data_set = Dataset(output_file_name)
+        np.testing.assert_array_equal(lai, data_set['lai'][:])
+        np.testing.assert_array_equal(sm, data_set['sm'][:])
+        assert [3, 2, 2] == data_set['lai'].chunking()
+        assert 3 == len(data_set['time'][:])
+        assert PROJECTION == data_set['crs'].crs_wkt
+        assert GEO_TRANSFORM[0] + 60.0 == data_set['x'][0]
+        data_set.close()
+    finally:
+        if os.path.exists(output_file_name):
+            os.remove(output_file_name)
+
+
+def test_netcdf_writer_write_invalid_shape():
+    file_names = [os.path.abspath('{}/lai.tif'.format(NETCDF_WRITE_FOLDER))]
+    output_file_name = os.path.abspath('{}/multiply_output.nc'.format(NETCDF_WRITE_FOLDER))
+    try:
+        writer = NetCDFWriter(file_names, GEO_TRANSFORM, PROJECTION, 6, 4, [3],
+                              times=[datetime(2017, 6, 1), datetime(2017, 6, 2), datetime(2017, 6, 3)])
+        with raises(ValueError):
+            writer.write([np.zeros((4, 6), dtype=np.float32)])
+        with raises(ValueError):
+            writer.write([np.zeros((3, 4, 5), dtype=np.float32)])
+        writer.write([np.zeros((3, 4 * 6), dtype=np.float32)])
+        writer.close()
+    finally:
+        if os.path.exists(output_file_name):
+            os.remove(output_file_name)
+
+
+def test_netcdf_writer_create_invalid_num_bands():
+    file_names = [os.path.abspath('{}/lai.tif'.format(NETCDF_WRITE_FOLDER)),
+                  os.path.abspath('{}/sm.tif'.format(NETCDF_WRITE_FOLDER))]
+    output_file_name = os.path.abspath('{}/invalid.nc'.format(NETCDF_WRITE_FOLDER))
+    try:
+        with raises(ValueError):
+            NetCDFWriter(file_names, GEO_TRANSFORM, PROJECTION, 6, 4, [3, 2], output_file_name=output_file_name)
+    finally:
+        if os.path.exists(output_file_name):
+            os.remove(output_file_name)
@@ -22,6 +22,8 @@ def test_sort_file_ref_list():
                  FileRef(url='loc5', start_time='2017-06-05', end_time='2017-06-08', mime_type='unknown mime type')]
     observations_factory = ObservationsFactory()
     observations_factory.sort_file_ref_list(file_refs)
+    assert 5 == len(file_refs)
+    assert ['loc2', 'loc4', 'loc3', 'loc1', 'loc5'] == [file_ref.url for file_ref in file_refs]
     assert 5, len(file_refs)
     assert 'loc2', file_refs[0]
     assert 'loc4', file_refs[1]
@@ -30,6 +32,14 @@ def test_sort_file_ref_list():
     assert 'loc5', file_refs[4]
 
 
+def test_sort_file_ref_list_with_unparsable_start_time():
+    file_refs = [FileRef(url='loc1', start_time='20170604', end_time='20170607', mime_type='unknown mime type'),
+                 FileRef(url='loc2', start_time='2017-06-05', end_time='2017-06-08', mime_type='unknown mime type'),
+                 FileRef(url='loc3', start_time='2017-06-01', end_time='2017-06-06', mime_type='unknown mime type')]
+    ObservationsFactory().sort_file_ref_list(file_refs)
+    assert ['loc3', 'loc2', 'loc1'] == [file_ref.url for file_ref in file_refs]
+
+
 def test_create_observations():
 
     class DummyObservations(ProductObservations):
@@ -1,7 +1,9 @@
 import gdal
 from multiply_core.observations import GeoTiffWriter
+from multiply_core.util import WriterMetrics
 import numpy as np
 import os
+import pytest
 from pytest import raises
 
 GEOTIFF_WRITE_FOLDER = './test/test_data/geotiff'
@@ -140,3 +142,174 @@ def test_geotiff_writer_write():
         for file_name in file_names:
             if os.path.exists(file_name):
                 os.remove(file_name)
+
+
+def test_geotiff_writer_write_asynchronously():
+    file_names = [os.path.abspath('{}/name61.tif'.format(GEOTIFF_WRITE_FOLDER)),
+                  os.path.abspath('{}/name62.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 4, 6, [1, 2], ['Float', 'Double'],
+                               asynchronous=True, queue_size=1, num_workers=2)
+        data = np.arange(2 * 6 * 4, dtype=np.float32).reshape(2, 6, 4)
+        for offset_y in range(0, 6, 2):
+            chunk_1 = np.array(data[0, offset_y:offset_y + 2])
+            chunk_2 = np.array(data[:, offset_y:offset_y + 2])
+            writer.write([chunk_1, chunk_2], width=4, height=2, offset_y=offset_y)
+            # the writer must have copied the data
+            chunk_1[:] = -1
+            chunk_2[:] = -1
+        writer.close()
+        np.testing.assert_array_equal(data[0], gdal.Open(file_names[0]).ReadAsArray())
+        np.testing.assert_array_equal(data, gdal.Open(file_names[1]).ReadAsArray())
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_close_twice():
+    file_names = [os.path.abspath('{}/name63.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 4, 6, asynchronous=True)
+        writer.write([np.zeros((6, 4), dtype=np.float32)])
+        writer.close()
+        writer.close()
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_write_raises_write_errors():
+    file_names = [os.path.abspath('{}/name72.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 4, 6)
+        with raises(IOError):
+            writer.write([np.zeros((2, 4))], width=4, height=2, offset_y=5)
+        writer.close()
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_write_asynchronously_raises_worker_errors():
+    file_names = [os.path.abspath('{}/name71.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 4, 6, asynchronous=True)
+        writer.write([np.zeros((2, 4))], width=4, height=2, offset_y=5)
+        with raises(IOError):
+            writer.close()
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_write_cloud_optimized():
+    file_names = [os.path.abspath('{}/name81.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 600, 300, cloud_optimized=True,
+                               overview_resampling='nearest')
+        data = np.random.random((300, 600)).astype(np.float32)
+        writer.write([data])
+        writer.close()
+        written_dataset = gdal.Open(file_names[0])
+        assert 2 == written_dataset.GetRasterBand(1).GetOverviewCount()
+        np.testing.assert_array_equal(data, written_dataset.ReadAsArray())
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_write_in_chunks():
+    file_names = [os.path.abspath('{}/name91.tif'.format(GEOTIFF_WRITE_FOLDER)),
+                  os.path.abspath('{}/name92.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 6, 4, [3, 1], ['Float', 'Int'])
+        data_1 = np.arange(3 * 4 * 6, dtype=np.float32).reshape(3, 4, 6)
+        data_2 = np.arange(4 * 6).reshape(4, 6)
+        for offset_x in range(0, 6, 2):
+            writer.write([data_1[:, :, offset_x:offset_x + 2], data_2[:, offset_x:offset_x + 2].ravel()],
+                         width=2, height=4, offset_x=offset_x)
+        with raises(ValueError):
+            writer.write([data_1[:, :, :3], data_2[:, :3]], width=2, height=4)
+        writer.close()
+        np.testing.assert_array_equal(data_1, gdal.Open(file_names[0]).ReadAsArray())
+        np.testing.assert_array_equal(data_2, gdal.Open(file_names[1]).ReadAsArray())
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_write_rejects_single_band_layouts_for_multiple_bands():
+    file_names = [os.path.abspath('{}/name93.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 4, 6, [2])
+        with raises(ValueError):
+            writer.write([np.zeros((6, 4), dtype=np.float32)])
+        with raises(ValueError):
+            writer.write([np.zeros(2 * 6 * 4, dtype=np.float32)])
+        writer.write([np.zeros((2, 6, 4), dtype=np.float32)])
+        writer.close()
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_collects_metrics():
+    file_names = [os.path.abspath('{}/name101.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 4, 6, [2], metrics=WriterMetrics())
+        for offset_y in range(0, 6, 2):
+            writer.write([np.ones((2, 2, 4), dtype=np.float32)], width=4, height=2, offset_y=offset_y)
+        writer.close()
+        metrics = writer.get_metrics()[file_names[0]]
+        assert 3 == metrics['blocks_written']
+        assert 3 * 2 * 2 * 4 * 4 == metrics['raw_bytes']
+        assert os.path.getsize(file_names[0]) == metrics['compressed_bytes']
+        assert metrics['write_time'] >= 0
+        assert metrics['close_time'] >= 0
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_write_packed():
+    file_names = [os.path.abspath('{}/name111.tif'.format(GEOTIFF_WRITE_FOLDER)),
+                  os.path.abspath('{}/name112.tif'.format(GEOTIFF_WRITE_FOLDER))]
+    try:
+        writer = GeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 3, 2, [2, 1], ['Int16', 'Byte'],
+                               scales=[[0.001, 0.01], None], offsets=[1.0, None], no_data_values=[-32768, 255])
+        data_1 = np.array([[[1.0, 1.5, np.nan], [-100.0, 1.0015, 100.0]],
+                           [[1.0, 2.0, 3.0], [4.0, 5.0, np.nan]]], dtype=np.float32)
+        data_2 = np.array([[0.4, 1.6, 300.0], [-3.0, np.nan, 7.0]])
+        writer.write([data_1, data_2])
+        writer.close()
+
+        written_dataset = gdal.Open(file_names[0])
+        assert gdal.GDT_Int16 == written_dataset.GetRasterBand(1).DataType
+        assert 0.001 == pytest.approx(written_dataset.GetRasterBand(1).GetScale())
+        assert 0.01 == pytest.approx(written_dataset.GetRasterBand(2).GetScale())
+        assert 1.0 == written_dataset.GetRasterBand(2).GetOffset()
+        assert -32768 == written_dataset.GetRasterBand(1).GetNoDataValue()
+        np.testing.assert_array_equal([[[0, 500, -32768], [-32767, 2, 32767]], [[0, 100, 200], [300, 400, -32768]]],
+                                      written_dataset.ReadAsArray())
+        written_dataset = gdal.Open(file_names[1])
+        assert gdal.GDT_Byte == written_dataset.GetRasterBand(1).DataType
+        # 300 is clipped below the no data value
+        np.testing.assert_array_equal([[0, 2, 254], [0, 255, 7]], written_dataset.ReadAsArray())
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_geotiff_writer_create_invalid_number_of_scales():
+    with raises(ValueError):
+        GeoTiffWriter([os.path.abspath('{}/name121.tif'.format(GEOTIFF_WRITE_FOLDER))], GEO_TRANSFORM, PROJECTION,
+                      3, 2, [2], ['Int16'], scales=[[0.1, 0.2, 0.3]])
@@ -0,0 +1,84 @@
+import gdal
+from multiprocessing import Pool
+from multiply_core.observations import TiledGeoTiffWriter
+import numpy as np
+import os
+
+__author__ = "MULTIPLY Team"
+
+TILED_WRITE_FOLDER = './test/test_data/tiled'
+GEO_TRANSFORM = (582414.9967658486, 120.0, 0.0, 4317096.927011872, 0.0, -120.0)
+PROJECTION = 'PROJCS["UTM Zone 30, Northern Hemisphere",GEOGCS["WGS 84",DATUM["WGS_1984",' \
+             'SPHEROID["WGS 84",6378137,298.257223563,AUTHORITY["EPSG","7030"]],AUTHORITY["EPSG","6326"]],' \
+             'PRIMEM["Greenwich",0,AUTHORITY["EPSG","8901"]],UNIT["degree",0.0174532925199433,' \
+             'AUTHORITY["EPSG","9122"]],AUTHORITY["EPSG","4326"]],PROJECTION["Transverse_Mercator"],' \
+             'PARAMETER["latitude_of_origin",0],PARAMETER["central_meridian",-3],PARAMETER["scale_factor",0.9996],' \
+             'PARAMETER["false_easting",500000],PARAMETER["false_northing",0],UNIT["Meter",1]]'
+
+
+def _get_tile(offset_x: int, offset_y: int) -> np.array:
+    return np.full((2, 3, 4), offset_x * 10 + offset_y, dtype=np.float32)
+
+
+def _write_tile(writer: TiledGeoTiffWriter, offset_x: int, offset_y: int):
+    writer.write([_get_tile(offset_x, offset_y)], width=4, height=3, offset_x=offset_x, offset_y=offset_y)
+
+
+def test_tiled_geotiff_writer_write_from_several_processes():
+    file_names = [os.path.abspath('{}/name1.tif'.format(TILED_WRITE_FOLDER))]
+    try:
+        writer = TiledGeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 8, 6, [2], profile='fast')
+        offsets = [(offset_x, offset_y) for offset_x in range(0, 8, 4) for offset_y in range(0, 6, 3)]
+        with Pool(2) as pool:
+            pool.starmap(_write_tile, [(writer, offset_x, offset_y) for offset_x, offset_y in offsets])
+        writer.close()
+
+        assert not os.path.exists(file_names[0] + '.tiles')
+        data_set = gdal.Open(file_names[0])
+        np.testing.assert_allclose(GEO_TRANSFORM, data_set.GetGeoTransform())
+        data = data_set.ReadAsArray()
+        assert (2, 6, 8) == data.shape
+        assert np.isnan(data_set.GetRasterBand(1).GetNoDataValue())
+        for offset_x, offset_y in offsets:
+            np.testing.assert_array_equal(_get_tile(offset_x, offset_y),
+                                          data[:, offset_y:offset_y + 3, offset_x:offset_x + 4])
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_tiled_geotiff_writer_write_partially():
+    file_names = [os.path.abspath('{}/name2.tif'.format(TILED_WRITE_FOLDER))]
+    try:
+        writer = TiledGeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 8, 6, [2], ['Int16'])
+        _write_tile(writer, 4, 3)
+        writer.close()
+
+        data_set = gdal.Open(file_names[0])
+        assert -32768 == data_set.GetRasterBand(1).GetNoDataValue()
+        data = data_set.ReadAsArray()
+        np.testing.assert_array_equal(_get_tile(4, 3), data[:, 3:, 4:])
+        assert np.all(-32768 == data[:, :3])
+        assert np.all(-32768 == data[:, :, :4])
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+
+
+def test_tiled_geotiff_writer_close_without_tiles():
+    file_names = [os.path.abspath('{}/name3.tif'.format(TILED_WRITE_FOLDER))]
+    try:
+        writer = TiledGeoTiffWriter(file_names, GEO_TRANSFORM, PROJECTION, 8, 6, no_data_values=[-1.])
+        writer.close()
+
+        assert not os.path.exists(file_names[0] + '.tiles')
+        data_set = gdal.Open(file_names[0])
+        np.testing.assert_allclose(GEO_TRANSFORM, data_set.GetGeoTransform())
+        assert -1. == data_set.GetRasterBand(1).GetNoDataValue()
+        np.testing.assert_array_equal(np.full((6, 8), -1., dtype=np.float32), data_set.ReadAsArray())
+    finally:
+        for file_name in file_names:
+            if os.path.exists(file_name):
+                os.remove(file_name)
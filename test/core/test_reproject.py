@@ -1,4 +1,5 @@
 import gdal
+import numpy as np
 import osr
 import multiply_core.util.reproject as reproject
 import pytest
@@ -124,3 +125,120 @@ def test_reproject_image():
     raster_data = raster_band.ReadAsArray()
     assert 8 == raster_data[0][0]
     assert 14 == raster_data[94][285]
+
+
+def test_reproject_dataset_lazily():
+    destination_srs = osr.SpatialReference()
+    destination_srs.ImportFromWkt(EPSG_32232_WKT)
+    bounds_srs = osr.SpatialReference()
+    bounds_srs.SetWellKnownGeogCS('EPSG:4326')
+    bounds = [7.8, 53.5, 8.8, 53.8]
+    reprojected_dataset = reproject.reproject_dataset(S2_FILE, bounds, x_res=50, y_res=100,
+                                                      destination_srs=destination_srs,
+                                                      bounds_srs=bounds_srs,
+                                                      resampling_mode=None, lazy=True)
+    assert 'VRT' == reprojected_dataset.GetDriver().ShortName
+    assert 1328 == reprojected_dataset.RasterXSize
+    assert 327 == reprojected_dataset.RasterYSize
+    raster_band = reprojected_dataset.GetRasterBand(1)
+    assert 8 == raster_band.ReadAsArray(0, 0, 1, 1)[0][0]
+    assert 14 == raster_band.ReadAsArray(285, 94, 1, 1)[0][0]
+
+
+def test_reprojection_lazy_in_memory_source_is_not_lazy():
+    destination_srs = osr.SpatialReference()
+    destination_srs.ImportFromWkt(EPSG_32232_WKT)
+    bounds_srs = osr.SpatialReference()
+    bounds_srs.SetWellKnownGeogCS('EPSG:4326')
+    bounds = [7.8, 53.5, 8.8, 53.8]
+    in_memory_dataset = gdal.Translate('', S2_FILE, format='MEM')
+    reprojection = reproject.Reprojection(bounds=bounds, x_res=50, y_res=100, destination_srs=destination_srs,
+                                          bounds_srs=bounds_srs, lazy=True)
+    assert reprojection.lazy
+    reprojected_dataset = reprojection.reproject(in_memory_dataset)
+    assert 'MEM' == reprojected_dataset.GetDriver().ShortName
+    assert 1328 == reprojected_dataset.RasterXSize
+    assert 327 == reprojected_dataset.RasterYSize
+
+
+def test_target_grid_from_dataset():
+    target_grid = reproject.TargetGrid.from_dataset(S2_FILE)
+    assert 60 == target_grid.geo_transform[1]
+    assert (60, 60) == target_grid.resolutions
+    assert target_grid == reproject.TargetGrid.from_dataset(gdal.Open(S2_FILE))
+    assert hash(target_grid) == hash(reproject.TargetGrid.from_dataset(S2_FILE))
+    other_grid = reproject.TargetGrid(target_grid.geo_transform, target_grid.width + 1, target_grid.height,
+                                      target_grid.wkt)
+    assert target_grid != other_grid
+    assert 2 == len({target_grid, other_grid, reproject.TargetGrid.from_dataset(S2_FILE)})
+
+
+def test_target_grid_from_reprojection():
+    destination_srs = osr.SpatialReference()
+    destination_srs.ImportFromWkt(EPSG_32232_WKT)
+    bounds_srs = osr.SpatialReference()
+    bounds_srs.SetWellKnownGeogCS('EPSG:4326')
+    bounds = [7.8, 53.5, 8.8, 53.8]
+    reprojection = reproject.Reprojection(bounds=bounds, x_res=50, y_res=100, destination_srs=destination_srs,
+                                          bounds_srs=bounds_srs)
+    target_grid = reproject.TargetGrid.from_reprojection(reprojection)
+    assert 1328 == target_grid.width
+    assert 327 == target_grid.height
+    assert pytest.approx(420392.4558445791) == target_grid.geo_transform[0]
+    assert pytest.approx(5961284.037740353) == target_grid.geo_transform[3]
+    assert target_grid is reprojection.get_target_grid()
+
+
+def test_reproject_to_grid():
+    target_grid = reproject.TargetGrid.from_dataset(S2_FILE)
+    reprojection = reproject.Reprojection.from_target_grid(target_grid, resampling_mode='near')
+    reprojected_dataset = reprojection.reproject(ALA_TIFF_FILE)
+    assert target_grid == reproject.TargetGrid.from_dataset(reprojected_dataset)
+    reprojected_dataset = reproject.reproject_image(ALA_TIFF_FILE, target_grid)
+    assert target_grid == reproject.TargetGrid.from_dataset(reprojected_dataset)
+    reprojected_dataset = reproject.reproject_dataset(ALA_TIFF_FILE, target_grid, resampling_mode='near')
+    assert target_grid == reproject.TargetGrid.from_dataset(reprojected_dataset)
+    with pytest.raises(ValueError):
+        reproject.reproject_dataset(ALA_TIFF_FILE, target_grid, x_res=60, y_res=60)
+
+
+def test_block_reduce():
+    data = np.array([[1, 2, 3, 3],
+                     [1, 0, 3, 4],
+                     [0, 0, 5, 6],
+                     [0, 0, 7, 9]], dtype=np.int16)
+    np.testing.assert_array_equal([[1, 3], [0, 7]], reproject.block_reduce(data, 2, 2, 'average', no_data_value=0))
+    np.testing.assert_array_equal([[1, 3], [0, 5]], reproject.block_reduce(data, 2, 2, 'min', no_data_value=0))
+    np.testing.assert_array_equal([[2, 4], [0, 9]], reproject.block_reduce(data, 2, 2, 'max', no_data_value=0))
+    np.testing.assert_array_equal([[1, 3], [0, 5]], reproject.block_reduce(data, 2, 2, 'mode', no_data_value=0))
+    np.testing.assert_array_equal([[1, 3], [0, 7]], reproject.block_reduce(data, 2, 2, 'average'))
+    assert np.int16 == reproject.block_reduce(data, 2, 2, 'average').dtype
+    with pytest.raises(ValueError):
+        reproject.block_reduce(data, 2, 2, 'bilinear')
+
+
+def test_get_alignment():
+    source_grid = reproject.TargetGrid((300000.0, 20.0, 0.0, 5900040.0, 0.0, -20.0), 5490, 5490, EPSG_32632_WKT)
+    target_grid = reproject.TargetGrid((300060.0, 60.0, 0.0, 5900040.0, 0.0, -60.0), 100, 200, EPSG_32632_WKT)
+    assert (3, 3, 3, 0) == reproject.get_alignment(source_grid, target_grid)
+    shifted_grid = reproject.TargetGrid((300070.0, 60.0, 0.0, 5900040.0, 0.0, -60.0), 100, 200, EPSG_32632_WKT)
+    assert reproject.get_alignment(source_grid, shifted_grid) is None
+    other_srs_grid = reproject.TargetGrid((300060.0, 60.0, 0.0, 5900040.0, 0.0, -60.0), 100, 200, EPSG_32232_WKT)
+    assert reproject.get_alignment(source_grid, other_srs_grid) is None
+    exceeding_grid = reproject.TargetGrid((300060.0, 60.0, 0.0, 5900040.0, 0.0, -60.0), 1830, 200, EPSG_32632_WKT)
+    assert reproject.get_alignment(source_grid, exceeding_grid) is None
+
+
+def test_reproject_aligned_equals_warp():
+    source_dataset = gdal.Open(S2_FILE)
+    source_grid = reproject.TargetGrid.from_dataset(source_dataset)
+    geo_t = source_grid.geo_transform
+    target_grid = reproject.TargetGrid((geo_t[0], geo_t[1] * 3, 0.0, geo_t[3], 0.0, geo_t[5] * 3),
+                                       source_grid.width // 3, source_grid.height // 3, source_grid.wkt)
+    for resampling_mode in ['average', 'min', 'max']:
+        fast_dataset = reproject.reproject_to_grid(source_dataset, target_grid, resampling_mode)
+        assert 'MEM' == fast_dataset.GetDriver().ShortName
+        warped_dataset = gdal.Warp('', source_dataset, format='MEM', outputBounds=target_grid.bounds,
+                                   width=target_grid.width, height=target_grid.height, dstSRS=target_grid.wkt,
+                                   resampleAlg=resampling_mode)
+        np.testing.assert_allclose(warped_dataset.ReadAsArray(), fast_dataset.ReadAsArray(), atol=1)
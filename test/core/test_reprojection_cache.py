@@ -0,0 +1,54 @@
+import gdal
+import numpy as np
+import os
+import shutil
+
+from multiply_core.util import Reprojection, ReprojectionCache, TargetGrid
+
+__author__ = "MULTIPLY Team"
+
+S2_FILE = './test/test_data/T32UME_20170910T104021_B10.jp2'
+ALA_TIFF_FILE = './test/test_data/Priors_ala_125_[50_60N]_[000_010E].tiff'
+CACHE_DIR = './test/test_data/reprojection_cache'
+
+
+def test_reprojection_cache_is_used():
+    try:
+        cache = ReprojectionCache(CACHE_DIR)
+        target_grid = TargetGrid.from_dataset(S2_FILE)
+        reprojection = Reprojection.from_target_grid(target_grid, resampling_mode='near', cache=cache)
+        key = cache.get_key(ALA_TIFF_FILE, target_grid, 'near')
+        assert key is not None
+        assert cache.get(key) is None
+
+        first_dataset = reprojection.reproject(ALA_TIFF_FILE)
+        assert os.path.exists(os.path.join(CACHE_DIR, key + '.tif'))
+        second_dataset = reprojection.reproject(ALA_TIFF_FILE)
+        assert first_dataset.GetDescription() == second_dataset.GetDescription()
+        assert target_grid == TargetGrid.from_dataset(second_dataset)
+        np.testing.assert_array_equal(first_dataset.ReadAsArray(), second_dataset.ReadAsArray())
+        assert key != cache.get_key(ALA_TIFF_FILE, target_grid, 'average')
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def test_reprojection_cache_evicts_least_recently_used_entries():
+    try:
+        cache = ReprojectionCache(CACHE_DIR, max_size=0)
+        dataset = gdal.Open(ALA_TIFF_FILE)
+        put_dataset = cache.put('a', dataset)
+        assert put_dataset is not None
+        np.testing.assert_array_equal(dataset.ReadAsArray(), put_dataset.ReadAsArray())
+        assert 0 == cache.get_size()
+        assert cache.get('a') is None
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def test_reprojection_cache_does_not_cache_in_memory_datasets():
+    try:
+        cache = ReprojectionCache(CACHE_DIR)
+        dataset = gdal.Translate('', ALA_TIFF_FILE, format='MEM')
+        assert cache.get_key(dataset, TargetGrid.from_dataset(S2_FILE), 'near') is None
+    finally:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
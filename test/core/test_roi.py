@@ -0,0 +1,69 @@
+from multiply_core.util import RegionOfInterest, are_polygons_almost_equal, are_rings_almost_equal, \
+    get_region_of_interest, intersect_bounds, normalize_ring
+import numpy as np
+from shapely.geometry import Polygon
+
+__author__ = "MULTIPLY Team"
+
+ROI = 'POLYGON((5 5, 20 5, 20 20, 5 20, 5 5))'
+
+
+def test_get_region_of_interest():
+    region_of_interest = get_region_of_interest(ROI)
+
+    assert (5., 5., 20., 20.) == region_of_interest.bounds
+    assert region_of_interest is get_region_of_interest(ROI)
+    assert region_of_interest is get_region_of_interest(region_of_interest)
+    assert (0., 0., 1., 1.) == get_region_of_interest(Polygon([(0, 0), (1, 0), (1, 1)])).bounds
+
+
+def test_region_of_interest_intersects_and_contains():
+    region_of_interest = RegionOfInterest(ROI)
+
+    assert region_of_interest.intersects('POLYGON((19 19, 30 19, 30 30, 19 30, 19 19))')
+    assert not region_of_interest.intersects(Polygon([(21, 21), (30, 21), (30, 30)]))
+    assert region_of_interest.contains('POLYGON((6 6, 7 6, 7 7, 6 6))')
+    assert not region_of_interest.contains('POLYGON((6 6, 27 6, 7 7, 6 6))')
+
+
+def test_intersect_bounds():
+    footprint_bounds = np.array([[0., 0., 4., 4.], [0., 0., 5., 5.], [10., 10., 11., 11.], [21., 0., 30., 30.],
+                                 [0., 0., 30., 30.]])
+
+    np.testing.assert_array_equal([False, True, True, False, True], intersect_bounds((5, 5, 20, 20), footprint_bounds))
+    np.testing.assert_array_equal([False, True, True, False, True],
+                                  get_region_of_interest(ROI).intersect_bounds(footprint_bounds))
+    assert intersect_bounds((5, 5, 20, 20), (19, 19, 25, 25))
+
+
+def test_normalize_ring():
+    expected = [[5., 5.], [20., 5.], [20., 20.], [5., 20.]]
+
+    np.testing.assert_array_equal(expected, normalize_ring([[5, 5], [20, 5], [20, 20], [5, 20], [5, 5]]))
+    np.testing.assert_array_equal(expected, normalize_ring([[20, 20], [20, 5], [5, 5], [5, 20], [20, 20]]))
+
+
+def test_are_rings_almost_equal():
+    ring = np.array([[5., 5.], [20., 5.], [20., 20.], [5., 20.], [5., 5.]])
+
+    assert are_rings_almost_equal(ring, ring[::-1])
+    assert are_rings_almost_equal(ring, np.roll(ring[:-1], 2, axis=0))
+    assert are_rings_almost_equal(ring, ring + 1e-8)
+    assert not are_rings_almost_equal(ring, ring + 1e-5)
+    assert not are_rings_almost_equal(ring, ring[1:-1])
+
+
+def test_are_polygons_almost_equal():
+    polygon_with_hole = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(2, 2), (2, 4), (4, 4), (4, 2)]])
+    polygon_with_other_hole = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)], [[(2, 2), (2, 5), (4, 4), (4, 2)]])
+
+    assert are_polygons_almost_equal(ROI, 'POLYGON((5 5, 5 20, 20 20, 20 5, 5 5))')
+    assert are_polygons_almost_equal(ROI, 'POLYGON((20 20, 5 20, 5 5, 20 5, 20 20))')
+    assert not are_polygons_almost_equal(Polygon([(5, 5), (5, 20), (19, 19), (20, 5)]), ROI)
+    assert are_polygons_almost_equal(polygon_with_hole, polygon_with_hole)
+    assert not are_polygons_almost_equal(polygon_with_hole, polygon_with_other_hole)
+    # the smallest points of the exteriors differ, as the coordinates are only equal within the tolerance
+    assert are_polygons_almost_equal(Polygon([(5, 5), (20, 5), (20, 20), (5, 20)]),
+                                     Polygon([(5.0000001, 5), (20, 5), (20, 20), (5, 20)]))
+    assert not are_polygons_almost_equal(Polygon([(5, 5), (20, 5), (20, 20), (5, 20)]),
+                                         Polygon([(5.00001, 5), (20, 5), (20, 20), (5, 20)]))
@@ -1,3 +1,4 @@
+import numpy as np
 import osr
 
 from multiply_core.util import Reprojection, FileRef
@@ -66,6 +67,24 @@ def test_get_band_data():
     assert (434256, 434256) == s2_observation_data.uncertainty.shape
 
 
+def test_get_stacked_band_data():
+    destination_srs = osr.SpatialReference()
+    destination_srs.ImportFromWkt(EPSG_32232_WKT)
+    bounds_srs = osr.SpatialReference()
+    bounds_srs.SetWellKnownGeogCS('EPSG:4326')
+    bounds = [7.8, 53.5, 8.8, 53.8]
+    reprojection = Reprojection(bounds=bounds, x_res=50, y_res=100, destination_srs=destination_srs,
+                                bounds_srs=bounds_srs, resampling_mode=None)
+    file_ref = FileRef(url=S2_AWS_BASE_FILE, start_time='2017-09-10', end_time='2017-09-10',
+                       mime_type='unknown mime type')
+    s2_observations = S2Observations(file_ref, reprojection, emulator_folder=EMULATOR_FOLDER)
+    stacked_data = s2_observations.get_stacked_band_data([3, 3])
+    assert (2, 327, 1328) == stacked_data.shape
+    s2_observation_data = s2_observations.get_band_data(3, retrieve_uncertainty=False)
+    np.testing.assert_array_almost_equal(s2_observation_data.observations, stacked_data[0])
+    np.testing.assert_array_almost_equal(s2_observation_data.observations, stacked_data[1])
+
+
 def test_extract_angles_from_metadata_file():
     angles = extract_angles_from_metadata_file(S2_METADATA_FILE)
     assert 61.3750584241536 == angles[0]
@@ -1,12 +1,27 @@
+from datetime import datetime
 import multiply_core.util.util as util
 import numpy as np
+import pickle
 import pytest
+import scipy.sparse
+import scipy.sparse.linalg
 
 __author__ = "Tonio Fincke (Brockmann Consult GmbH)"
 
 MEAN_EARTH_RADIUS = 6372000
 
 
+def test_attribute_dict_has_entry():
+    attribute_dict = util.AttributeDict(**{'General': {'roi': 'POLYGON((5 5, 20 5, 20 20, 5 20, 5 5))'},
+                                           'Inference': {'optimization': {'method': 'L-BFGS-B'}}})
+
+    assert attribute_dict.has_entry('General')
+    assert attribute_dict.has_entry('General.roi')
+    assert attribute_dict.has_entry('Inference.optimization.method')
+    assert not attribute_dict.has_entry('Inference.method')
+    assert not attribute_dict.has_entry('General.roi.wkt')
+
+
 def test_compute_distance():
     bounds = [7.8, 53.5, 8.8, 53.8]
     lon_0 = bounds[0]
@@ -82,6 +97,71 @@ def test_block_as_numpy_matrix():
                 assert matrices[k][i][j] == coo_matrix_array[k * value_length + i][k * value_length + j]
 
 
+def test_block_diag_formats():
+    blocks = np.arange(2 * 3 * 3, dtype=np.float64).reshape(2, 3, 3)
+    expected = np.zeros((6, 6))
+    expected[:3, :3] = blocks[0]
+    expected[3:, 3:] = blocks[1]
+
+    assert 'coo' == util.block_diag(blocks).format
+    for format in ['coo', 'csr', 'csc', 'dia']:
+        matrix = util.block_diag(list(blocks), format=format)
+        assert format == matrix.format
+        np.testing.assert_array_equal(expected, matrix.toarray())
+    assert np.float32 == util.block_diag(blocks, format='csr', dtype=np.float32).dtype
+
+
+def test_block_diag_of_sparse_matrices():
+    matrices = [scipy.sparse.csr_matrix([[1., 0.], [2., 3.]]), scipy.sparse.lil_matrix([[4.]]), np.array([[5., 6.]])]
+    matrix = util.block_diag(matrices, format='csr')
+
+    assert 'csr' == matrix.format
+    np.testing.assert_array_equal([[1., 0., 0., 0., 0.], [2., 3., 0., 0., 0.], [0., 0., 4., 0., 0.],
+                                   [0., 0., 0., 5., 6.]], matrix.toarray())
+
+
+def test_block_diag_of_diagonal_matrices():
+    matrices = [scipy.sparse.diags([1., 2., 3.]), scipy.sparse.csr_matrix(np.diag([4., 5.])), np.diag([6.])]
+    matrix = util.block_diag(matrices)
+
+    assert 'dia' == matrix.format
+    np.testing.assert_array_equal(np.diag([1., 2., 3., 4., 5., 6.]), matrix.toarray())
+    assert 'csr' == util.block_diag(matrices, format='csr').format
+    assert 'coo' == util.block_diag(matrices + [np.ones((2, 2))]).format
+
+
+def _create_blocks() -> np.array:
+    random_state = np.random.RandomState(0)
+    factors = random_state.random_sample((50, 7, 7))
+    return np.matmul(factors, np.transpose(factors, (0, 2, 1))) + 7 * np.eye(7)
+
+
+def test_solve_and_multiply_blocks():
+    blocks = _create_blocks()
+    vectors = np.random.RandomState(1).random_sample((50, 7))
+    solutions = util.solve_blocks(blocks, vectors)
+
+    assert (50, 7) == solutions.shape
+    np.testing.assert_allclose(vectors, util.multiply_blocks(blocks, solutions))
+    sparse_solutions = scipy.sparse.linalg.spsolve(util.blocks_to_sparse(blocks, format='csc'), vectors.ravel())
+    np.testing.assert_allclose(sparse_solutions, solutions.ravel())
+    assert (50, 7, 2) == util.solve_blocks(blocks, np.stack([vectors, vectors], axis=-1)).shape
+    with pytest.raises(ValueError):
+        util.solve_blocks(blocks, vectors[:, :6])
+
+
+def test_invert_and_cholesky_blocks():
+    blocks = _create_blocks()
+    inverses = util.invert_blocks(blocks)
+    factors = util.cholesky_blocks(blocks)
+
+    np.testing.assert_allclose(np.broadcast_to(np.eye(7), blocks.shape), np.matmul(blocks, inverses), atol=1e-12)
+    np.testing.assert_allclose(blocks, np.matmul(factors, np.transpose(factors, (0, 2, 1))))
+    assert np.all(np.triu(factors, 1) == 0)
+    with pytest.raises(ValueError):
+        util.invert_blocks(blocks[:, :, :6])
+
+
 def test_are_polygons_almost_equal():
     polygon_1 = "POLYGON((5 5, 20 5, 20 20, 5 20, 5 5))"
     polygon_2 = "POLYGON((5 5, 5 20, 20 20, 20 5, 5 5))"
@@ -97,6 +177,28 @@ def test_get_time_from_string_is_empty():
     assert util.get_time_from_string('') is None
 
 
+def test_get_time_from_string():
+    assert datetime(2017, 1, 5, 10, 11, 12) == util.get_time_from_string('2017-01-05T10:11:12')
+    assert datetime(2017, 1, 5, 10, 11, 12) == util.get_time_from_string('2017-01-05 10:11:12', True)
+    assert datetime(2017, 1, 5) == util.get_time_from_string('2017-01-05')
+    assert datetime(2017, 1, 5, 23, 59, 59) == util.get_time_from_string('2017-01-05', True)
+    assert datetime(2016, 2, 1) == util.get_time_from_string('2016-02')
+    assert datetime(2016, 2, 29, 23, 59, 59) == util.get_time_from_string('2016-02', True)
+    assert datetime(2017, 1, 1) == util.get_time_from_string('2017')
+    assert datetime(2017, 12, 31, 23, 59, 59) == util.get_time_from_string('2017', True)
+    # forms which are not canonical are still parsed
+    assert datetime(2017, 1, 5) == util.get_time_from_string('2017-1-5')
+
+
+def test_get_time_from_string_invalid():
+    with pytest.raises(ValueError):
+        util.get_time_from_string('2017-02-29')
+    with pytest.raises(ValueError):
+        util.get_time_from_string('2017-01-05T24:00:00')
+    with pytest.raises(ValueError):
+        util.get_time_from_string('20170105')
+
+
 def test_get_time_from_year_and_day_of_year_238():
     year = 2017
     doy = 238
@@ -134,6 +236,18 @@ def test_meta_info_provider_get_days_of_month():
     assert util.get_days_of_month(1600, 2) == 29
 
 
+def test_get_days_of_month_invalid_month():
+    with pytest.raises(ValueError):
+        util.get_days_of_month(2017, 13)
+
+
+def test_get_time_from_year_and_day_of_year_set_to_end():
+    datetime = util.get_time_from_year_and_day_of_year(2016, 366, set_to_end=True)
+
+    assert (2016, 12, 31, 23, 59, 59) == (datetime.year, datetime.month, datetime.day, datetime.hour,
+                                         datetime.minute, datetime.second)
+
+
 def test_is_leap_year():
     assert util.is_leap_year(2004)
     assert not util.is_leap_year(2003)
@@ -146,3 +260,67 @@ def test_get_mime_type():
     assert 'application/zip' == util.get_mime_type('ctfthdbdr.zip')
     assert 'application/json' == util.get_mime_type('ctfthdbdr.json')
     assert 'unknown mime type' == util.get_mime_type('ctfthdbdr')
+    assert 'image/tiff' == util.get_mime_type('ctfthdbdr.tif')
+    assert 'x-world/x-vrt' == util.get_mime_type('ctfthdbdr.vrt')
+    assert 'application/x-directory' == util.get_mime_type('./test')
+
+
+def test_file_ref_datetimes():
+    file_ref = util.FileRef('loc1', '2017-06-04', '2017-06', 'unknown mime type')
+    assert '2017-06-04' == file_ref.start_time
+    assert '2017-06' == file_ref.end_time
+    assert datetime(2017, 6, 4) == file_ref.start_datetime
+    assert datetime(2017, 6, 30, 23, 59, 59) == file_ref.end_datetime
+    assert util.FileRef('loc1', '', '', 'unknown mime type').start_datetime is None
+    with pytest.raises(AttributeError):
+        file_ref.some_attribute = 'value'
+
+
+def test_file_ref_equality_and_ordering():
+    file_ref_1 = util.FileRef('loc1', '2017-06-04', '2017-06-07', 'unknown mime type')
+    file_ref_2 = util.FileRef('loc1', '2017-06-04', '2017-06-07', 'unknown mime type')
+    file_ref_3 = util.FileRef('loc2', '2017-06-04T00:00:00', '2017-06-07', 'unknown mime type')
+    file_ref_4 = util.FileRef('loc3', '2017-06-03', '2017-06-10', 'unknown mime type')
+
+    assert file_ref_1 == file_ref_2
+    assert hash(file_ref_1) == hash(file_ref_2)
+    assert file_ref_1 != file_ref_3
+    assert 2 == len({file_ref_1, file_ref_2, file_ref_3})
+    assert [file_ref_4, file_ref_1, file_ref_3] == sorted([file_ref_3, file_ref_1, file_ref_4])
+    assert file_ref_1 < file_ref_3
+    assert file_ref_4 <= file_ref_1
+
+
+def test_file_ref_equality_of_time_formats():
+    file_ref_1 = util.FileRef('loc1', '2017-06-04', '2017-06-07', 'unknown mime type')
+    file_ref_2 = util.FileRef('loc1', '2017-06-04T00:00:00', '2017-06-07T23:59:59', 'unknown mime type')
+
+    assert file_ref_1 == file_ref_2
+    assert hash(file_ref_1) == hash(file_ref_2)
+    assert not file_ref_1 < file_ref_2
+    assert file_ref_1 <= file_ref_2
+    assert 1 == len({file_ref_1, file_ref_2})
+    assert file_ref_1 != util.FileRef('loc1', '2017-06-04', '2017-06-07', 'image/tiff')
+
+
+def test_file_ref_equality_and_ordering_of_unparsable_times():
+    file_ref_1 = util.FileRef('loc1', '2017-06-04', '2017-06-07', 'unknown mime type')
+    file_ref_2 = util.FileRef('loc2', '20170604', '20170607', 'unknown mime type')
+    file_ref_3 = util.FileRef('loc2', '20170604', '20170607', 'unknown mime type')
+
+    assert file_ref_1 != file_ref_2
+    assert file_ref_2 == file_ref_3
+    assert hash(file_ref_2) == hash(file_ref_3)
+    assert 2 == len({file_ref_1, file_ref_2, file_ref_3})
+    assert [file_ref_1, file_ref_2] == sorted([file_ref_2, file_ref_1])
+    file_refs = [file_ref_1, file_ref_2]
+    file_refs.remove(file_ref_3)
+    assert [file_ref_1] == file_refs
+
+
+def test_file_ref_pickle():
+    file_ref = util.FileRef('loc1', '2017-06-04', '2017-06-07', 'unknown mime type')
+    assert datetime(2017, 6, 4) == file_ref.start_datetime
+    unpickled_file_ref = pickle.loads(pickle.dumps(file_ref))
+    assert file_ref == unpickled_file_ref
+    assert datetime(2017, 6, 7, 23, 59, 59) == unpickled_file_ref.end_datetime
@@ -1,6 +1,10 @@
 import gdal
+import numpy as np
+import os
 import osr
 import multiply_core.util.reproject as reproject
+from multiply_core.util.write import GeoTiffProfile, WriterMetrics, convert_to_cloud_optimized_geotiff, \
+    get_geotiff_profile, get_overview_levels, write_gdal_raster
 import pytest
 
 __author__ = "Tonio Fincke (Brockmann Consult GmbH)"
@@ -9,4 +13,128 @@ S2_FILE = './test/test_data/T32UME_20170910T104021_B10.jp2'
 # S2_TIFF_FILE = './test/test_data/T32UME_20170910T104021_B10.tiff'
 # LAI_TIFF_FILE = './test/test_data/Priors_lai_125_[50_60N]_[000_010E].tiff'
 ALA_TIFF_FILE = './test/test_data/Priors_ala_125_[50_60N]_[000_010E].tiff'
-# GLOBAL_VRT_FILE = './test/test_data/Priors_lai_060_global.vrt'
\ No newline at end of file
+# GLOBAL_VRT_FILE = './test/test_data/Priors_lai_060_global.vrt'
+OUTPUT_FILE = './test/test_data/written_raster.tif'
+
+
+def test_write_gdal_raster():
+    try:
+        source_dataset = gdal.GetDriverByName('MEM').Create('', 300, 270, 2, gdal.GDT_Int16)
+        source_dataset.SetGeoTransform(gdal.Open(S2_FILE).GetGeoTransform())
+        source_dataset.SetProjection(gdal.Open(S2_FILE).GetProjection())
+        data = np.arange(2 * 270 * 300, dtype=np.int16).reshape(2, 270, 300)
+        for band in range(2):
+            source_dataset.GetRasterBand(band + 1).WriteArray(data[band])
+        source_dataset.GetRasterBand(2).SetNoDataValue(-1)
+        write_gdal_raster(source_dataset, OUTPUT_FILE)
+
+        written_dataset = gdal.Open(OUTPUT_FILE)
+        assert 2 == written_dataset.RasterCount
+        assert gdal.GDT_Int16 == written_dataset.GetRasterBand(1).DataType
+        assert -1 == written_dataset.GetRasterBand(2).GetNoDataValue()
+        assert source_dataset.GetGeoTransform() == written_dataset.GetGeoTransform()
+        np.testing.assert_array_equal(data, written_dataset.ReadAsArray())
+    finally:
+        if os.path.exists(OUTPUT_FILE):
+            os.remove(OUTPUT_FILE)
+
+
+def test_geotiff_profile_get_creation_options():
+    profile = GeoTiffProfile('DEFLATE', predictor=3, block_size=512, num_threads='ALL_CPUS', compression_level=9)
+    options = profile.get_creation_options(gdal.GDT_Float32)
+    assert 'COMPRESS=DEFLATE' in options
+    assert 'PREDICTOR=3' in options
+    assert 'ZLEVEL=9' in options
+    assert 'BLOCKXSIZE=512' in options
+    assert 'BLOCKYSIZE=512' in options
+    assert 'NUM_THREADS=ALL_CPUS' in options
+    assert 'PREDICTOR=2' in profile.get_creation_options(gdal.GDT_Int16)
+    assert 'PREDICTOR=3' not in GeoTiffProfile('NONE', predictor=3).get_creation_options()
+
+
+def test_get_geotiff_profile():
+    assert ['COMPRESS=DEFLATE', 'BIGTIFF=YES', 'TILED=YES', 'PREDICTOR=1'] == \
+           get_geotiff_profile(None).get_creation_options()
+    for name in ['default', 'fast', 'small', 'uncompressed']:
+        assert isinstance(get_geotiff_profile(name), GeoTiffProfile)
+    profile = GeoTiffProfile('LZW')
+    assert profile is get_geotiff_profile(profile)
+    with pytest.raises(ValueError):
+        get_geotiff_profile('vfgbhn')
+
+
+def test_write_gdal_raster_with_profile():
+    try:
+        source_dataset = gdal.GetDriverByName('MEM').Create('', 600, 500, 1, gdal.GDT_Float32)
+        source_dataset.SetGeoTransform(gdal.Open(S2_FILE).GetGeoTransform())
+        source_dataset.SetProjection(gdal.Open(S2_FILE).GetProjection())
+        data = np.random.random((500, 600)).astype(np.float32)
+        source_dataset.GetRasterBand(1).WriteArray(data)
+        write_gdal_raster(source_dataset, OUTPUT_FILE, profile='fast')
+
+        written_dataset = gdal.Open(OUTPUT_FILE)
+        assert [512, 512] == written_dataset.GetRasterBand(1).GetBlockSize()
+        np.testing.assert_array_equal(data, written_dataset.ReadAsArray())
+    finally:
+        if os.path.exists(OUTPUT_FILE):
+            os.remove(OUTPUT_FILE)
+
+
+def test_get_overview_levels():
+    assert [] == get_overview_levels(200, 100, 256)
+    assert [2, 4] == get_overview_levels(1000, 600, 256)
+    assert [2, 4, 8] == get_overview_levels(600, 1500, 256)
+
+
+def test_convert_to_cloud_optimized_geotiff():
+    try:
+        source_dataset = gdal.GetDriverByName('MEM').Create('', 1000, 600, 1, gdal.GDT_Float32)
+        source_dataset.SetGeoTransform(gdal.Open(S2_FILE).GetGeoTransform())
+        source_dataset.SetProjection(gdal.Open(S2_FILE).GetProjection())
+        data = np.random.random((600, 1000)).astype(np.float32)
+        source_dataset.GetRasterBand(1).WriteArray(data)
+        write_gdal_raster(source_dataset, OUTPUT_FILE)
+        metrics = WriterMetrics()
+        convert_to_cloud_optimized_geotiff(OUTPUT_FILE, 'average', metrics=metrics)
+
+        written_dataset = gdal.Open(OUTPUT_FILE)
+        assert os.path.getsize(OUTPUT_FILE) == metrics.get_metrics()[OUTPUT_FILE]['compressed_bytes']
+        assert metrics.get_metrics()[OUTPUT_FILE]['close_time'] > 0
+        assert 2 == written_dataset.GetRasterBand(1).GetOverviewCount()
+        assert 500 == written_dataset.GetRasterBand(1).GetOverview(0).XSize
+        np.testing.assert_array_equal(data, written_dataset.ReadAsArray())
+    finally:
+        if os.path.exists(OUTPUT_FILE):
+            os.remove(OUTPUT_FILE)
+
+
+def test_writer_metrics():
+    metrics = WriterMetrics()
+    metrics.add_write('a.tif', 100, 0.5)
+    metrics.add_write('a.tif', 50, 0.25)
+    metrics.add_close('a.tif', 1.0)
+    metrics.add_write('b.tif', 10, 0.1)
+
+    collected_metrics = metrics.get_metrics()
+    assert 2 == len(collected_metrics)
+    assert {'blocks_written': 2, 'raw_bytes': 150, 'compressed_bytes': 0, 'write_time': 0.75, 'close_time': 1.0} == \
+        collected_metrics['a.tif']
+    assert 1 == collected_metrics['b.tif']['blocks_written']
+    metrics.log_metrics()
+
+
+def test_write_gdal_raster_with_metrics():
+    try:
+        source_dataset = gdal.GetDriverByName('MEM').Create('', 300, 270, 2, gdal.GDT_Float32)
+        source_dataset.SetGeoTransform(gdal.Open(S2_FILE).GetGeoTransform())
+        source_dataset.SetProjection(gdal.Open(S2_FILE).GetProjection())
+        metrics = WriterMetrics()
+        write_gdal_raster(source_dataset, OUTPUT_FILE, metrics=metrics)
+
+        file_metrics = metrics.get_metrics()[OUTPUT_FILE]
+        assert 2 * 270 * 300 * 4 == file_metrics['raw_bytes']
+        assert os.path.getsize(OUTPUT_FILE) == file_metrics['compressed_bytes']
+        assert file_metrics['blocks_written'] > 0
+    finally:
+        if os.path.exists(OUTPUT_FILE):
+            os.remove(OUTPUT_FILE)